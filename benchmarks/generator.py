@@ -0,0 +1,73 @@
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+# Category -> (share of expenses, median amount, tag pool).
+CATEGORIES = {
+    "Food": (0.32, 18.0, ["groceries", "restaurant", "coffee", "takeaway", "work"]),
+    "Transport": (0.18, 12.0, ["commute", "fuel", "taxi", "parking"]),
+    "Shopping": (0.14, 45.0, ["clothes", "electronics", "gifts", "online"]),
+    "Entertainment": (0.10, 30.0, ["movies", "games", "concerts", "streaming"]),
+    "Utilities": (0.08, 80.0, ["electricity", "water", "internet", "phone"]),
+    "Health": (0.06, 55.0, ["pharmacy", "doctor", "gym"]),
+    "Travel": (0.04, 320.0, ["flights", "hotel", "holiday"]),
+    "Education": (0.03, 120.0, ["books", "courses"]),
+    "Rent": (0.05, 1400.0, ["housing"]),
+}
+PERIODS = ["daily", "weekly", "monthly", "yearly"]
+
+
+class SyntheticData:
+    """Seeded generator of users, expenses and budgets with realistic shapes.
+
+    Category shares and tag pools follow CATEGORIES. Amounts are log-normal
+    around each category's median. Weekend days get 1.5x the spending of
+    weekdays, and rent is a recurring monthly charge on the 1st. The same
+    seed always produces the same data.
+    """
+    def __init__(self, seed: int = 0, start: date = date(2023, 1, 1), days: int = 730):
+        self.seed = seed
+        self.start = start
+        self.days = days
+
+    def users(self, count: int) -> List[Tuple[str, str, str]]:
+        """(username, password, email) triples."""
+        return [(f"user{i:07d}", f"password{i:07d}", f"user{i:07d}@example.com") for i in range(count)]
+
+    def expenses(self, count: int, user_index: int = 0) -> List[Dict]:
+        """add_expense keyword dicts, in random date order."""
+        rng = random.Random(f"{self.seed}:{user_index}")
+        names = list(CATEGORIES)
+        weights = [CATEGORIES[name][0] for name in names]
+        day_weights = [1.5 if (self.start + timedelta(days=d)).weekday() >= 5 else 1.0
+                       for d in range(self.days)]
+        categories = rng.choices(names, weights, k=count)
+        offsets = rng.choices(range(self.days), day_weights, k=count)
+        expenses = []
+        for i, (category, offset) in enumerate(zip(categories, offsets)):
+            _, median, tag_pool = CATEGORIES[category]
+            day = self.start + timedelta(days=offset)
+            recurring = category == "Rent"
+            if recurring:
+                day = day.replace(day=1)
+            expenses.append({
+                "amount": round(rng.lognormvariate(0.0, 0.6) * median, 2) or 0.01,
+                "category": category,
+                "description": f"{category} purchase {i}",
+                "date": day.isoformat(),
+                "tags": rng.sample(tag_pool, min(len(tag_pool), rng.choice((0, 1, 1, 2)))),
+                "is_recurring": recurring,
+                "recurrence_period": "monthly" if recurring else None
+            })
+        return expenses
+
+    def budgets(self, user_index: int = 0) -> List[Dict]:
+        """set_budget keyword dicts, one monthly budget per category plus a few others."""
+        rng = random.Random(f"{self.seed}:budgets:{user_index}")
+        budgets = [{"category": name, "amount": round(median * share * 120, 2), "period": "monthly",
+                    "alert_threshold": 0.8}
+                   for name, (share, median, _) in CATEGORIES.items()]
+        for name in rng.sample(list(CATEGORIES), 3):
+            budgets.append({"category": name, "amount": round(CATEGORIES[name][1] * 40, 2),
+                            "period": rng.choice(["weekly", "yearly"]), "alert_threshold": 0.9})
+        return budgets
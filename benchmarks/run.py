@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+from benchmarks.generator import SyntheticData
+from finance_tracker.budgets import BudgetManager
+from finance_tracker.charts import ChartRenderer
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.reports import FinancialReport
+from finance_tracker.storage import JSONStorage
+from finance_tracker.users import UserManager
+
+SCALES = {"1k": 1000, "100k": 100000, "1M": 1000000}
+QUERY_OPS = 1000
+MAX_USERS = 10000  # registered users at most, so setup stays quick at large scales
+
+
+class BenchmarkContext:
+    """A populated tracker, budget manager and report in a scratch directory."""
+    def __init__(self, count: int, seed: int, directory: str):
+        self.count = count
+        self.data = SyntheticData(seed)
+        self.rng = random.Random(seed)
+        self.storage = JSONStorage(directory, journal=True)
+        self.expenses = self.data.expenses(count)
+        self.tracker = ExpenseTracker("bench", storage=self.storage)
+        self.budget_manager = BudgetManager("bench", storage=self.storage, expense_tracker=self.tracker)
+        self.report = FinancialReport("bench", self.tracker, self.budget_manager,
+                                      renderer=ChartRenderer(), cache_size=0, reuse_files=False)
+
+
+def best_of(repeat: int, fn: Callable[[], object], ops: int = 1) -> float:
+    """Fastest of ``repeat`` runs of fn, in seconds per operation."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best / ops
+
+
+def bench_add_expenses_bulk(ctx: BenchmarkContext, repeat: int) -> float:
+    started = time.perf_counter()
+    ctx.tracker.add_expenses(ctx.expenses)
+    for budget in ctx.data.budgets():
+        ctx.budget_manager.set_budget(**budget)
+    return time.perf_counter() - started
+
+
+def bench_add_expense(ctx: BenchmarkContext, repeat: int) -> float:
+    extra = ctx.data.expenses(QUERY_OPS, user_index=1)
+    started = time.perf_counter()
+    added = [ctx.tracker.add_expense(**item) for item in extra]
+    elapsed = (time.perf_counter() - started) / QUERY_OPS
+    with ctx.tracker.batch():
+        for expense_id in added:
+            ctx.tracker.delete_expense(expense_id)
+    return elapsed
+
+
+def bench_save(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, ctx.tracker.compact)
+
+
+def bench_load(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, ExpenseTracker("bench", storage=ctx.storage).load_from_file)
+
+
+def bench_get_expense_by_id(ctx: BenchmarkContext, repeat: int) -> float:
+    ids = [exp["id"] for exp in ctx.tracker.get_expenses_between()]
+    sample = [ctx.rng.choice(ids) for _ in range(QUERY_OPS)]
+    return best_of(repeat, lambda: [ctx.tracker.get_expense_by_id(expense_id) for expense_id in sample],
+                   QUERY_OPS)
+
+
+def bench_get_expenses_by_category(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: ctx.tracker.get_expenses_by_category("Transport"))
+
+
+def bench_get_expenses_by_tag(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: ctx.tracker.get_expenses_by_tag("commute"))
+
+
+def bench_get_expenses_between(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: list(ctx.tracker.get_expenses_between("2024-03-01", "2024-03-31")))
+
+
+def bench_get_total_expenses(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: ctx.tracker.get_total_expenses("2024-01-01", "2024-06-30"))
+
+
+def bench_category_summary(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, ctx.report.generate_category_summary)
+
+
+def bench_category_summary_range(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: ctx.report.generate_category_summary("2024-01-01", "2024-06-30"))
+
+
+def bench_budget_comparison(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, ctx.report.generate_budget_comparison)
+
+
+def bench_trend_analysis(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: ctx.report.generate_trend_analysis(months=48))
+
+
+def bench_time_series(ctx: BenchmarkContext, repeat: int) -> float:
+    return best_of(repeat, lambda: ctx.report.generate_time_series("2023-01-01", "2024-12-31", "weekly"))
+
+
+def bench_report_files(ctx: BenchmarkContext, repeat: int) -> float:
+    report_types = ("category_summary", "budget_comparison", "trend_analysis")
+    return best_of(repeat, lambda: [ctx.report.generate_report_pdf(report_type)
+                                    for report_type in report_types])
+
+
+def bench_plot_category_distribution(ctx: BenchmarkContext, repeat: int) -> float:
+    def render():
+        shutil.rmtree(ctx.report.report_dir, ignore_errors=True)
+        ctx.report.plot_category_distribution()
+    return best_of(repeat, render)
+
+
+def bench_user_lookup(ctx: BenchmarkContext, repeat: int) -> float:
+    users = ctx.data.users(min(ctx.count, MAX_USERS))
+    manager = UserManager(storage=ctx.storage)
+    with manager.batch():
+        for username, password, email in users:
+            manager.register_user(username, password, email)
+    sample = [ctx.rng.choice(users) for _ in range(QUERY_OPS)]
+
+    def lookup():
+        # A fresh manager has no users in memory, so every login goes through storage.
+        fresh = UserManager(storage=ctx.storage)
+        for username, password, _ in sample:
+            fresh.authenticate_user(username, password)
+    return best_of(repeat, lookup, QUERY_OPS)
+
+
+def bench_cli_startup(ctx: BenchmarkContext, repeat: int) -> float:
+    command = [sys.executable, "-c", "import finance_tracker.cli"]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    return best_of(repeat, lambda: subprocess.run(command, check=True, env=env))
+
+
+# Run in order: the bulk load populates the tracker every later benchmark uses.
+BENCHMARKS: List[Tuple[str, Callable[[BenchmarkContext, int], float]]] = [
+    ("add_expenses_bulk", bench_add_expenses_bulk),
+    ("add_expense", bench_add_expense),
+    ("save", bench_save),
+    ("load", bench_load),
+    ("get_expense_by_id", bench_get_expense_by_id),
+    ("get_expenses_by_category", bench_get_expenses_by_category),
+    ("get_expenses_by_tag", bench_get_expenses_by_tag),
+    ("get_expenses_between", bench_get_expenses_between),
+    ("get_total_expenses", bench_get_total_expenses),
+    ("report.category_summary", bench_category_summary),
+    ("report.category_summary_range", bench_category_summary_range),
+    ("report.budget_comparison", bench_budget_comparison),
+    ("report.trend_analysis", bench_trend_analysis),
+    ("report.time_series", bench_time_series),
+    ("report.report_files", bench_report_files),
+    ("report.plot_category_distribution", bench_plot_category_distribution),
+    ("user_lookup", bench_user_lookup),
+    ("cli_startup", bench_cli_startup),
+]
+
+
+def run_scale(scale: str, seed: int = 0, repeat: int = 3, only: str = None) -> Dict:
+    """Run every benchmark at one scale and return a result record (seconds per operation)."""
+    count = SCALES[scale] if scale in SCALES else int(scale)
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        ctx = BenchmarkContext(count, seed, directory)
+        results = {}
+        for name, bench in BENCHMARKS:
+            if name == "add_expenses_bulk" or not only or only in name:
+                results[name] = bench(ctx, repeat)
+        ctx.report.renderer.shutdown()
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(directory, ignore_errors=True)
+    return {"scale": scale, "count": count, "seed": seed, "results": results}
+
+
+def find_regressions(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Describe every benchmark that got more than ``threshold`` (a fraction) slower than baseline."""
+    base_runs = {run["scale"]: run["results"] for run in baseline["runs"]}
+    regressions = []
+    for run in current["runs"]:
+        base = base_runs.get(run["scale"], {})
+        for name, seconds in run["results"].items():
+            if name in base and base[name] > 0 and seconds > base[name] * (1 + threshold):
+                regressions.append(f"{run['scale']} {name}: {seconds:.6g}s vs baseline "
+                                   f"{base[name]:.6g}s (+{seconds / base[name] - 1:.0%})")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    """Run benchmarks, write JSON results and compare them against a baseline."""
+    parser = argparse.ArgumentParser(description="Finance tracker benchmarks")
+    parser.add_argument("--scales", default="1k", help="comma-separated: 1k, 100k, 1M or a row count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the fastest counts")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown versus the baseline, as a fraction (default 0.25)")
+    args = parser.parse_args(argv)
+    report = {"python": platform.python_version(), "platform": platform.platform(),
+              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": []}
+    for scale in args.scales.split(","):
+        run = run_scale(scale.strip(), args.seed, args.repeat, args.only)
+        report["runs"].append(run)
+        for name, seconds in run["results"].items():
+            print(f"{run['scale']:>6}  {name:<36} {seconds * 1000:12.4f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from finance_tracker.budgets import BudgetManager
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.reports import FinancialReport
+from finance_tracker.storage import JSONStorage, StorageBackend
+from finance_tracker.users import UserManager
+
+REPORT_TYPES = ("category_summary", "budget_comparison", "trend_analysis")
+
+
+class UserReportResult:
+    """Outcome of generating reports for one user."""
+    def __init__(self, user_id: str, report_files: List[str] = None, error: str = None):
+        self.user_id = user_id
+        self.report_files = report_files or []
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict:
+        """Convert the result to a dictionary."""
+        return {"user_id": self.user_id, "report_files": self.report_files, "error": self.error}
+
+
+def _generate_user_reports(user_id: str, report_types: List[str], start_date: Optional[str],
+                           end_date: Optional[str],
+                           storage_factory: Callable[[], StorageBackend]) -> UserReportResult:
+    """Load one user's data and write the requested reports (runs in a worker process)."""
+    try:
+        storage = storage_factory()
+        tracker = ExpenseTracker(user_id, storage=storage)
+        tracker.load_from_file()
+        budget_manager = BudgetManager(user_id, storage=storage, expense_tracker=tracker)
+        report = FinancialReport(user_id, tracker, budget_manager)
+        files = [report.generate_report_pdf(report_type, start_date, end_date)
+                 for report_type in report_types]
+        return UserReportResult(user_id, files)
+    except Exception as e:
+        return UserReportResult(user_id, error=f"{type(e).__name__}: {e}")
+
+
+def iter_user_reports(user_ids: Iterable[str] = None, report_types: Iterable[str] = REPORT_TYPES,
+                      start_date: str = None, end_date: str = None, workers: int = None,
+                      storage_factory: Callable[[], StorageBackend] = JSONStorage
+                      ) -> Iterator[UserReportResult]:
+    """Generate reports for many users in parallel, yielding results as they finish.
+
+    Each user is handled in a worker process, which builds its own storage
+    from ``storage_factory``. The factory must be picklable, for example a
+    backend class or a functools.partial of one. When ``user_ids`` is
+    omitted, every user known to UserManager is included. Report files are
+    written where FinancialReport.generate_report_pdf puts them. A failing
+    user yields a result carrying the error, and the batch carries on.
+    """
+    report_types = list(report_types)
+    for report_type in report_types:
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"Unknown report type: {report_type}")
+    if user_ids is None:
+        user_ids = UserManager(storage=storage_factory()).users.keys()
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Worker count must be positive")
+    with ProcessPoolExecutor(max_workers=min(workers, len(user_ids))) as pool:
+        futures = {pool.submit(_generate_user_reports, user_id, report_types, start_date,
+                               end_date, storage_factory): user_id
+                   for user_id in user_ids}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield UserReportResult(futures[future], error=f"{type(e).__name__}: {e}")
+
+
+def generate_user_reports(user_ids: Iterable[str] = None, report_types: Iterable[str] = REPORT_TYPES,
+                          start_date: str = None, end_date: str = None, workers: int = None,
+                          storage_factory: Callable[[], StorageBackend] = JSONStorage,
+                          progress: Callable[[int, int, UserReportResult], None] = None
+                          ) -> Dict[str, List]:
+    """Run a report batch to completion.
+
+    ``progress`` is called as ``progress(done, total, result)`` after each
+    user finishes. Returns the successful results and the failures.
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+    else:
+        user_ids = list(UserManager(storage=storage_factory()).users.keys())
+    completed, failed = [], []
+    for done, result in enumerate(iter_user_reports(user_ids, report_types, start_date, end_date,
+                                                    workers, storage_factory), 1):
+        (completed if result.ok else failed).append(result)
+        if progress:
+            progress(done, len(user_ids), result)
+    return {"completed": completed, "failed": failed}
@@ -1,7 +1,10 @@
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
-import json
-import os
+import warnings
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.instrumentation import instrumented
+from finance_tracker.storage import JSONStorage, StorageBackend
 
 class Budget:
     """Represents a budget for a category and period."""
@@ -30,13 +33,59 @@ class Budget:
         return budget
 
 class BudgetManager:
-    """Manages budgets for a user."""
-    def __init__(self, user_id: str):
+    """Manages budgets for a user, persisted through a StorageBackend (JSON files by default).
+
+    With an ``expense_tracker`` attached, a budget's spending is not stored.
+    It is read from the tracker's per-category rollup for the current
+    calendar day, ISO week, month or year. That is an O(1) lookup, kept in
+    step with every expense added, updated or deleted. Windows roll over on
+    their own, and add_spending and reset_budget are refused.
+
+    ``version`` increases on every change, so callers can tell when cached
+    results built from these budgets are stale.
+    """
+    def __init__(self, user_id: str, storage: StorageBackend = None,
+                 expense_tracker: ExpenseTracker = None):
         self.user_id = user_id
+        self.storage = storage or JSONStorage()
+        self.expense_tracker = expense_tracker
         self.budgets: Dict[str, Budget] = {}
-        self.data_file = f"budgets_{user_id}.json"
+        self.version = 0
+        self._pending: Optional[List[Dict]] = None
         self._load_from_file()
 
+    @property
+    def data_file(self) -> Optional[str]:
+        """Deprecated: path of the JSON file holding these budgets, or None for other backends."""
+        warnings.warn("BudgetManager.data_file is deprecated; use storage.budget_file(user_id)",
+                      DeprecationWarning, stacklevel=2)
+        return self.storage.budget_file(self.user_id) if isinstance(self.storage, JSONStorage) else None
+
+    @contextmanager
+    def batch(self) -> Iterator['BudgetManager']:
+        """Group budget changes so they are saved once on exit.
+
+        If the block raises, budgets are rolled back to their state on entry
+        and nothing is written. Nested batches join the outermost one.
+        """
+        if self._pending is not None:
+            yield self
+            return
+        snapshot = self._snapshot()
+        self._pending = []
+        try:
+            yield self
+        except BaseException:
+            self._pending = None
+            self.budgets = {f"{item['category']}_{item['period']}": Budget.from_dict(item)
+                            for item in snapshot}
+            self.version += 1
+            raise
+        changes, self._pending = self._pending, None
+        if changes:
+            self.storage.write_budgets(self.user_id, changes, self._snapshot)
+
+    @instrumented
     def set_budget(self, category: str, amount: float, period: str = "monthly",
                    alert_threshold: float = 0.8) -> None:
         """Set a budget for a category and period."""
@@ -50,25 +99,29 @@ class BudgetManager:
             raise ValueError("Alert threshold must be between 0 and 1")
         key = f"{category}_{period}"
         self.budgets[key] = Budget(category, amount, period, alert_threshold)
-        self._save_to_file()
+        self._persist(key)
 
+    @instrumented
     def add_spending(self, category: str, amount: float, period: str = "monthly") -> None:
         """Add spending to a budget."""
+        if self.expense_tracker is not None:
+            raise ValueError("Spending is derived from the expense tracker; add an expense instead")
         if amount <= 0:
             raise ValueError("Amount must be positive")
         key = f"{category}_{period}"
         if key not in self.budgets:
             raise ValueError(f"No budget set for {category} in {period} period")
         self.budgets[key].spending += float(amount)
-        self._save_to_file()
+        self._persist(key)
 
+    @instrumented
     def get_budget_status(self, category: str, period: str = "monthly") -> Dict:
         """Get status of a budget."""
         key = f"{category}_{period}"
         budget = self.budgets.get(key)
         if not budget:
             return {"error": f"No budget for {category} in {period} period"}
-        spent = budget.spending
+        spent = self._spent(budget)
         return {
             "category": budget.category,
             "period": budget.period,
@@ -81,17 +134,32 @@ class BudgetManager:
 
     def get_all_budgets(self) -> List[Dict]:
         """Retrieve all budgets."""
-        return [budget.to_dict() for budget in self.budgets.values()]
+        if self.expense_tracker is None:
+            return [budget.to_dict() for budget in self.budgets.values()]
+        return [{**budget.to_dict(), "spending": self._spent(budget)} for budget in self.budgets.values()]
+
+    def _spent(self, budget: Budget) -> float:
+        """Spending against a budget: derived from the tracker if attached, else stored."""
+        if self.expense_tracker is None:
+            return budget.spending
+        return self.expense_tracker.get_period_total(budget.category, budget.period)
 
     def reset_budget(self, category: str, period: str = "monthly") -> bool:
-        """Reset spending for a budget."""
+        """Reset spending for a budget.
+
+        Raises ValueError with an expense tracker attached: spending is then
+        derived from its expenses, and a new window starts by itself.
+        """
+        if self.expense_tracker is not None:
+            raise ValueError("Spending is derived from the expense tracker and cannot be reset")
         key = f"{category}_{period}"
         if key in self.budgets:
             self.budgets[key].spending = 0.0
-            self._save_to_file()
+            self._persist(key)
             return True
         return False
 
+    @instrumented
     def update_budget(self, category: str, amount: float = None, period: str = "monthly",
                      alert_threshold: float = None) -> bool:
         """Update budget amount or alert threshold."""
@@ -106,20 +174,30 @@ class BudgetManager:
             if not 0 <= alert_threshold <= 1:
                 raise ValueError("Alert threshold must be between 0 and 1")
             self.budgets[key].alert_threshold = alert_threshold
-        self._save_to_file()
+        self._persist(key)
         return True
 
+    @instrumented
+    def _persist(self, key: str) -> None:
+        """Save a changed budget now, or once the open batch exits."""
+        self.version += 1
+        change = {"op": "put", "budget": self.budgets[key].to_dict()}
+        if self._pending is not None:
+            self._pending.append(change)
+        else:
+            self.storage.write_budgets(self.user_id, [change], self._snapshot)
+
+    def _snapshot(self) -> List[Dict]:
+        """Serialize every budget."""
+        return [budget.to_dict() for budget in self.budgets.values()]
+
     def _save_to_file(self) -> None:
-        """Save budgets to a JSON file."""
-        with open(self.data_file, 'w') as f:
-            json.dump([budget.to_dict() for budget in self.budgets.values()], f, indent=2)
+        """Save all budgets through the storage backend."""
+        self.storage.save_budgets(self.user_id, self._snapshot())
 
+    @instrumented
     def _load_from_file(self) -> None:
-        """Load budgets from a JSON file."""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.budgets = {f"{item['category']}_{item['period']}": Budget.from_dict(item) 
-                               for item in data}
-        except FileNotFoundError:
-            self.budgets = {}
\ No newline at end of file
+        """Load budgets from the storage backend."""
+        self.budgets = {f"{item['category']}_{item['period']}": Budget.from_dict(item)
+                        for item in self.storage.load_budgets(self.user_id)}
+        self.version += 1
\ No newline at end of file
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from finance_tracker.instrumentation import instrumented
+
+CHART_TYPES = ("category_pie", "trend_line", "budget_bars")
+
+
+class ChartRenderer:
+    """Renders charts to PNG files on a background thread pool.
+
+    Charts are drawn with matplotlib's object-oriented Figure API and the
+    Agg canvas, so pyplot and the interactive backend are never involved.
+    Each PNG is named ``<chart_type>_<hash>.png`` after a SHA-256 hash of
+    the chart type, title and input data. A chart whose file already exists
+    is not drawn again, and identical requests that are in flight at the
+    same time share one render. Matplotlib is not thread-safe across shared
+    font caches, so one worker is the default.
+
+    Every change to the data makes a new file. Only the ``keep_files`` most
+    recently requested charts of each type are kept per directory. Older
+    ones are deleted after each render. ``keep_files=None`` keeps them all.
+    """
+    def __init__(self, max_workers: int = 1, keep_files: Optional[int] = 8):
+        if keep_files is not None and keep_files < 1:
+            raise ValueError("Must keep at least one chart file")
+        self.keep_files = keep_files
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chart")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+
+    def submit(self, chart_type: str, data, directory: str, title: str = "") -> Future:
+        """Queue a chart and return a future resolving to its PNG path."""
+        if chart_type not in CHART_TYPES:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+        key = self.cache_key(chart_type, data, title)
+        path = os.path.join(directory, f"{chart_type}_{key[:16]}.png")
+        with self._lock:
+            future = self._pending.get(path)
+            if future is not None:
+                return future
+            if os.path.exists(path):
+                os.utime(path)  # a cache hit counts as a recent use when evicting
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._executor.submit(self._render, chart_type, data, title, path)
+            self._pending[path] = future
+        future.add_done_callback(lambda _: self._forget(path))
+        return future
+
+    def _forget(self, path: str) -> None:
+        with self._lock:
+            self._pending.pop(path, None)
+
+    @staticmethod
+    def cache_key(chart_type: str, data, title: str = "") -> str:
+        """Hash of everything that affects a chart's pixels."""
+        payload = json.dumps([chart_type, title, data], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @instrumented
+    def _render(self, chart_type: str, data, title: str, path: str) -> str:
+        """Draw one chart and write it atomically to path."""
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(8, 8) if chart_type == "category_pie" else (10, 6))
+        axes = figure.add_subplot()
+        getattr(self, f"_draw_{chart_type}")(axes, data)
+        axes.set_title(title)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        figure.savefig(temp_path, format="png")
+        os.replace(temp_path, path)
+        if self.keep_files is not None:
+            self._evict(chart_type, os.path.dirname(path) or ".")
+        return path
+
+    def _evict(self, chart_type: str, directory: str) -> None:
+        """Delete all but the keep_files most recently used charts of a type in a directory."""
+        prefix = f"{chart_type}_"
+        with self._lock:
+            charts = []
+            for entry in os.scandir(directory):
+                if entry.name.startswith(prefix) and entry.name.endswith(".png"):
+                    try:
+                        charts.append((entry.stat().st_mtime_ns, entry.path))
+                    except FileNotFoundError:
+                        continue
+            charts.sort(reverse=True)
+            for _, path in charts[self.keep_files:]:
+                if path not in self._pending:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    @staticmethod
+    def _draw_category_pie(axes, data: Dict[str, float]) -> None:
+        axes.pie(list(data.values()), labels=list(data.keys()), autopct='%1.1f%%')
+
+    @staticmethod
+    def _draw_trend_line(axes, data: Dict[str, float]) -> None:
+        axes.plot(list(data.keys()), list(data.values()), marker="o")
+        axes.set_ylabel("Total")
+
+    @staticmethod
+    def _draw_budget_bars(axes, data: List[Dict]) -> None:
+        categories = [item["category"] for item in data]
+        positions = range(len(categories))
+        axes.bar([p - 0.2 for p in positions], [item["budget"] for item in data], width=0.4, label="Budget")
+        axes.bar([p + 0.2 for p in positions], [item["spent"] for item in data], width=0.4, label="Spent")
+        axes.set_xticks(list(positions), categories)
+        axes.legend()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait)
+
+
+_default_renderer: Optional[ChartRenderer] = None
+_default_lock = threading.Lock()
+
+
+def default_renderer() -> ChartRenderer:
+    """Return the process-wide renderer, creating it on first use."""
+    global _default_renderer
+    with _default_lock:
+        if _default_renderer is None:
+            _default_renderer = ChartRenderer()
+        return _default_renderer
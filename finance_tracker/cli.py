@@ -1,15 +1,27 @@
 import cmd
 import argparse
+import sys
+import time
+from contextlib import ExitStack
+from typing import Dict, Iterable, List
 from finance_tracker.expenses import ExpenseTracker
 from finance_tracker.budgets import BudgetManager
 from finance_tracker.users import UserManager
-from finance_tracker.reports import FinancialReport
+from finance_tracker import instrumentation
 from datetime import datetime
 
 class FinanceTrackerCLI(cmd.Cmd):
-    """Command-line interface for the finance tracker."""
+    """Command-line interface for the finance tracker.
+
+    The reporting module is imported the first time a report command runs,
+    so plain bookkeeping commands start quickly.
+    """
     prompt = "FinanceTracker> "
     intro = "Welcome to the Personal Finance Tracker. Type 'help' for commands."
+    # Commands that change data, and the attribute holding the store they change. 'import'
+    # is left out: the importer saves its own chunks, so an outer batch would undo that.
+    MUTATING_COMMANDS = {"register": "user_manager", "add_expense": "expense_tracker",
+                         "set_budget": "budget_manager"}
 
     def __init__(self):
         super().__init__()
@@ -29,8 +41,9 @@ class FinanceTrackerCLI(cmd.Cmd):
         if self.user_manager.authenticate_user(username, password):
             self.current_user = username
             self.expense_tracker = ExpenseTracker(username)
-            self.budget_manager = BudgetManager(username)
-            self.report_generator = FinancialReport(username, self.expense_tracker, self.budget_manager)
+            self.expense_tracker.load_from_file()
+            self.budget_manager = BudgetManager(username, expense_tracker=self.expense_tracker)
+            self.report_generator = None
             print(f"Logged in as {username}")
         else:
             print("Invalid username or password")
@@ -68,6 +81,29 @@ class FinanceTrackerCLI(cmd.Cmd):
         except ValueError as e:
             print(f"Error: {e}")
 
+    def do_import(self, arg):
+        """Import a bank statement: import <file> [csv|ofx]"""
+        if not self.current_user:
+            print("Please login first")
+            return
+        args = arg.split()
+        if not 1 <= len(args) <= 2:
+            print("Usage: import <file> [csv|ofx]")
+            return
+        path = args[0]
+        kind = args[1].lower() if len(args) > 1 else ("ofx" if path.lower().endswith((".ofx", ".qfx")) else "csv")
+        from finance_tracker.importer import StatementImporter
+        importer = StatementImporter(self.expense_tracker)
+        try:
+            result = importer.import_ofx(path) if kind == "ofx" else importer.import_csv(path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+        print(f"Imported {result.imported} expenses ({result.duplicates} duplicates, "
+              f"{result.skipped} skipped, {len(result.errors)} errors)")
+        for row_number, message in result.errors[:10]:
+            print(f"  row {row_number}: {message}")
+
     def do_set_budget(self, arg):
         """Set a budget: set_budget <category> <amount> [period] [alert_threshold]"""
         if not self.current_user:
@@ -79,8 +115,8 @@ class FinanceTrackerCLI(cmd.Cmd):
             return
         category, amount = args[:2]
         period = args[2] if len(args) > 2 else "monthly"
-        alert_threshold = float(args[3]) if len(args) > 3 else 0.8
         try:
+            alert_threshold = float(args[3]) if len(args) > 3 else 0.8
             self.budget_manager.set_budget(category, float(amount), period, alert_threshold)
             print(f"Budget set for {category} ({period})")
         except ValueError as e:
@@ -99,16 +135,122 @@ class FinanceTrackerCLI(cmd.Cmd):
         start_date = args[1] if len(args) > 1 else None
         end_date = args[2] if len(args) > 2 else None
         try:
-            report_file = self.report_generator.generate_report_pdf(report_type, start_date, end_date)
+            report_file = self._reports().generate_report_pdf(report_type, start_date, end_date)
             print(f"Report generated: {report_file}")
         except Exception as e:
             print(f"Error: {e}")
 
+    def do_stats(self, arg):
+        """Show or control timing statistics: stats [on|off|reset|json <file>]"""
+        args = arg.split()
+        if args and args[0] in ("on", "off", "reset"):
+            {"on": instrumentation.enable, "off": instrumentation.disable,
+             "reset": instrumentation.reset}[args[0]]()
+            print(f"Statistics {args[0]}")
+            return
+        if args and args[0] == "json":
+            text = instrumentation.export_json(args[1] if len(args) > 1 else None)
+            print(f"Statistics written to {args[1]}" if len(args) > 1 else text)
+            return
+        if args:
+            print("Usage: stats [on|off|reset|json <file>]")
+            return
+        operations = instrumentation.snapshot()
+        if not operations:
+            state = "on" if instrumentation.enabled() else "off (enable with 'stats on')"
+            print(f"No statistics recorded; recording is {state}")
+            return
+        print(f"{'operation':<44}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"
+              f"{'read':>12}{'written':>12}")
+        for name, op in operations.items():
+            print(f"{name:<44}{op['count']:>8}{op['mean_seconds'] * 1000:>10.3f}"
+                  f"{op['p95_seconds'] * 1000:>10.3f}{op['max_seconds'] * 1000:>10.3f}"
+                  f"{op['bytes_read']:>12}{op['bytes_written']:>12}")
+
+    def _reports(self):
+        """Return the report generator for the current user, creating it on first use."""
+        if self.report_generator is None:
+            from finance_tracker.reports import FinancialReport
+            self.report_generator = FinancialReport(self.current_user, self.expense_tracker,
+                                                    self.budget_manager)
+        return self.report_generator
+
+    def run_script(self, lines: Iterable[str]) -> Dict:
+        """Run commands non-interactively and return execution counts.
+
+        Blank lines and lines starting with '#' are skipped. Consecutive
+        mutating commands run inside their stores' batch() blocks, so each
+        run of changes is saved once. Any other command flushes the open
+        batch first, as does 'import', which saves in chunks of its own.
+        'exit' ends the script.
+        """
+        stats = {"commands": 0, "mutations": 0, "batches": 0, "seconds": 0.0}
+        started = time.perf_counter()
+        stack, batched = ExitStack(), set()
+        try:
+            for line in lines:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                stats["commands"] += 1
+                owner = self.MUTATING_COMMANDS.get(line.split()[0])
+                if owner is None:
+                    if batched:
+                        stack.close()
+                        stack, batched = ExitStack(), set()
+                        stats["batches"] += 1
+                    if self.onecmd(line):
+                        break
+                    continue
+                manager = getattr(self, owner)
+                if manager is not None and owner not in batched:
+                    stack.enter_context(manager.batch())
+                    batched.add(owner)
+                self.onecmd(line)
+                stats["mutations"] += 1
+        except BaseException:
+            if not stack.__exit__(*sys.exc_info()):
+                raise
+        else:
+            stack.close()
+            if batched:
+                stats["batches"] += 1
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
     def do_exit(self, arg):
         """Exit the CLI."""
         print("Goodbye!")
         return True
 
+    def do_EOF(self, arg):
+        """Exit at end of input."""
+        return self.do_exit(arg)
+
     def preloop(self):
         """Initialize CLI state."""
-        print("Personal Finance Tracker CLI. Type 'register' or 'login' to begin.")
\ No newline at end of file
+        print("Personal Finance Tracker CLI. Type 'register' or 'login' to begin.")
+
+
+def main(argv: List[str] = None):
+    """Run the interactive CLI, or a command script with --script."""
+    parser = argparse.ArgumentParser(description="Personal Finance Tracker CLI")
+    parser.add_argument("--script", metavar="FILE",
+                        help="run commands from FILE ('-' for stdin) instead of the interactive shell")
+    args = parser.parse_args(argv)
+    cli = FinanceTrackerCLI()
+    if args.script is None:
+        cli.cmdloop()
+        return
+    if args.script == "-":
+        stats = cli.run_script(sys.stdin)
+    else:
+        with open(args.script) as f:
+            stats = cli.run_script(f)
+    rate = stats["commands"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"Executed {stats['commands']} commands ({stats['mutations']} changes in "
+          f"{stats['batches']} batches) in {stats['seconds']:.3f}s, {rate:.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
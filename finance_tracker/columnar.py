@@ -0,0 +1,205 @@
+from array import array
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class _Pool:
+    """Interns repeated values (category names, tags, tag sets) as small integer codes."""
+    def __init__(self):
+        self.values: list = []
+        self.codes: dict = {}
+
+    def code(self, value) -> int:
+        """Return the code for a value, assigning a new one on first sight."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _column(name: str, doc: str) -> property:
+    """Build a row-view property that reads and writes one store column."""
+    def fget(row: 'ExpenseRow'):
+        return getattr(row._store, f"_get_{name}")(row._store._rows[row.id])
+
+    def fset(row: 'ExpenseRow', value) -> None:
+        getattr(row._store, f"_set_{name}")(row._store._rows[row.id], value)
+
+    return property(fget, fset, doc=doc)
+
+
+class ExpenseRow:
+    """Lightweight view of one stored expense, with the same attributes as Expense."""
+    __slots__ = ("_store", "id")
+
+    def __init__(self, store: 'ColumnarExpenseStore', expense_id: str):
+        self._store = store
+        self.id = expense_id
+
+    amount = _column("amount", "Expense amount.")
+    category = _column("category", "Expense category.")
+    description = _column("description", "Expense description.")
+    date = _column("date", "Expense date as YYYY-MM-DD.")
+    tags = _column("tags", "Expense tags, as a new list.")
+    is_recurring = _column("is_recurring", "Whether the expense recurs.")
+    recurrence_period = _column("recurrence_period", "Recurrence period, if any.")
+
+    def to_dict(self) -> Dict:
+        """Convert the row to the same dictionary Expense.to_dict produces."""
+        return {
+            "id": self.id,
+            "amount": self.amount,
+            "category": self.category,
+            "description": self.description,
+            "date": self.date,
+            "tags": self.tags,
+            "is_recurring": self.is_recurring,
+            "recurrence_period": self.recurrence_period
+        }
+
+
+class ColumnarExpenseStore:
+    """Compact, array-backed expense storage with a dict-like interface keyed by ID.
+
+    Amounts live in a float64 array and dates in an int32 array of day
+    ordinals. Categories, recurrence periods and whole tag sets are interned
+    into integer codes. Reads return ExpenseRow views that are built on
+    demand. Deletes swap the last row into the freed slot, so iteration order
+    does not survive deletes. Dates must be ISO formatted (YYYY-MM-DD).
+    """
+    def __init__(self):
+        self._rows: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._amounts = array('d')
+        self._days = array('i')
+        self._categories = array('i')
+        self._descriptions: List[str] = []
+        self._tagsets = array('i')
+        self._recurring = array('b')
+        self._periods = array('i')
+        self._strings = _Pool()
+        self._tagset_pool = _Pool()
+        self._tagset_pool.code(())
+        self._day_strings: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, expense_id: str) -> bool:
+        return expense_id in self._rows
+
+    def __getitem__(self, expense_id: str) -> ExpenseRow:
+        if expense_id not in self._rows:
+            raise KeyError(expense_id)
+        return ExpenseRow(self, expense_id)
+
+    def get(self, expense_id: str, default=None) -> Optional[ExpenseRow]:
+        """Return a row view for an ID, or the default if it is not stored."""
+        return ExpenseRow(self, expense_id) if expense_id in self._rows else default
+
+    def values(self) -> Iterator[ExpenseRow]:
+        """Yield a view of every stored row."""
+        for expense_id in self._ids:
+            yield ExpenseRow(self, expense_id)
+
+    def __setitem__(self, expense_id: str, expense) -> None:
+        """Store an Expense (or row view), replacing any row with the same ID.
+
+        The date and amount are converted before anything is written, so a
+        bad value raises ValueError and leaves any existing row unchanged.
+        """
+        day = self._day_number(expense.date)
+        amount = float(expense.amount)
+        row = self._rows.get(expense_id)
+        if row is None:
+            self._rows[expense_id] = row = len(self._ids)
+            self._ids.append(expense_id)
+            self._amounts.append(0.0)
+            self._days.append(0)
+            self._categories.append(0)
+            self._descriptions.append("")
+            self._tagsets.append(0)
+            self._recurring.append(0)
+            self._periods.append(-1)
+        self._days[row] = day
+        self._amounts[row] = amount
+        self._set_category(row, expense.category)
+        self._set_description(row, expense.description)
+        self._set_tags(row, expense.tags)
+        self._set_is_recurring(row, expense.is_recurring)
+        self._set_recurrence_period(row, expense.recurrence_period)
+
+    def __delitem__(self, expense_id: str) -> None:
+        row = self._rows.pop(expense_id)
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._rows[moved_id] = row
+            self._ids[row] = moved_id
+            for column in self._columns():
+                column[row] = column[last]
+        self._ids.pop()
+        for column in self._columns():
+            column.pop()
+
+    def _columns(self) -> Tuple:
+        """All per-row columns other than the ID list."""
+        return (self._amounts, self._days, self._categories, self._descriptions,
+                self._tagsets, self._recurring, self._periods)
+
+    def _get_amount(self, row: int) -> float:
+        return self._amounts[row]
+
+    def _set_amount(self, row: int, value: float) -> None:
+        self._amounts[row] = float(value)
+
+    def _get_date(self, row: int) -> str:
+        day = self._days[row]
+        text = self._day_strings.get(day)
+        if text is None:
+            text = self._day_strings[day] = date.fromordinal(day).isoformat()
+        return text
+
+    def _set_date(self, row: int, value: str) -> None:
+        self._days[row] = self._day_number(value)
+
+    @staticmethod
+    def _day_number(value: str) -> int:
+        """Convert an ISO date string to a proleptic Gregorian day ordinal."""
+        try:
+            return date.fromisoformat(value).toordinal()
+        except (TypeError, ValueError):
+            raise ValueError(f"Columnar storage requires ISO dates (YYYY-MM-DD), got {value!r}")
+
+    def _get_category(self, row: int) -> str:
+        return self._strings.values[self._categories[row]]
+
+    def _set_category(self, row: int, value: str) -> None:
+        self._categories[row] = self._strings.code(value)
+
+    def _get_description(self, row: int) -> str:
+        return self._descriptions[row]
+
+    def _set_description(self, row: int, value: str) -> None:
+        self._descriptions[row] = value
+
+    def _get_tags(self, row: int) -> List[str]:
+        return [self._strings.values[code] for code in self._tagset_pool.values[self._tagsets[row]]]
+
+    def _set_tags(self, row: int, value: List[str]) -> None:
+        codes = tuple(self._strings.code(tag) for tag in value or ())
+        self._tagsets[row] = self._tagset_pool.code(codes)
+
+    def _get_is_recurring(self, row: int) -> bool:
+        return bool(self._recurring[row])
+
+    def _set_is_recurring(self, row: int, value: bool) -> None:
+        self._recurring[row] = 1 if value else 0
+
+    def _get_recurrence_period(self, row: int) -> Optional[str]:
+        code = self._periods[row]
+        return None if code < 0 else self._strings.values[code]
+
+    def _set_recurrence_period(self, row: int, value: Optional[str]) -> None:
+        self._periods[row] = -1 if value is None else self._strings.code(value)
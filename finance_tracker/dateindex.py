@@ -0,0 +1,189 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class _Fenwick:
+    """Binary indexed tree: point updates and prefix sums in O(log n)."""
+    def __init__(self, values: Iterable[float]):
+        tree = [0] + list(values)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, position: int, delta: float) -> None:
+        """Add delta to the value at a 0-based position."""
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> float:
+        """Sum of the first ``count`` values."""
+        total = 0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+
+class DateIndex:
+    """Expense IDs kept in date order, with amount totals over any date range.
+
+    Entries live in sorted blocks of at most ``2 * load`` entries, each with
+    its amount sum and entry count. Fenwick trees over those sums and
+    counts answer "total before block b" and "entries before block b" in
+    O(log n). Adding, removing or re-pricing an expense touches one block:
+    O(log n + load). A range total sums whole blocks through the trees and
+    only scans the two partial blocks at its ends. Expenses on the same
+    date keep the order they were added in.
+
+    A block holds its dates and IDs as lists of the caller's own strings
+    and its amounts in an array, so the index adds no objects per expense.
+    Removing or re-pricing an expense takes its date, which locates it.
+
+    Block sums are recomputed from their entries on every change, and the
+    trees are rebuilt whenever a block splits or empties, so rounding
+    drift does not build up.
+    """
+    def __init__(self, load: int = 256):
+        if load < 1:
+            raise ValueError("Load must be at least 1")
+        self.load = load
+        self._dates: List[List[str]] = []
+        self._ids: List[List[str]] = []
+        self._amounts: List[array] = []
+        self._sums: List[float] = []
+        self._firsts: List[str] = []
+        self._count = 0
+        self._sum_tree = _Fenwick(())
+        self._count_tree = _Fenwick(())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def build(self, entries: Iterable[Tuple[str, str, float]]) -> None:
+        """Replace the contents with (expense ID, date, amount) entries, given in insertion order."""
+        rows = sorted(entries, key=lambda entry: entry[1])  # stable, so insertion order holds per date
+        self._count = len(rows)
+        chunks = [rows[i:i + self.load] for i in range(0, len(rows), self.load)]
+        self._dates = [[row[1] for row in chunk] for chunk in chunks]
+        self._ids = [[row[0] for row in chunk] for chunk in chunks]
+        self._amounts = [array('d', (row[2] for row in chunk)) for chunk in chunks]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Rebuild block sums, first dates and both trees after blocks change shape."""
+        self._sums = [sum(amounts) for amounts in self._amounts]
+        self._firsts = [dates[0] for dates in self._dates]
+        self._sum_tree = _Fenwick(self._sums)
+        self._count_tree = _Fenwick(len(dates) for dates in self._dates)
+
+    def _resum(self, block: int) -> None:
+        total = sum(self._amounts[block])
+        self._sum_tree.add(block, total - self._sums[block])
+        self._sums[block] = total
+
+    def _locate(self, expense_id: str, date: str) -> Tuple[int, int]:
+        """Block and offset of an indexed expense, searching the entries on its date."""
+        block = max(0, bisect_left(self._firsts, date) - 1)
+        while block < len(self._dates) and self._firsts[block] <= date:
+            dates = self._dates[block]
+            lo = bisect_left(dates, date)
+            hi = bisect_right(dates, date, lo)
+            try:
+                return block, self._ids[block].index(expense_id, lo, hi)
+            except ValueError:
+                block += 1
+        raise KeyError(expense_id)
+
+    def add(self, expense_id: str, date: str, amount: float) -> None:
+        """Add an expense after any others on the same date; the ID must not be indexed already."""
+        self._count += 1
+        if not self._dates:
+            self._dates, self._ids, self._amounts = [[date]], [[expense_id]], [array('d', [amount])]
+            self._reindex()
+            return
+        block = max(0, bisect_right(self._firsts, date) - 1)
+        dates = self._dates[block]
+        offset = bisect_right(dates, date)
+        dates.insert(offset, date)
+        self._ids[block].insert(offset, expense_id)
+        self._amounts[block].insert(offset, amount)
+        if len(dates) > 2 * self.load:
+            half = len(dates) // 2
+            for column in (self._dates, self._ids, self._amounts):
+                column[block:block + 1] = [column[block][:half], column[block][half:]]
+            self._reindex()
+            return
+        self._firsts[block] = dates[0]
+        self._count_tree.add(block, 1)
+        self._resum(block)
+
+    def remove(self, expense_id: str, date: str) -> None:
+        """Remove an indexed expense, given the date it was indexed under."""
+        block, offset = self._locate(expense_id, date)
+        self._count -= 1
+        dates = self._dates[block]
+        del dates[offset]
+        del self._ids[block][offset]
+        del self._amounts[block][offset]
+        if not dates:
+            for column in (self._dates, self._ids, self._amounts):
+                del column[block]
+            self._reindex()
+            return
+        self._firsts[block] = dates[0]
+        self._count_tree.add(block, -1)
+        self._resum(block)
+
+    def set_amount(self, expense_id: str, date: str, amount: float) -> None:
+        """Change the amount of an indexed expense, given its date."""
+        block, offset = self._locate(expense_id, date)
+        self._amounts[block][offset] = amount
+        self._resum(block)
+
+    def _bound(self, date: Optional[str], after: bool) -> Tuple[int, int]:
+        """Block and offset of the first entry dated after (or on or after) a date."""
+        if date is None:
+            return (len(self._dates), 0) if after else (0, 0)
+        if not self._dates:
+            return 0, 0
+        if after:
+            block = max(0, bisect_right(self._firsts, date) - 1)
+            return block, bisect_right(self._dates[block], date)
+        # Entries on this date may begin in the block before the first block starting with it.
+        block = max(0, bisect_left(self._firsts, date) - 1)
+        return block, bisect_left(self._dates[block], date)
+
+    def span(self, start_date: str = None, end_date: str = None) -> Tuple[int, int]:
+        """Positions, in date order, bounding the entries within an inclusive date range."""
+        lo_block, lo_offset = self._bound(start_date, False)
+        hi_block, hi_offset = self._bound(end_date, True)
+        lo = self._count_tree.prefix(lo_block) + lo_offset
+        hi = self._count_tree.prefix(hi_block) + hi_offset
+        return lo, max(lo, hi)
+
+    def total(self, start_date: str = None, end_date: str = None) -> float:
+        """Sum of amounts within an inclusive date range; either bound may be omitted."""
+        lo_block, lo_offset = self._bound(start_date, False)
+        hi_block, hi_offset = self._bound(end_date, True)
+        if (hi_block, hi_offset) <= (lo_block, lo_offset):
+            return 0.0
+        if lo_block == hi_block:
+            return sum(self._amounts[lo_block][lo_offset:hi_offset])
+        total = self._sum_tree.prefix(hi_block) - self._sum_tree.prefix(lo_block + 1)
+        total += sum(self._amounts[lo_block][lo_offset:])
+        if hi_offset:
+            total += sum(self._amounts[hi_block][:hi_offset])
+        return total
+
+    def ids(self, start_date: str = None, end_date: str = None) -> Iterator[str]:
+        """Yield expense IDs dated within an inclusive range, in date order."""
+        lo_block, lo_offset = self._bound(start_date, False)
+        hi_block, hi_offset = self._bound(end_date, True)
+        for block in range(lo_block, min(hi_block + 1, len(self._dates))):
+            ids = self._ids[block]
+            yield from ids[lo_offset if block == lo_block else 0:hi_offset if block == hi_block else len(ids)]
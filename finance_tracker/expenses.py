@@ -1,19 +1,29 @@
-from datetime import datetime
-from typing import List, Dict, Optional
-import json
-import os
+from collections.abc import Sequence
+from contextlib import contextmanager
+from datetime import date, datetime
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+import warnings
 from uuid import uuid4
+from finance_tracker.columnar import ColumnarExpenseStore
+from finance_tracker.dateindex import DateIndex
+from finance_tracker.instrumentation import instrumented
+from finance_tracker.recurrence import RECURRENCE_PERIODS, RecurrenceEngine
+from finance_tracker.storage import JSONStorage, StorageBackend
 
 class Expense:
     """Represents a single expense entry."""
     def __init__(self, amount: float, category: str, description: str, date: str = None, 
-                 tags: List[str] = None, is_recurring: bool = False, recurrence_period: str = None):
-        self.id = str(uuid4())
+                 tags: List[str] = None, is_recurring: bool = False, recurrence_period: str = None,
+                 expense_id: str = None):
+        self.id = expense_id or str(uuid4())
         self.amount = float(amount)
         self.category = category.strip()
         self.description = description.strip()
         self.date = date or datetime.now().strftime("%Y-%m-%d")
-        self.tags = tags or []
+        self.tags = list(tags) if tags else []
         self.is_recurring = is_recurring
         self.recurrence_period = recurrence_period  # e.g., 'monthly', 'weekly'
 
@@ -25,7 +35,7 @@ class Expense:
             "category": self.category,
             "description": self.description,
             "date": self.date,
-            "tags": self.tags,
+            "tags": list(self.tags),
             "is_recurring": self.is_recurring,
             "recurrence_period": self.recurrence_period
         }
@@ -40,107 +50,525 @@ class Expense:
             date=data["date"],
             tags=data.get("tags", []),
             is_recurring=data.get("is_recurring", False),
-            recurrence_period=data.get("recurrence_period", None)
+            recurrence_period=data.get("recurrence_period", None),
+            expense_id=data.get("id")
         )
 
+class ExpenseView(Sequence):
+    """Read-only sequence over a tracker's expenses, in storage order.
+
+    Nothing is copied up front: len() is O(1), and each expense is copied
+    only when it is read, so changing it does not affect the tracker.
+    Indexing walks from the start, so iterate rather than index when
+    reading many expenses.
+    """
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self) -> Iterator[Expense]:
+        for expense in self._store.values():
+            yield Expense.from_dict(expense.to_dict())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("expense index out of range")
+        return next(islice(iter(self), index, None))
+
+
+BUDGET_PERIODS = ("daily", "weekly", "monthly", "yearly")
+
+
+def period_window_key(period: str, day: date) -> str:
+    """Key of the calendar window containing a day: YYYY-MM-DD, YYYY-Www (ISO week), YYYY-MM or YYYY."""
+    if period == "daily":
+        return day.isoformat()
+    if period == "weekly":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return f"{day.year:04d}-{day.month:02d}"
+    if period == "yearly":
+        return f"{day.year:04d}"
+    raise ValueError(f"Invalid period: {period}")
+
+
 class ExpenseTracker:
-    """Manages expense tracking for a user."""
-    def __init__(self, user_id: str):
+    """Manages expense tracking for a user.
+
+    Data is persisted through a StorageBackend, by default JSON files in the
+    working directory. ``journal`` and ``compact_every`` configure that
+    default: with ``journal=True`` each mutation appends one record to
+    ``expenses_<user_id>.journal`` instead of rewriting the whole data file.
+    With ``columnar=True`` expenses are held in a compact ColumnarExpenseStore
+    rather than as one Expense object each. The category and tag indexes
+    still hold a dict entry per expense. Recurring expenses are also
+    registered with a RecurrenceEngine, which expands their later
+    occurrences on request (see ``expand_recurring``).
+    """
+    def __init__(self, user_id: str, journal: bool = False, compact_every: int = 1000,
+                 columnar: bool = False, storage: StorageBackend = None):
         self.user_id = user_id
-        self.expenses: List[Expense] = []
-        self.data_file = f"expenses_{user_id}.json"
+        self.storage = storage or JSONStorage(journal=journal, compact_every=compact_every)
+        self.columnar = columnar
+        self.version = 0  # bumped on every in-memory change; keys derived caches
+        self._expenses = self._new_store()
+        self._by_category: Dict[str, Dict[str, None]] = {}
+        self._by_tag: Dict[str, Dict[str, None]] = {}
+        # IDs in date order, with amount totals over any date range.
+        self.date_index = DateIndex()
+        # Running aggregates, each key mapped to [total amount, expense count].
+        self._category_totals: Dict[str, List[float]] = {}
+        self._month_totals: Dict[str, List[float]] = {}
+        self._category_month_totals: Dict[Tuple[str, str], List[float]] = {}
+        self._category_day_totals: Dict[Tuple[str, str], List[float]] = {}
+        # Per case-folded category and calendar window (see period_window_key); feeds budgets.
+        self._period_totals: Dict[Tuple[str, str], List[float]] = {}
+        self._tag_totals: Dict[str, List[float]] = {}
+        self.recurrence = RecurrenceEngine()
+        self._pending: Optional[List[Dict]] = None
+        # While a batch is open: each touched ID mapped to its record on entry, or None if it was
+        # added; and the whole state on entry, once every expense is replaced inside the batch.
+        self._undo: Optional[Dict[str, Optional[Dict]]] = None
+        self._entry: Optional[List[Dict]] = None
 
-    def add_expense(self, amount: float, category: str, description: str, 
-                    date: str = None, tags: List[str] = None, 
-                    is_recurring: bool = False, recurrence_period: str = None) -> str:
-        """Add a new expense and return its ID."""
+    @property
+    def expenses(self) -> ExpenseView:
+        """A read-only view of all expenses (see ExpenseView).
+
+        The order is insertion order, except that with ``columnar=True`` a
+        delete moves the last expense into the freed slot. append() and
+        remove() raise AttributeError. Use add_expense, update_expense and
+        delete_expense, or assign a new list to this attribute to replace
+        every expense.
+        """
+        return ExpenseView(self._expenses)
+
+    @expenses.setter
+    def expenses(self, expenses: Iterable[Expense]) -> None:
+        self._reset(expenses)
+
+    @property
+    def data_file(self) -> Optional[str]:
+        """Deprecated: path of the JSON file holding these expenses, or None for other backends."""
+        warnings.warn("ExpenseTracker.data_file is deprecated; use storage.expense_file(user_id)",
+                      DeprecationWarning, stacklevel=2)
+        return self.storage.expense_file(self.user_id) if isinstance(self.storage, JSONStorage) else None
+
+    def __len__(self) -> int:
+        """Number of expenses held."""
+        return len(self._expenses)
+
+    def _new_store(self):
+        """Create an empty primary store: a dict of Expense objects or a columnar store."""
+        return ColumnarExpenseStore() if self.columnar else {}
+
+    def _reset(self, expenses: Iterable[Expense]) -> None:
+        """Replace all expenses and rebuild every index in bulk."""
+        if self._undo is not None and self._entry is None:
+            # Undo entries cannot follow a wholesale replace, so recover the entry state now.
+            records = {expense.id: expense.to_dict() for expense in self._expenses.values()}
+            for expense_id, record in self._undo.items():
+                if record is None:
+                    records.pop(expense_id, None)
+                else:
+                    records[expense_id] = record
+            self._entry = list(records.values())
+        self.version += 1
+        self._expenses = self._new_store()
+        for expense in expenses:
+            self._expenses[expense.id] = expense
+        self._by_category = {}
+        self._by_tag = {}
+        self._category_totals = {}
+        self._month_totals = {}
+        self._category_month_totals = {}
+        self._category_day_totals = {}
+        self._period_totals = {}
+        self._tag_totals = {}
+        self.recurrence = RecurrenceEngine()
+        for expense in self._expenses.values():
+            self._index_keys(expense)
+        self.date_index = DateIndex()
+        self.date_index.build((expense.id, expense.date, expense.amount)
+                              for expense in self._expenses.values())
+
+    def _insert(self, expense: Expense) -> None:
+        """Add an expense to all indexes, replacing any with the same ID."""
+        self._touch(expense.id)
+        self.version += 1
+        previous = self._expenses.get(expense.id)
+        if previous is not None:
+            self._unindex(previous)
+        try:
+            self._expenses[expense.id] = expense
+        except BaseException:
+            # The store rejected the expense and kept the old one; put it back in the indexes.
+            if previous is not None:
+                self._index(previous)
+            raise
+        self._index(self._expenses[expense.id])
+
+    def _remove(self, expense: Expense) -> None:
+        """Drop an expense from all indexes."""
+        self._touch(expense.id)
+        self.version += 1
+        self._unindex(expense)
+        del self._expenses[expense.id]
+
+    def _touch(self, expense_id: str) -> None:
+        """Remember an expense's record before its first change in the open batch."""
+        if self._undo is not None and expense_id not in self._undo:
+            expense = self._expenses.get(expense_id)
+            self._undo[expense_id] = expense.to_dict() if expense is not None else None
+
+    def _index(self, expense: Expense) -> None:
+        """Add an expense to the secondary indexes."""
+        self._index_keys(expense)
+        self.date_index.add(expense.id, expense.date, expense.amount)
+
+    def _unindex(self, expense: Expense) -> None:
+        """Remove an expense from the secondary indexes."""
+        self._unindex_keys(expense)
+        self.date_index.remove(expense.id, expense.date)
+
+    def _index_keys(self, expense: Expense) -> None:
+        """Add an expense to the category and tag indexes and running aggregates."""
+        self._by_category.setdefault(expense.category.casefold(), {})[expense.id] = None
+        tags = {tag.casefold() for tag in expense.tags}
+        for tag in tags:
+            self._by_tag.setdefault(tag, {})[expense.id] = None
+        self._aggregate(expense, tags, 1)
+        if expense.is_recurring:
+            self.recurrence.add(expense)
+
+    def _unindex_keys(self, expense: Expense) -> None:
+        """Remove an expense from the category and tag indexes and running aggregates."""
+        self._discard(self._by_category, expense.category.casefold(), expense.id)
+        tags = {tag.casefold() for tag in expense.tags}
+        for tag in tags:
+            self._discard(self._by_tag, tag, expense.id)
+        self._aggregate(expense, tags, -1)
+        if expense.is_recurring:
+            self.recurrence.remove(expense.id)
+
+    def _aggregate(self, expense: Expense, tags: Iterable[str], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) an expense from every running aggregate."""
+        month = expense.date[:7]
+        amount = sign * expense.amount
+        self._bump(self._category_totals, expense.category, amount, sign)
+        self._bump(self._month_totals, month, amount, sign)
+        self._bump(self._category_month_totals, (expense.category, month), amount, sign)
+        self._bump(self._category_day_totals, (expense.category, expense.date), amount, sign)
+        try:
+            day = date.fromisoformat(expense.date)
+        except ValueError:
+            day = None
+        if day is not None:
+            category = expense.category.casefold()
+            for period in BUDGET_PERIODS:
+                self._bump(self._period_totals, (category, period_window_key(period, day)), amount, sign)
+        for tag in tags:
+            self._bump(self._tag_totals, tag, amount, sign)
+
+    @staticmethod
+    def _bump(totals: Dict, key, amount: float, count: int) -> None:
+        """Adjust one aggregate entry, dropping it once no expenses remain."""
+        entry = totals.get(key)
+        if entry is None:
+            totals[key] = [amount, count]
+        elif entry[1] + count:
+            entry[0] += amount
+            entry[1] += count
+        else:
+            del totals[key]
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[str, None]], key: str, expense_id: str) -> None:
+        """Remove an ID from an inverted index bucket, dropping empty buckets."""
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(expense_id, None)
+            if not bucket:
+                del index[key]
+
+    def build_expense(self, amount: float, category: str, description: str,
+                       date: str = None, tags: List[str] = None,
+                       is_recurring: bool = False, recurrence_period: str = None) -> Expense:
+        """Validate expense fields and build an Expense, without adding it to the tracker."""
         if amount <= 0:
             raise ValueError("Amount must be positive")
         if not category or not description:
             raise ValueError("Category and description cannot be empty")
+        if recurrence_period is not None:
+            recurrence_period = recurrence_period.strip().lower()
         if is_recurring and not recurrence_period:
             raise ValueError("Recurring expenses must specify a period")
-        expense = Expense(amount, category, description, date, tags, is_recurring, recurrence_period)
-        self.expenses.append(expense)
-        self._save_to_file()
+        if is_recurring and recurrence_period not in RECURRENCE_PERIODS:
+            raise ValueError(f"Invalid recurrence period: {recurrence_period}")
+        return Expense(amount, category, description, date, tags, is_recurring, recurrence_period)
+
+    @instrumented
+    def add_expense(self, amount: float, category: str, description: str, 
+                    date: str = None, tags: List[str] = None, 
+                    is_recurring: bool = False, recurrence_period: str = None) -> str:
+        """Add a new expense and return its ID."""
+        expense = self.build_expense(amount, category, description, date, tags,
+                                      is_recurring, recurrence_period)
+        self._insert(expense)
+        self._record("add", {"expense": expense.to_dict()})
         return expense.id
 
+    @instrumented
+    def add_expenses(self, expenses: Iterable[Dict]) -> List[str]:
+        """Add many expenses, given as add_expense keyword dicts, with a single save.
+
+        Every entry is validated before any is added, so one bad entry leaves
+        the tracker unchanged.
+        """
+        new_expenses = [self.build_expense(**item) for item in expenses]
+        with self.batch():
+            for expense in new_expenses:
+                self._insert(expense)
+                self._record("add", {"expense": expense.to_dict()})
+        return [expense.id for expense in new_expenses]
+
+    @contextmanager
+    def batch(self) -> Iterator['ExpenseTracker']:
+        """Group mutations so they are persisted once on exit.
+
+        If the block raises, the in-memory expenses are rolled back to their
+        state on entry and nothing is written. Only the expenses the block
+        touches are remembered for that, so opening a batch costs nothing
+        however many expenses there are. Rolled-back expenses may come back
+        in a different iteration order. Nested batches join the outermost one.
+        """
+        if self._pending is not None:
+            yield self
+            return
+        self._pending, self._undo, self._entry = [], {}, None
+        try:
+            yield self
+        except BaseException:
+            undo, entry = self._undo, self._entry
+            self._pending, self._undo, self._entry = None, None, None
+            self._rollback(undo, entry)
+            raise
+        records, self._pending, self._undo, self._entry = self._pending, None, None, None
+        if records:
+            self._write(records)
+
+    def _rollback(self, undo: Dict[str, Optional[Dict]], entry: Optional[List[Dict]]) -> None:
+        """Restore the state on entry to a batch from its undo entries, or from its entry state."""
+        if entry is not None:
+            self._reset(map(Expense.from_dict, entry))
+            return
+        for expense_id, record in undo.items():
+            current = self._expenses.get(expense_id)
+            if record is not None:
+                self._insert(Expense.from_dict(record))
+            elif current is not None:
+                self._remove(current)
+
+    @instrumented
     def get_expense_by_id(self, expense_id: str) -> Optional[Dict]:
         """Retrieve an expense by its ID."""
-        for expense in self.expenses:
-            if expense.id == expense_id:
-                return expense.to_dict()
-        return None
+        expense = self._expenses.get(expense_id)
+        return expense.to_dict() if expense else None
 
+    @instrumented
     def get_expenses_by_category(self, category: str) -> List[Dict]:
-        """Retrieve expenses for a specific category."""
-        return [exp.to_dict() for exp in self.expenses if exp.category.lower() == category.lower()]
+        """Retrieve expenses for a specific category (case-insensitive)."""
+        ids = self._by_category.get(category.casefold(), {})
+        return [self._expenses[expense_id].to_dict() for expense_id in ids]
 
+    @instrumented
     def get_expenses_by_tag(self, tag: str) -> List[Dict]:
-        """Retrieve expenses with a specific tag."""
-        return [exp.to_dict() for exp in self.expenses if tag.lower() in [t.lower() for t in exp.tags]]
-
-    def get_total_expenses(self, start_date: str = None, end_date: str = None) -> float:
-        """Calculate total expenses, optionally within a date range."""
-        total = 0.0
-        for expense in self.expenses:
-            if start_date and end_date:
-                if start_date <= expense.date <= end_date:
-                    total += expense.amount
-            else:
-                total += expense.amount
+        """Retrieve expenses with a specific tag (case-insensitive)."""
+        ids = self._by_tag.get(tag.casefold(), {})
+        return [self._expenses[expense_id].to_dict() for expense_id in ids]
+
+    def distinct_categories(self) -> List[str]:
+        """List the distinct categories in use, ignoring case."""
+        return sorted(self._expenses[next(iter(ids))].category
+                      for ids in self._by_category.values())
+
+    def distinct_tags(self) -> List[str]:
+        """List the distinct tags in use, ignoring case."""
+        tags = []
+        for key, ids in self._by_tag.items():
+            expense = self._expenses[next(iter(ids))]
+            tags.append(next(tag for tag in expense.tags if tag.casefold() == key))
+        return sorted(tags)
+
+    def get_expenses_between(self, start_date: str = None, end_date: str = None) -> Iterator[Dict]:
+        """Yield expenses dated within an inclusive range; either bound may be omitted."""
+        for expense_id in self.date_index.ids(start_date, end_date):
+            yield self._expenses[expense_id].to_dict()
+
+    def get_category_amounts(self, start_date: str = None,
+                             end_date: str = None) -> Iterator[Tuple[str, float]]:
+        """Yield (category, amount) for expenses dated within an inclusive range, in date order.
+
+        The same rows as get_expenses_between, without building a dict per
+        expense. Positions within ``date_index.span`` line up with them.
+        """
+        expenses = self._expenses
+        for expense_id in self.date_index.ids(start_date, end_date):
+            expense = expenses[expense_id]
+            yield expense.category, expense.amount
+
+    def iter_expenses(self, filter: Callable[[Dict], bool] = None) -> Iterator[Dict]:
+        """Stream persisted expense records from storage without loading the tracker.
+
+        Records are parsed one at a time where the backend supports it
+        (JSONLinesStorage, SQLiteStorage). Only records for which ``filter``
+        returns true are yielded. Changes held in an open batch are not
+        visible yet.
+        """
+        for record in self.storage.iter_expenses(self.user_id):
+            if filter is None or filter(record):
+                yield record
+
+    def get_occurrences(self, start_date: str = None, end_date: str = None) -> Iterator[Dict]:
+        """Yield stored expenses and repeat occurrences of recurring ones, in date order.
+
+        Repeat occurrences carry a ``recurrence_of`` field with the original
+        expense ID. An omitted ``end_date`` stops repeats at today.
+        """
+        return merge(self.get_expenses_between(start_date, end_date),
+                     self.recurrence.occurrences(start_date, end_date), key=itemgetter("date"))
+
+    @instrumented
+    def get_total_expenses(self, start_date: str = None, end_date: str = None,
+                           expand_recurring: bool = False) -> float:
+        """Calculate total expenses, optionally within a date range.
+
+        Either bound may be omitted for an open-ended range. With
+        ``expand_recurring`` the repeat occurrences of recurring expenses
+        are included too, up to today when ``end_date`` is omitted.
+        """
+        total = self.date_index.total(start_date, end_date)
+        if expand_recurring:
+            total += self.recurrence.total(start_date, end_date)
         return total
 
+    @instrumented
+    def get_category_totals(self, month: str = None) -> Dict[str, float]:
+        """Total spending per category, for one YYYY-MM month or all time."""
+        if month is None:
+            return {category: entry[0] for category, entry in self._category_totals.items()}
+        return {category: entry[0] for (category, entry_month), entry
+                in self._category_month_totals.items() if entry_month == month}
+
+    @instrumented
+    def get_monthly_totals(self, category: str = None) -> Dict[str, float]:
+        """Total spending per YYYY-MM month, for one category or all of them."""
+        if category is None:
+            return {month: entry[0] for month, entry in self._month_totals.items()}
+        return {month: entry[0] for (entry_category, month), entry
+                in self._category_month_totals.items() if entry_category == category}
+
+    def get_category_day_totals(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield (category, day, total) for every category and day with spending, in no set order."""
+        for (category, day), entry in self._category_day_totals.items():
+            yield category, day, entry[0]
+
+    def get_tag_totals(self) -> Dict[str, float]:
+        """Total spending per case-folded tag."""
+        return {tag: entry[0] for tag, entry in self._tag_totals.items()}
+
+    @instrumented
+    def get_period_total(self, category: str, period: str, day: date = None) -> float:
+        """Spending in a category (case-insensitive) over the calendar window containing a day.
+
+        The window is the day, ISO week, month or year of ``day`` (default
+        today), according to ``period``.
+        """
+        key = period_window_key(period, day or datetime.now().date())
+        entry = self._period_totals.get((category.casefold(), key))
+        return entry[0] if entry else 0.0
+
     def get_recurring_expenses(self) -> List[Dict]:
         """Retrieve all recurring expenses."""
-        return [exp.to_dict() for exp in self.expenses if exp.is_recurring]
+        return [exp.to_dict() for exp in self._expenses.values() if exp.is_recurring]
 
+    @instrumented
     def delete_expense(self, expense_id: str) -> bool:
         """Delete an expense by ID."""
-        initial_len = len(self.expenses)
-        self.expenses = [exp for exp in self.expenses if exp.id != expense_id]
-        if len(self.expenses) < initial_len:
-            self._save_to_file()
-            return True
-        return False
+        expense = self._expenses.get(expense_id)
+        if expense is None:
+            return False
+        self._remove(expense)
+        self._record("delete", {"id": expense_id})
+        return True
 
+    @instrumented
     def update_expense(self, expense_id: str, amount: float = None, category: str = None,
                       description: str = None, tags: List[str] = None) -> bool:
         """Update an existing expense."""
-        for expense in self.expenses:
-            if expense.id == expense_id:
-                if amount is not None:
-                    if amount <= 0:
-                        raise ValueError("Amount must be positive")
-                    expense.amount = float(amount)
-                if category is not None:
-                    if not category:
-                        raise ValueError("Category cannot be empty")
-                    expense.category = category.strip()
-                if description is not None:
-                    if not description:
-                        raise ValueError("Description cannot be empty")
-                    expense.description = description.strip()
-                if tags is not None:
-                    expense.tags = tags
-                self._save_to_file()
-                return True
-        return False
+        expense = self._expenses.get(expense_id)
+        if expense is None:
+            return False
+        if amount is not None and amount <= 0:
+            raise ValueError("Amount must be positive")
+        if category is not None and not category:
+            raise ValueError("Category cannot be empty")
+        if description is not None and not description:
+            raise ValueError("Description cannot be empty")
+        self._touch(expense_id)
+        self.version += 1
+        self._unindex_keys(expense)
+        if amount is not None:
+            expense.amount = float(amount)
+            self.date_index.set_amount(expense_id, expense.date, expense.amount)
+        if category is not None:
+            expense.category = category.strip()
+        if description is not None:
+            expense.description = description.strip()
+        if tags is not None:
+            expense.tags = list(tags)
+        self._index_keys(expense)
+        self._record("update", {"expense": expense.to_dict()})
+        return True
+
+    def _record(self, op: str, payload: Dict) -> None:
+        """Persist a single mutation, or queue it if a batch is open."""
+        record = {"op": op, **payload}
+        if self._pending is not None:
+            self._pending.append(record)
+        else:
+            self._write([record])
+
+    @instrumented
+    def _write(self, records: List[Dict]) -> None:
+        """Hand mutation records to the storage backend."""
+        self.storage.write_expenses(self.user_id, records, self._snapshot)
+
+    def _snapshot(self) -> List[Dict]:
+        """Serialize every expense."""
+        return [exp.to_dict() for exp in self._expenses.values()]
+
+    @instrumented
+    def compact(self) -> None:
+        """Write a full snapshot, folding in any journal entries."""
+        self._save_to_file()
 
     def _save_to_file(self) -> None:
-        """Save expenses to a JSON file."""
-        with open(self.data_file, 'w') as f:
-            json.dump([exp.to_dict() for exp in self.expenses], f, indent=2)
+        """Save all expenses through the storage backend."""
+        self.storage.save_expenses(self.user_id, self._snapshot())
 
+    @instrumented
     def load_from_file(self) -> None:
-        """Load expenses from a JSON file."""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.expenses = [Expense.from_dict(item) for item in data]
-        except FileNotFoundError:
-            self.expenses = []
+        """Load expenses from the storage backend."""
+        self._reset(map(Expense.from_dict, self.storage.load_expenses(self.user_id)))
 
     def __str__(self) -> str:
         """String representation of the expense tracker."""
-        return f"ExpenseTracker for user {self.user_id} with {len(self.expenses)} expenses"
\ No newline at end of file
+        return f"ExpenseTracker for user {self.user_id} with {len(self._expenses)} expenses"
\ No newline at end of file
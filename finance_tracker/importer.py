@@ -0,0 +1,245 @@
+import csv
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+from finance_tracker.expenses import ExpenseTracker
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+# Currency symbols, codes and spaces (including thousands spaces) around an amount.
+_AMOUNT_NOISE = re.compile(r"[^\d.,+\-()]")
+# Decimal mark -> amount pattern with optional sign, grouped or plain whole part, and fraction.
+_AMOUNT_PATTERNS = {
+    ".": re.compile(r"([+-]?)(\d{1,3}(?:,\d{3})+|\d*)(?:\.(\d+))?"),
+    ",": re.compile(r"([+-]?)(\d{1,3}(?:\.\d{3})+|\d*)(?:,(\d+))?"),
+}
+
+
+def parse_amount(text: str, decimal: str = ".") -> float:
+    """Parse a statement amount such as "$1,204.50", "-3.10" or "(42.50)".
+
+    ``decimal`` is the decimal mark; the other of "." and "," may only
+    group thousands. Parentheses mark a negative amount, as in accounting.
+    Anything else, such as a decimal comma when ``decimal`` is ".", raises
+    ValueError rather than being guessed at.
+    """
+    if decimal not in _AMOUNT_PATTERNS:
+        raise ValueError(f"Invalid decimal mark: {decimal!r}")
+    cleaned = _AMOUNT_NOISE.sub("", text or "")
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    if negative:
+        cleaned = cleaned[1:-1]
+    match = _AMOUNT_PATTERNS[decimal].fullmatch(cleaned)
+    if match is None or not (match.group(2) or match.group(3)):
+        raise ValueError(f"Invalid amount: {text!r}")
+    sign, whole, fraction = match.groups()
+    amount = float(f"{whole.replace(',' if decimal == '.' else '.', '') or '0'}.{fraction or '0'}")
+    if sign == "-":
+        amount = -amount
+    return -amount if negative else amount
+
+
+class ColumnMapping:
+    """Describes how statement columns map onto expense fields.
+
+    ``category`` and ``tags`` name optional columns. Rows without a
+    category get ``default_category``, and tags are split on commas. With
+    ``debits_negative``, money out is negative in the statement: those rows
+    are imported with the sign flipped, and positive rows (money in) are
+    skipped. ``decimal`` is the amounts' decimal mark ("." or ","). ``id``
+    names an optional column with the bank's transaction ID; rows in one
+    statement that share an ID are the same transaction.
+    """
+    def __init__(self, amount: str = "amount", description: str = "description", date: str = "date",
+                 category: str = None, tags: str = None, date_format: str = "%Y-%m-%d",
+                 default_category: str = "Uncategorized", debits_negative: bool = False,
+                 decimal: str = ".", id: str = None):
+        if decimal not in _AMOUNT_PATTERNS:
+            raise ValueError(f"Invalid decimal mark: {decimal!r}")
+        self.amount = amount
+        self.description = description
+        self.date = date
+        self.category = category
+        self.tags = tags
+        self.date_format = date_format
+        self.default_category = default_category
+        self.debits_negative = debits_negative
+        self.decimal = decimal
+        self.id = id
+
+
+OFX_MAPPING = ColumnMapping(amount="TRNAMT", description="NAME", date="DTPOSTED", date_format="%Y%m%d",
+                            debits_negative=True, id="FITID")
+
+
+class ImportResult:
+    """Counts and row errors from one import."""
+    def __init__(self):
+        self.imported = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.errors: List[Tuple[int, str]] = []
+
+    def to_dict(self) -> Dict:
+        """Convert the result to a dictionary."""
+        return {
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "skipped": self.skipped,
+            "errors": self.errors
+        }
+
+
+def fingerprint(date: str, amount: float, description: str) -> bytes:
+    """Hash identifying an expense by date, amount and description."""
+    key = f"{date}|{amount:.2f}|{description.strip().casefold()}"
+    return hashlib.sha256(key.encode()).digest()[:16]
+
+
+class StatementImporter:
+    """Streams bank statement rows into an ExpenseTracker.
+
+    Rows are read one at a time and checked with the same rules as
+    add_expense. They are committed through add_expenses every
+    ``chunk_size`` rows, so each chunk is saved once. Invalid rows are
+    reported with their row number and do not stop the import.
+
+    Duplicates are found by counting (date, amount, description)
+    fingerprints. If the tracker already holds k expenses with a
+    fingerprint, the first k rows with it are duplicates and any further
+    ones are imported, so two identical coffees on one day both count,
+    while importing the same statement twice adds nothing. When the mapping
+    has an ``id`` column (FITID for OFX), a row repeating an earlier row's
+    ID is a duplicate. Expenses do not keep those IDs, so matching against
+    the tracker still uses the fingerprints.
+    """
+    def __init__(self, tracker: ExpenseTracker, mapping: ColumnMapping = None, chunk_size: int = 1000):
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        self.tracker = tracker
+        self.mapping = mapping or ColumnMapping()
+        self.chunk_size = chunk_size
+        self._fingerprints: Optional[Counter] = None
+        self._version = None
+
+    def _known_fingerprints(self) -> Counter:
+        """How many of the tracker's expenses have each fingerprint, rebuilt only after outside changes."""
+        if self._fingerprints is None or self._version != self.tracker.version:
+            self._fingerprints = Counter(fingerprint(exp["date"], exp["amount"], exp["description"])
+                                         for exp in self.tracker.get_expenses_between())
+        return self._fingerprints
+
+    def import_csv(self, source, mapping: ColumnMapping = None) -> ImportResult:
+        """Import a CSV file (path or open file) with a header row."""
+        if isinstance(source, str):
+            with open(source, newline="", encoding="utf-8-sig") as f:
+                return self.import_rows(csv.DictReader(f), mapping, first_row=2)
+        return self.import_rows(csv.DictReader(source), mapping, first_row=2)
+
+    def import_ofx(self, source, mapping: ColumnMapping = None) -> ImportResult:
+        """Import the transactions of an OFX statement (path or open file)."""
+        if isinstance(source, str):
+            with open(source, encoding="utf-8", errors="replace") as f:
+                return self.import_rows(iter_ofx_transactions(f), mapping or OFX_MAPPING)
+        return self.import_rows(iter_ofx_transactions(source), mapping or OFX_MAPPING)
+
+    def import_rows(self, rows: Iterable[Dict], mapping: ColumnMapping = None,
+                    first_row: int = 1) -> ImportResult:
+        """Import mapped rows, committing every chunk_size valid rows."""
+        mapping = mapping or self.mapping
+        result = ImportResult()
+        known = self._known_fingerprints()
+        try:
+            self._import(rows, mapping, first_row, known, result)
+        except BaseException:
+            self._fingerprints = None
+            raise
+        self._version = self.tracker.version
+        return result
+
+    def _import(self, rows: Iterable[Dict], mapping: ColumnMapping, first_row: int,
+                known: Counter, result: ImportResult) -> None:
+        chunk: List[Dict] = []
+        seen: Counter = Counter()
+        ids: Set[str] = set()
+        for row_number, row in enumerate(rows, first_row):
+            try:
+                item = self._map_row(row, mapping)
+                if item is None:
+                    result.skipped += 1
+                    continue
+                self.tracker.build_expense(**item)
+            except (KeyError, ValueError) as e:
+                result.errors.append((row_number, f"{type(e).__name__}: {e}"))
+                continue
+            transaction_id = (row.get(mapping.id) or "").strip() if mapping.id else ""
+            if transaction_id:
+                if transaction_id in ids:
+                    result.duplicates += 1
+                    continue
+                ids.add(transaction_id)
+            key = fingerprint(item["date"], item["amount"], item["description"])
+            seen[key] += 1
+            if seen[key] <= known[key]:
+                result.duplicates += 1
+                continue
+            known[key] += 1
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                result.imported += len(self.tracker.add_expenses(chunk))
+                chunk = []
+        if chunk:
+            result.imported += len(self.tracker.add_expenses(chunk))
+
+    @staticmethod
+    def _map_row(row: Dict, mapping: ColumnMapping) -> Optional[Dict]:
+        """Turn a statement row into add_expense keyword arguments, or None to skip it."""
+        amount = parse_amount(row[mapping.amount], mapping.decimal)
+        if mapping.debits_negative:
+            if amount >= 0:
+                return None
+            amount = -amount
+        day = datetime.strptime((row[mapping.date] or "").strip(), mapping.date_format)
+        category = (row.get(mapping.category) or "").strip() if mapping.category else ""
+        tags = (row.get(mapping.tags) or "") if mapping.tags else ""
+        return {
+            "amount": amount,
+            "category": category or mapping.default_category,
+            "description": (row[mapping.description] or "").strip(),
+            "date": day.strftime("%Y-%m-%d"),
+            "tags": [tag.strip() for tag in tags.split(",") if tag.strip()]
+        }
+
+
+def iter_ofx_transactions(f: IO[str], block_size: int = 65536) -> Iterator[Dict[str, str]]:
+    """Yield each <STMTTRN> block of an OFX file as a tag -> value dict.
+
+    The file is read in blocks, so statements of any size stream in
+    constant memory. Both SGML (unclosed tags) and XML-style OFX are
+    accepted. DTPOSTED is cut to its YYYYMMDD date, and MEMO stands in for
+    a missing NAME.
+    """
+    transaction: Optional[Dict[str, str]] = None
+    buffer = ""
+    while True:
+        block = f.read(block_size)
+        buffer += block
+        cut = buffer.rfind("<") if block else len(buffer)
+        if cut < 0:
+            cut = len(buffer)
+        text, buffer = buffer[:cut], buffer[cut:]
+        for closing, tag, value in _OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and transaction is not None:
+                    if "DTPOSTED" in transaction:
+                        transaction["DTPOSTED"] = transaction["DTPOSTED"][:8]
+                    if "MEMO" in transaction:
+                        transaction.setdefault("NAME", transaction["MEMO"])
+                    yield transaction
+                transaction = None if closing else {}
+            elif transaction is not None and not closing:
+                transaction[tag] = value.strip()
+        if not block:
+            return
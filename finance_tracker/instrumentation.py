@@ -0,0 +1,165 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Off unless FINANCE_TRACKER_STATS is set.
+_enabled = os.environ.get("FINANCE_TRACKER_STATS", "") not in ("", "0")
+_lock = threading.Lock()
+_stats: Dict[str, 'OperationStats'] = {}
+# (class, attribute, plain function, timing wrapper) for every instrumented method.
+_probes: List[Tuple[type, str, Callable, Callable]] = []
+
+
+class OperationStats:
+    """Call count, latency histogram and byte counts for one operation.
+
+    Latencies are bucketed by powers of two of microseconds: bucket k
+    counts calls that took less than 2**k microseconds but at least
+    2**(k-1).
+    """
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets: Dict[int, int] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        """Add one call's latency."""
+        self.count += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the given fraction of calls."""
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return (1 << bucket) / 1e6
+        return 0.0
+
+    def to_dict(self) -> Dict:
+        """Convert the statistics to a dictionary."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "histogram_us": {str(1 << bucket): self.buckets[bucket] for bucket in sorted(self.buckets)},
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written
+        }
+
+
+def enable() -> None:
+    """Start recording by installing the timing wrappers."""
+    global _enabled
+    _enabled = True
+    _install()
+
+
+def disable() -> None:
+    """Stop recording and restore the plain methods; collected statistics are kept."""
+    global _enabled
+    _enabled = False
+    _install()
+
+
+def _install() -> None:
+    for owner, attr, fn, wrapper in _probes:
+        setattr(owner, attr, wrapper if _enabled else fn)
+
+
+def enabled() -> bool:
+    """Whether calls are being recorded."""
+    return _enabled
+
+
+def reset() -> None:
+    """Discard all collected statistics."""
+    with _lock:
+        _stats.clear()
+
+
+def _get(name: str) -> OperationStats:
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = OperationStats()
+    return stats
+
+
+def record(name: str, seconds: float, failed: bool = False) -> None:
+    """Record one call of an operation."""
+    with _lock:
+        _get(name).record(seconds, failed)
+
+
+def add_bytes(name: str, read: int = 0, written: int = 0) -> None:
+    """Attribute bytes read or written to an operation."""
+    with _lock:
+        stats = _get(name)
+        stats.bytes_read += read
+        stats.bytes_written += written
+
+
+class _Probe:
+    """Placeholder that registers a method for instrumentation when its class is created."""
+    def __init__(self, fn: Callable, name: str = None):
+        self.fn = fn
+        self.name = name
+
+    def __set_name__(self, owner: type, attr: str) -> None:
+        fn, op = self.fn, self.name or f"{owner.__name__}.{attr}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(op, time.perf_counter() - started, failed)
+        _probes.append((owner, attr, fn, wrapper))
+        setattr(owner, attr, wrapper if _enabled else fn)
+
+
+def instrumented(fn: Callable = None, name: str = None):
+    """Method decorator recording each call under ``<Class>.<method>`` (or ``name``).
+
+    While recording is off the class holds the undecorated function, so
+    instrumented methods cost nothing extra. enable() and disable() swap
+    the timing wrappers in and out.
+    """
+    if fn is None:
+        return lambda f: _Probe(f, name)
+    return _Probe(fn, name)
+
+
+def snapshot() -> Dict[str, Dict]:
+    """All statistics, keyed by operation name."""
+    with _lock:
+        return {name: stats.to_dict() for name, stats in sorted(_stats.items())}
+
+
+def export_json(path: Optional[str] = None) -> str:
+    """Serialize the statistics as JSON, also writing them to path if given."""
+    text = json.dumps({"enabled": _enabled, "operations": snapshot()}, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text)
+    return text
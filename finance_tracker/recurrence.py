@@ -0,0 +1,218 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from heapq import merge
+from itertools import count
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+from finance_tracker.timeseries import bucket_index, bucket_label, bucket_start
+
+# Period -> (days, months) between consecutive occurrences.
+RECURRENCE_STEPS: Dict[str, Tuple[int, int]] = {
+    "daily": (1, 0),
+    "weekly": (7, 0),
+    "biweekly": (14, 0),
+    "monthly": (0, 1),
+    "quarterly": (0, 3),
+    "yearly": (0, 12),
+}
+RECURRENCE_PERIODS = tuple(RECURRENCE_STEPS)
+
+
+def _parse(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+class Schedule:
+    """Occurrences of one recurring expense.
+
+    Occurrence 0 is the stored expense itself; occurrence n falls n periods
+    later. Month-based periods keep the original day of the month, clamped
+    to the month's last day (a charge on the 31st falls on 28 February).
+    Any occurrence can be located, and occurrences in a range counted,
+    without stepping through the ones before it.
+    """
+    def __init__(self, record: Dict):
+        self.record = record
+        self.start = date.fromisoformat(record["date"])
+        self.days, self.months = RECURRENCE_STEPS[record["recurrence_period"]]
+
+    def occurrence(self, n: int) -> date:
+        """Date of the n-th occurrence."""
+        if self.days:
+            return self.start + timedelta(days=self.days * n)
+        month = self.start.month - 1 + self.months * n
+        year, month = self.start.year + month // 12, month % 12 + 1
+        return date(year, month, min(self.start.day, monthrange(year, month)[1]))
+
+    def index_on_or_after(self, day: date) -> int:
+        """Index of the first occurrence on or after a day."""
+        if day <= self.start:
+            return 0
+        if self.days:
+            return -(-(day - self.start).days // self.days)
+        n = ((day.year - self.start.year) * 12 + day.month - self.start.month) // self.months
+        return n + 1 if self.occurrence(n) < day else n
+
+    def bounds(self, first: Optional[date], last: date) -> Tuple[int, int]:
+        """Range of repeat occurrence indexes (never 0) falling between two inclusive dates."""
+        lo = max(1, self.index_on_or_after(first)) if first else 1
+        hi = self.index_on_or_after(last + timedelta(days=1))
+        return lo, max(lo, hi)
+
+    def count(self, first: Optional[date], last: date) -> int:
+        """Number of repeat occurrences between two inclusive dates."""
+        lo, hi = self.bounds(first, last)
+        return hi - lo
+
+    def dates(self, first: Optional[date], last: date) -> Iterator[date]:
+        """Yield repeat occurrence dates between two inclusive dates, one at a time."""
+        lo, hi = self.bounds(first, last)
+        for n in range(lo, hi):
+            yield self.occurrence(n)
+
+
+class RecurrenceEngine:
+    """Expands recurring expenses into their repeat occurrences on demand.
+
+    The stored expense is the first occurrence and is already counted by
+    the tracker, so everything here covers only the later ones. Ranges are
+    inclusive ISO dates. An omitted start means "from the first
+    occurrence", and an omitted end means today, since a subscription has
+    no end date. Occurrences are generated lazily and totals are counted
+    arithmetically per schedule, so a daily charge running for decades
+    never produces a row per day. Computed totals are cached until a
+    recurring expense is added, changed or removed.
+    """
+    def __init__(self):
+        self._schedules: Dict[str, Schedule] = {}
+        self._cache: Dict[tuple, object] = {}
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def add(self, expense) -> None:
+        """Register a recurring expense, replacing any with the same ID.
+
+        Expenses with a non-ISO date or an unknown period cannot be expanded
+        and are ignored.
+        """
+        self.remove(expense.id)
+        if not expense.is_recurring or expense.recurrence_period not in RECURRENCE_STEPS:
+            return
+        try:
+            schedule = Schedule(expense.to_dict())
+        except ValueError:
+            return
+        self._schedules[expense.id] = schedule
+        self._cache.clear()
+
+    def remove(self, expense_id: str) -> None:
+        """Forget a recurring expense."""
+        if self._schedules.pop(expense_id, None) is not None:
+            self._cache.clear()
+
+    @staticmethod
+    def _range(start_date: str = None, end_date: str = None) -> Tuple[Optional[date], date]:
+        return _parse(start_date), _parse(end_date) or date.today()
+
+    def occurrences(self, start_date: str = None, end_date: str = None) -> Iterator[Dict]:
+        """Yield repeat occurrences as expense dictionaries, in date order.
+
+        Each is a copy of the recurring expense with its own ``date`` and a
+        ``recurrence_of`` field holding the original expense ID.
+        """
+        first, last = self._range(start_date, end_date)
+
+        def expand(schedule: Schedule) -> Iterator[Tuple[str, int, Dict]]:
+            record = schedule.record
+            for day in schedule.dates(first, last):
+                yield day.isoformat(), next(tiebreak), record
+
+        tiebreak = count()
+        streams = [expand(schedule) for schedule in self._schedules.values()]
+        for day, _, record in merge(*streams, key=itemgetter(0, 1)):
+            yield {**record, "tags": list(record["tags"]), "date": day, "recurrence_of": record["id"]}
+
+    def _cached(self, key: tuple, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def total(self, start_date: str = None, end_date: str = None) -> float:
+        """Total amount of repeat occurrences in a range."""
+        first, last = self._range(start_date, end_date)
+        return self._cached(("total", first, last), lambda: sum(
+            schedule.record["amount"] * schedule.count(first, last) for schedule in self._schedules.values()))
+
+    def category_totals(self, start_date: str = None, end_date: str = None) -> Dict[str, float]:
+        """Amount of repeat occurrences per category, for categories with any in the range."""
+        first, last = self._range(start_date, end_date)
+
+        def compute() -> Dict[str, float]:
+            totals = {}
+            for schedule in self._schedules.values():
+                occurrences = schedule.count(first, last)
+                if occurrences:
+                    category = schedule.record["category"]
+                    totals[category] = totals.get(category, 0.0) + schedule.record["amount"] * occurrences
+            return totals
+        return dict(self._cached(("category_totals", first, last), compute))
+
+    def bucket_totals(self, start_date: str = None, end_date: str = None,
+                      granularity: str = "monthly") -> Dict[str, Dict[int, float]]:
+        """Amount of repeat occurrences per category and calendar bucket in a range.
+
+        Buckets are numbered as by timeseries.bucket_index, and only buckets
+        with occurrences are present.
+        """
+        first, last = self._range(start_date, end_date)
+
+        def compute() -> Dict[str, Dict[int, float]]:
+            # Schedules with the same start, period and category are expanded
+            # once, with their amounts summed. Sums accumulate in one slot per bucket.
+            groups: Dict[Tuple[date, int, int, str], list] = {}
+            for schedule in self._schedules.values():
+                key = (schedule.start, schedule.days, schedule.months, schedule.record["category"])
+                group = groups.setdefault(key, [schedule, 0.0])
+                group[1] += schedule.record["amount"]
+            if not groups:
+                return {}
+            origin = bucket_index(min(max(first or schedule.start, schedule.start)
+                                      for schedule, _ in groups.values()), granularity)
+            slots = bucket_index(last, granularity) - origin + 1
+            if slots <= 0:
+                return {}
+            # Exclusive end of each slot, as a day ordinal; the last slot ends after ``last``.
+            ends = [bucket_start(index, granularity).toordinal()
+                    for index in range(origin + 1, origin + slots)] + [last.toordinal() + 1]
+            sums: Dict[str, List[float]] = {}
+            for schedule, amount in groups.values():
+                lo, hi = schedule.bounds(first, last)
+                if lo >= hi:
+                    continue
+                slot_sums = sums.setdefault(schedule.record["category"], [0.0] * slots)
+                if schedule.months:
+                    for n in range(lo, hi):
+                        slot_sums[bucket_index(schedule.occurrence(n), granularity) - origin] += amount
+                    continue
+                # Day-based periods: occurrences before a slot's end are counted arithmetically.
+                start, step = schedule.start.toordinal(), schedule.days
+                done = lo
+                for slot in range(bucket_index(schedule.occurrence(lo), granularity) - origin, slots):
+                    before = min(hi, -((start - ends[slot]) // step))
+                    slot_sums[slot] += amount * (before - done)
+                    done = before
+                    if done >= hi:
+                        break
+            return {category: {origin + slot: total for slot, total in enumerate(slot_sums) if total}
+                    for category, slot_sums in sums.items()}
+        return {category: dict(buckets) for category, buckets
+                in self._cached(("bucket_totals", first, last, granularity), compute).items()}
+
+    def monthly_totals(self, start_date: str = None, end_date: str = None) -> Dict[str, float]:
+        """Amount of repeat occurrences per YYYY-MM month in a range."""
+        totals: Dict[int, float] = {}
+        for buckets in self.bucket_totals(start_date, end_date, "monthly").values():
+            for index, amount in buckets.items():
+                totals[index] = totals.get(index, 0.0) + amount
+        return {bucket_label(index, "monthly"): totals[index] for index in sorted(totals)}
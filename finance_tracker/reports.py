@@ -1,31 +1,199 @@
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from finance_tracker.expenses import ExpenseTracker
 from finance_tracker.budgets import BudgetManager
-from datetime import datetime, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
+from finance_tracker.charts import ChartRenderer, default_renderer
+from finance_tracker.instrumentation import instrumented
+from finance_tracker.timeseries import GRANULARITIES, TimeSeries, TimeSeriesEngine, bucket_index
+from collections import OrderedDict
+from concurrent.futures import Future
+from copy import deepcopy
+from datetime import date, timedelta
 import os
 import json
 
+_EPOCH = date(1970, 1, 1).toordinal()  # day 0 of snapshot date columns
+
+
+class _ExpenseColumns:
+    """NumPy view of a tracker's expenses, rows in date-index order.
+
+    It only serves category totals over arbitrary date ranges. Monthly
+    trends come from the tracker's running daily totals instead, which
+    stay current after every change; this view has to be rebuilt from
+    every expense whenever the tracker's version moves.
+
+    NumPy and pandas are imported here, on first use, so that importing
+    this module stays cheap.
+    """
+    def __init__(self, tracker: ExpenseTracker):
+        import numpy as np
+        import pandas as pd
+        self.version = tracker.version
+        count = len(tracker.date_index)
+        categories = np.empty(count, dtype=object)
+        self.amounts = np.empty(count, dtype=np.float64)
+        for row, (category, amount) in enumerate(tracker.get_category_amounts()):
+            categories[row] = category
+            self.amounts[row] = amount
+        self.category_codes, self.categories = pd.factorize(categories)
+
+    @staticmethod
+    def totals(codes: 'np.ndarray', labels, amounts: 'np.ndarray') -> Dict[str, float]:
+        """Sum amounts per code, keeping only codes that occur, in first-seen order."""
+        import numpy as np
+        import pandas as pd
+        sums = np.bincount(codes, weights=amounts, minlength=len(labels))
+        return {str(labels[code]): float(sums[code]) for code in pd.unique(codes)}
+
+
 class FinancialReport:
-    """Generates financial reports for a user."""
-    def __init__(self, user_id: str, expense_tracker: ExpenseTracker, budget_manager: BudgetManager):
+    """Generates financial reports for a user.
+
+    All-time category totals are read from the tracker's running
+    aggregates. Trends and time series are bucketed by calendar day, week,
+    month, quarter or year from its running per-category daily totals (see
+    TimeSeriesEngine). Category totals over arbitrary date ranges walk the
+    tracker's date index. On trackers holding at least
+    ``VECTORIZE_THRESHOLD`` expenses, once ``VECTORIZE_AFTER`` such queries
+    have run without the data changing, a NumPy column view of the expenses
+    is built and later ranges are sliced from it. The view costs several
+    loop queries to build and is dropped as soon as the data changes, so
+    data that changes between queries never pays for it.
+
+    Charts are rendered off the caller's thread by a ChartRenderer (the
+    process-wide one unless ``renderer`` is given). The submit_* methods
+    return futures that resolve to PNG paths.
+
+    Report results are kept in an LRU cache of ``cache_size`` entries. Each
+    entry is keyed on the report arguments, the tracker and budget versions
+    and today's date, so any change to the data, or a new day, makes a fresh
+    entry. With ``reuse_files`` set, generate_report_pdf leaves an existing
+    report file alone when its contents would not change. cache_info()
+    reports the counters.
+
+    Given an ExpenseSnapshot instead of a tracker (see from_snapshot),
+    category summaries and trends are computed directly from the
+    snapshot's memory-mapped columns.
+
+    With ``expand_recurring`` the category summary, trends and time series also
+    count the repeat occurrences of recurring expenses (see
+    ExpenseTracker.recurrence); with no end date, repeats stop at today.
+    Snapshots do not store recurrence periods, so they cannot be expanded.
+    """
+    VECTORIZE_THRESHOLD = 5000
+    VECTORIZE_AFTER = 3
+
+    def __init__(self, user_id: str, expense_tracker: ExpenseTracker, budget_manager: BudgetManager,
+                 renderer: ChartRenderer = None, cache_size: int = 32, reuse_files: bool = True,
+                 snapshot: 'ExpenseSnapshot' = None):
+        if cache_size < 0:
+            raise ValueError("Cache size cannot be negative")
         self.user_id = user_id
+        self.renderer = renderer
+        self.cache_size = cache_size
+        self.reuse_files = reuse_files
+        self._cache: OrderedDict = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._file_reuses = 0
         self.expense_tracker = expense_tracker
         self.budget_manager = budget_manager
+        self.snapshot = snapshot
         self.report_dir = f"reports_{user_id}"
+        self._columns: Optional[_ExpenseColumns] = None
+        self._range_queries = (None, 0)  # (tracker version, range queries answered at it)
+        self.time_series = TimeSeriesEngine(expense_tracker) if expense_tracker is not None else None
         os.makedirs(self.report_dir, exist_ok=True)
 
-    def generate_category_summary(self, start_date: str = None, end_date: str = None) -> Dict:
-        """Generate a summary of expenses by category."""
-        expenses = self.expense_tracker.expenses
-        if start_date and end_date:
-            expenses = [exp for exp in expenses if start_date <= exp.date <= end_date]
-        
+    @classmethod
+    def from_snapshot(cls, user_id: str, snapshot: 'ExpenseSnapshot', budget_manager: BudgetManager = None,
+                      **kwargs) -> 'FinancialReport':
+        """Build a report that reads expenses from a columnar snapshot instead of a tracker."""
+        return cls(user_id, None, budget_manager, snapshot=snapshot, **kwargs)
+
+    def _vector_columns(self) -> Optional[_ExpenseColumns]:
+        """Return the column view, or None when plain loops should be used."""
+        tracker = self.expense_tracker
+        if len(tracker.date_index) < self.VECTORIZE_THRESHOLD:
+            return None
+        if self._columns is not None and self._columns.version == tracker.version:
+            return self._columns
+        self._columns = None
+        version, count = self._range_queries
+        count = count + 1 if version == tracker.version else 1
+        self._range_queries = (tracker.version, count)
+        if count <= self.VECTORIZE_AFTER:
+            return None
+        self._columns = _ExpenseColumns(tracker)
+        return self._columns
+
+    def _range_category_totals(self, start_date: str = None, end_date: str = None) -> Dict[str, float]:
+        """Sum expenses per category over a date range, vectorized for large trackers."""
+        columns = self._vector_columns()
+        if columns is not None:
+            lo, hi = self.expense_tracker.date_index.span(start_date, end_date)
+            return columns.totals(columns.category_codes[lo:hi], columns.categories,
+                                  columns.amounts[lo:hi])
         categories = {}
-        for exp in expenses:
-            cat = exp.category
-            categories[cat] = categories.get(cat, 0.0) + exp.amount
+        for cat, amount in self.expense_tracker.get_category_amounts(start_date, end_date):
+            categories[cat] = categories.get(cat, 0.0) + amount
+        return categories
+
+    def _cached(self, key: tuple, compute: Callable):
+        """Return a copy of a cached report result, computing it on a miss."""
+        key += (self.expense_tracker.version if self.expense_tracker is not None else None,
+                self.budget_manager.version if self.budget_manager is not None else None,
+                date.today().isoformat())
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return deepcopy(self._cache[key])
+        self._misses += 1
+        result = compute()
+        if self.cache_size:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return deepcopy(result)
+
+    def cache_info(self) -> Dict:
+        """Report cache counters and occupancy."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "file_reuses": self._file_reuses,
+            "size": len(self._cache),
+            "max_size": self.cache_size
+        }
+
+    def clear_cache(self) -> None:
+        """Drop every cached report result."""
+        self._cache.clear()
+
+    def _check_expandable(self, expand_recurring: bool) -> None:
+        if expand_recurring and self.snapshot is not None:
+            raise ValueError("Recurring expenses cannot be expanded from a snapshot")
+
+    @instrumented
+    def generate_category_summary(self, start_date: str = None, end_date: str = None,
+                                  expand_recurring: bool = False) -> Dict:
+        """Generate a summary of expenses by category; either date bound may be omitted."""
+        self._check_expandable(expand_recurring)
+        return self._cached(("category_summary", start_date, end_date, expand_recurring),
+                            lambda: self._category_summary(start_date, end_date, expand_recurring))
+
+    def _category_summary(self, start_date: str = None, end_date: str = None,
+                          expand_recurring: bool = False) -> Dict:
+        if self.snapshot is not None:
+            categories = self.snapshot.category_totals(self.user_id, start_date, end_date)
+        elif not start_date and not end_date:
+            categories = self.expense_tracker.get_category_totals()
+        else:
+            categories = self._range_category_totals(start_date, end_date)
+        if expand_recurring:
+            repeats = self.expense_tracker.recurrence.category_totals(start_date, end_date)
+            for category, amount in repeats.items():
+                categories[category] = categories.get(category, 0.0) + amount
         
         return {
             "user_id": self.user_id,
@@ -34,8 +202,14 @@ class FinancialReport:
             "total": sum(categories.values())
         }
 
+    @instrumented
     def generate_budget_comparison(self, period: str = "monthly") -> List[Dict]:
         """Compare spending against budgets."""
+        return self._cached(("budget_comparison", period), lambda: self._budget_comparison(period))
+
+    def _budget_comparison(self, period: str) -> List[Dict]:
+        if self.budget_manager is None:
+            return []
         budgets = self.budget_manager.get_all_budgets()
         comparison = []
         for budget in budgets:
@@ -44,60 +218,114 @@ class FinancialReport:
                 comparison.append(status)
         return comparison
 
-    def generate_trend_analysis(self, months: int = 6) -> Dict:
+    @instrumented
+    def generate_trend_analysis(self, months: int = 6, expand_recurring: bool = False) -> Dict:
         """Analyze spending trends over the specified number of months."""
-        end_date = datetime.now()
+        self._check_expandable(expand_recurring)
+        return self._cached(("trend_analysis", months, expand_recurring),
+                            lambda: self._trend_analysis(months, expand_recurring))
+
+    def _trend_analysis(self, months: int, expand_recurring: bool = False) -> Dict:
+        # The window is the last 30 * months days; each calendar month it
+        # touches gets a bucket, clipped to the window at either end.
+        end_date = date.today()
         start_date = end_date - timedelta(days=30 * months)
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        
-        expenses = self.expense_tracker.expenses
-        expenses = [exp for exp in expenses if start_date_str <= exp.date <= end_date_str]
-        
-        monthly_data = {}
-        current_date = start_date
-        while current_date <= end_date:
-            month_key = current_date.strftime("%Y-%m")
-            monthly_data[month_key] = 0.0
-            current_date += timedelta(days=30)
-        
-        for exp in expenses:
-            month_key = exp.date[:7]  # YYYY-MM
-            monthly_data[month_key] = monthly_data.get(month_key, 0.0) + exp.amount
-        
+        series = self._series(start_date.isoformat(), end_date.isoformat(), "monthly", expand_recurring)
         return {
             "user_id": self.user_id,
             "period": f"{months} months",
-            "monthly_totals": monthly_data
+            "monthly_totals": dict(zip(series.labels, series.totals))
         }
 
+    @instrumented
+    def generate_time_series(self, start_date: str = None, end_date: str = None, granularity: str = "monthly",
+                             window: int = 3, expand_recurring: bool = False) -> Dict:
+        """Spending per calendar day, week, month, quarter or year, with per-category amounts.
+
+        Each bucket also carries a rolling average over ``window`` buckets and
+        its change from the previous bucket. See TimeSeriesEngine.series for
+        the default range.
+        """
+        self._check_expandable(expand_recurring)
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        return self._cached(("time_series", start_date, end_date, granularity, window, expand_recurring),
+                            lambda: {"user_id": self.user_id, **self._series(
+                                start_date, end_date, granularity, expand_recurring).to_dict(window)})
+
+    def _series(self, start_date: Optional[str], end_date: Optional[str], granularity: str,
+                expand_recurring: bool) -> TimeSeries:
+        if self.snapshot is None:
+            return self.time_series.series(start_date, end_date, granularity, expand_recurring)
+        # Snapshots: one category aggregate per bucket over the memory-mapped columns.
+        lo, hi = self.snapshot.user_rows(self.user_id)
+        days = self.snapshot.day
+        last = date.fromisoformat(end_date) if end_date else max(
+            date.today(), date.fromordinal(int(days[hi - 1]) + _EPOCH) if hi > lo else date.min)
+        first = date.fromisoformat(start_date) if start_date else (
+            min(date.fromordinal(int(days[lo]) + _EPOCH), last) if hi > lo else last)
+        if first > last:
+            raise ValueError("Start date cannot be after end date")
+        size = bucket_index(last, granularity) - bucket_index(first, granularity) + 1
+        series = TimeSeries(granularity, first, last, [0.0] * size, {})
+        for position in range(size):
+            bucket_first, bucket_last = series.bounds(position)
+            totals = self.snapshot.category_totals(self.user_id, bucket_first.isoformat(),
+                                                   bucket_last.isoformat())
+            for category, amount in totals.items():
+                series.categories.setdefault(category, [0.0] * size)[position] = amount
+            series.totals[position] = sum(totals.values())
+        return series
+
+    @instrumented
     def generate_report_pdf(self, report_type: str, start_date: str = None, end_date: str = None) -> str:
         """Generate a PDF report (placeholder for LaTeX generation)."""
         # Note: Actual PDF generation requires LaTeX, implemented as placeholder
         report_file = f"{self.report_dir}/{report_type}_{start_date or 'all'}_{end_date or 'all'}.txt"
+        content = ""
+        if report_type == "category_summary":
+            content = json.dumps(self.generate_category_summary(start_date, end_date), indent=2)
+        elif report_type == "budget_comparison":
+            content = json.dumps(self.generate_budget_comparison(), indent=2)
+        elif report_type == "trend_analysis":
+            content = json.dumps(self.generate_trend_analysis(), indent=2)
+        if self.reuse_files and os.path.exists(report_file):
+            with open(report_file, 'r') as f:
+                if f.read() == content:
+                    self._file_reuses += 1
+                    return report_file
         with open(report_file, 'w') as f:
-            if report_type == "category_summary":
-                report_data = self.generate_category_summary(start_date, end_date)
-                f.write(json.dumps(report_data, indent=2))
-            elif report_type == "budget_comparison":
-                report_data = self.generate_budget_comparison()
-                f.write(json.dumps(report_data, indent=2))
-            elif report_type == "trend_analysis":
-                report_data = self.generate_trend_analysis()
-                f.write(json.dumps(report_data, indent=2))
+            f.write(content)
         return report_file
 
-    def plot_category_distribution(self, start_date: str = None, end_date: str = None) -> str:
-        """Generate a pie chart of category distribution."""
+    def _renderer(self) -> ChartRenderer:
+        return self.renderer or default_renderer()
+
+    def submit_category_chart(self, start_date: str = None, end_date: str = None) -> Future:
+        """Queue a pie chart of category distribution."""
         summary = self.generate_category_summary(start_date, end_date)
-        categories = summary["category_totals"]
-        labels = list(categories.keys())
-        values = list(categories.values())
-        
-        plt.figure(figsize=(8, 8))
-        plt.pie(values, labels=labels, autopct='%1.1f%%')
-        plt.title(f"Expense Distribution for {self.user_id}")
-        plot_file = f"{self.report_dir}/category_distribution.png"
-        plt.savefig(plot_file)
-        plt.close()
-        return plot_file
\ No newline at end of file
+        return self._renderer().submit("category_pie", summary["category_totals"], self.report_dir,
+                                       f"Expense Distribution for {self.user_id}")
+
+    def submit_trend_chart(self, months: int = 6) -> Future:
+        """Queue a line chart of monthly spending."""
+        trend = self.generate_trend_analysis(months)
+        return self._renderer().submit("trend_line", trend["monthly_totals"], self.report_dir,
+                                       f"Spending Trend for {self.user_id}")
+
+    def submit_budget_chart(self, period: str = "monthly") -> Future:
+        """Queue a bar chart of budget against spending."""
+        comparison = [{"category": item["category"], "budget": item["budget"], "spent": item["spent"]}
+                      for item in self.generate_budget_comparison(period)]
+        return self._renderer().submit("budget_bars", comparison, self.report_dir,
+                                       f"{period.capitalize()} Budgets for {self.user_id}")
+
+    @instrumented
+    def plot_category_distribution(self, start_date: str = None, end_date: str = None) -> str:
+        """Generate a pie chart of category distribution and wait for it.
+
+        Returns the PNG path, ``<report_dir>/category_pie_<hash>.png``, as
+        made by the renderer (see ChartRenderer). It is no longer the fixed
+        ``category_distribution.png``; older charts are evicted.
+        """
+        return self.submit_category_chart(start_date, end_date).result()
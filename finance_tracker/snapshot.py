@@ -0,0 +1,216 @@
+import json
+import os
+import shutil
+import sys
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from finance_tracker.storage import JSONStorage, StorageBackend
+
+SNAPSHOT_FORMAT = 1
+_EPOCH = date(1970, 1, 1).toordinal()
+# Column name -> (file name, array typecode, NumPy dtype); all little-endian.
+_COLUMNS = {
+    "amount": ("amount.f8", "d", "<f8"),
+    "day": ("day.i4", "i", "<i4"),
+    "category": ("category.i4", "i", "<i4"),
+    "recurring": ("recurring.u1", "B", "u1"),
+    "tag_offsets": ("tag_offsets.i8", "q", "<i8"),
+    "tags": ("tags.i4", "i", "<i4"),
+}
+
+
+def export_snapshot(path: str, user_ids: Iterable[str] = None, storage: StorageBackend = None) -> str:
+    """Write expenses to a columnar snapshot directory and return its path.
+
+    Amounts are float64 and dates are int32 days since 1970-01-01. Each
+    category is an int32 code into the ``categories`` list in meta.json.
+    Tags are stored CSR-style: ``tag_offsets`` (int64, one more entry than
+    there are rows) bounds each row's run of codes in ``tags``. Rows are
+    grouped by user, in ``users`` order, and sorted by date within a user.
+    ``user_offsets`` bounds each user's rows. Descriptions and IDs are not
+    exported. Records stream from ``storage.iter_expenses``. When
+    ``user_ids`` is omitted, every stored user is exported.
+
+    The snapshot is written to a temporary sibling directory and renamed
+    into place. An existing snapshot at ``path`` is moved aside and
+    deleted. Files are never rewritten in place, so ExpenseSnapshots
+    already open on the old files keep reading them unchanged. An
+    existing non-empty directory that is not a snapshot is refused.
+    """
+    storage = storage or JSONStorage()
+    if user_ids is None:
+        user_ids = storage.load_users().keys()
+    columns = {name: array(typecode) for name, (_, typecode, _) in _COLUMNS.items()}
+    columns["tag_offsets"].append(0)
+    categories: Dict[str, int] = {}
+    tags: Dict[str, int] = {}
+    users: List[str] = []
+    user_offsets = [0]
+    for user_id in user_ids:
+        rows = []
+        for record in storage.iter_expenses(user_id):
+            try:
+                day = date.fromisoformat(record["date"]).toordinal() - _EPOCH
+            except (TypeError, ValueError):
+                raise ValueError(f"Snapshots require ISO dates (YYYY-MM-DD), got {record['date']!r}")
+            rows.append((day, record))
+        rows.sort(key=lambda row: row[0])
+        for day, record in rows:
+            columns["amount"].append(float(record["amount"]))
+            columns["day"].append(day)
+            columns["category"].append(categories.setdefault(record["category"], len(categories)))
+            columns["recurring"].append(1 if record.get("is_recurring") else 0)
+            columns["tags"].extend(tags.setdefault(tag, len(tags)) for tag in record.get("tags") or ())
+            columns["tag_offsets"].append(len(columns["tags"]))
+        users.append(user_id)
+        user_offsets.append(len(columns["amount"]))
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "rows": len(columns["amount"]),
+        "users": users,
+        "user_offsets": user_offsets,
+        "categories": list(categories),
+        "tags": list(tags),
+    }
+    if os.path.isdir(path) and os.listdir(path) and not os.path.exists(os.path.join(path, "meta.json")):
+        raise ValueError(f"Not a snapshot directory: {path}")
+    staging = f"{path.rstrip(os.sep)}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(staging)
+        for name, (file_name, _, _) in _COLUMNS.items():
+            column = columns[name]
+            if sys.byteorder == "big":
+                column.byteswap()
+            with open(os.path.join(staging, file_name), "wb") as f:
+                column.tofile(f)
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        _swap_into_place(staging, path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return path
+
+
+def _swap_into_place(staging: str, path: str) -> None:
+    """Rename a finished snapshot directory to path, deleting whatever snapshot was there."""
+    retired = f"{path.rstrip(os.sep)}.{os.getpid()}.old"
+    try:
+        os.rename(path, retired)
+    except FileNotFoundError:
+        retired = None
+    try:
+        os.rename(staging, path)
+    except BaseException:
+        if retired is not None:
+            os.rename(retired, path)
+        raise
+    if retired is not None:
+        # Open memory maps keep the removed files' data alive until they are closed.
+        shutil.rmtree(retired, ignore_errors=True)
+
+
+class ExpenseSnapshot:
+    """Read-only view of a snapshot written by export_snapshot.
+
+    Every column is opened with numpy.memmap, so opening a snapshot reads
+    only meta.json. Aggregates touch just the column pages they need, and
+    no Expense objects are ever built. Date bounds are inclusive ISO
+    strings, and either may be omitted.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {meta.get('format')!r}")
+        self.rows = meta["rows"]
+        self.users: List[str] = meta["users"]
+        self.categories: List[str] = meta["categories"]
+        self.tags: List[str] = meta["tags"]
+        self._user_offsets: List[int] = meta["user_offsets"]
+        self._user_index = {user_id: i for i, user_id in enumerate(self.users)}
+        self.amount = self._open("amount")
+        self.day = self._open("day")
+        self.category = self._open("category")
+        self.recurring = self._open("recurring")
+        self.tag_offsets = self._open("tag_offsets")
+        self.tag_codes = self._open("tags")
+
+    def _open(self, name: str) -> np.ndarray:
+        """Memory-map one column file (empty files cannot be mapped)."""
+        file_name, _, dtype = _COLUMNS[name]
+        file_path = os.path.join(self.path, file_name)
+        if not os.path.getsize(file_path):
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r")
+
+    def _slice(self, user_id: str = None, start_date: str = None, end_date: str = None) -> slice:
+        """Row range for a user (or every row) and an inclusive date range."""
+        if user_id is None:
+            if start_date or end_date:
+                raise ValueError("Date ranges need a user; rows are only date-sorted per user")
+            return slice(0, self.rows)
+        if user_id not in self._user_index:
+            return slice(0, 0)
+        i = self._user_index[user_id]
+        lo, hi = self._user_offsets[i], self._user_offsets[i + 1]
+        days = self.day[lo:hi]
+        if start_date:
+            lo += int(np.searchsorted(days, self._day(start_date), side="left"))
+        if end_date:
+            hi = self._user_offsets[i] + int(np.searchsorted(days, self._day(end_date), side="right"))
+        return slice(lo, max(lo, hi))
+
+    @staticmethod
+    def _day(value: str) -> int:
+        return date.fromisoformat(value).toordinal() - _EPOCH
+
+    def user_rows(self, user_id: str) -> Tuple[int, int]:
+        """First and past-the-end row of a user's expenses."""
+        rows = self._slice(user_id)
+        return rows.start, rows.stop
+
+    def total(self, user_id: str = None, start_date: str = None, end_date: str = None) -> float:
+        """Sum of amounts for a user (or everyone) over a date range."""
+        return float(self.amount[self._slice(user_id, start_date, end_date)].sum())
+
+    def category_totals(self, user_id: str = None, start_date: str = None,
+                        end_date: str = None) -> Dict[str, float]:
+        """Sum of amounts per category, for categories that occur in the range."""
+        rows = self._slice(user_id, start_date, end_date)
+        codes = self.category[rows]
+        sums = np.bincount(codes, weights=self.amount[rows], minlength=len(self.categories))
+        present = np.bincount(codes, minlength=len(self.categories)) > 0
+        return {self.categories[code]: float(sums[code]) for code in np.flatnonzero(present)}
+
+    def monthly_totals(self, user_id: str = None, category: str = None) -> Dict[str, float]:
+        """Sum of amounts per YYYY-MM month, optionally for one category."""
+        rows = self._slice(user_id)
+        amounts, days = self.amount[rows], self.day[rows]
+        if category is not None:
+            if category not in self.categories:
+                return {}
+            mask = self.category[rows] == self.categories.index(category)
+            amounts, days = amounts[mask], days[mask]
+        if not len(days):
+            return {}
+        months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        first = int(months.min())
+        sums = np.bincount(months - first, weights=amounts)
+        counts = np.bincount(months - first)
+        return {str(np.datetime64(first + int(offset), "M")): float(sums[offset])
+                for offset in np.flatnonzero(counts)}
+
+    def tag_totals(self, user_id: str = None) -> Dict[str, float]:
+        """Sum of amounts per tag; an expense counts once for each of its tags."""
+        rows = self._slice(user_id)
+        offsets = self.tag_offsets[rows.start:rows.stop + 1]
+        if not len(self.tags) or offsets[0] == offsets[-1]:
+            return {}
+        codes = self.tag_codes[offsets[0]:offsets[-1]]
+        weights = np.repeat(self.amount[rows], np.diff(offsets))
+        sums = np.bincount(codes, weights=weights, minlength=len(self.tags))
+        present = np.bincount(codes, minlength=len(self.tags)) > 0
+        return {self.tags[code]: float(sums[code]) for code in np.flatnonzero(present)}
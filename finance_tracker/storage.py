@@ -0,0 +1,904 @@
+from contextlib import contextmanager
+from copy import deepcopy
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from finance_tracker import instrumentation
+from finance_tracker.instrumentation import instrumented
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic but are not locked
+    fcntl = None
+
+
+class StorageBackend:
+    """Persistence interface shared by ExpenseTracker, BudgetManager and UserManager.
+
+    Writes are passed as a list of change records together with a callable
+    that returns the full current state, so each backend can choose between
+    row-level writes and rewriting everything. The callable may be None, in
+    which case the changes are applied to what is stored. Change records look like:
+
+    - expenses: ``{"op": "add" | "update", "expense": {...}}`` or ``{"op": "delete", "id": ...}``
+    - budgets: ``{"op": "put", "budget": {...}}``
+    - users: ``{"op": "put", "user": {...}}`` or ``{"op": "delete", "username": ...}``
+    """
+    def load_expenses(self, user_id: str) -> List[Dict]:
+        """Load all expense records for a user."""
+        raise NotImplementedError
+
+    def write_expenses(self, user_id: str, changes: List[Dict],
+                       snapshot: Callable[[], List[Dict]]) -> None:
+        """Persist expense changes for a user."""
+        raise NotImplementedError
+
+    def save_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Replace all expense records for a user."""
+        raise NotImplementedError
+
+    def iter_expenses(self, user_id: str) -> Iterator[Dict]:
+        """Yield a user's expense records; backends that can stream override this."""
+        return iter(self.load_expenses(user_id))
+
+    def load_budgets(self, user_id: str) -> List[Dict]:
+        """Load all budget records for a user."""
+        raise NotImplementedError
+
+    def write_budgets(self, user_id: str, changes: List[Dict],
+                      snapshot: Callable[[], List[Dict]]) -> None:
+        """Persist budget changes for a user."""
+        raise NotImplementedError
+
+    def save_budgets(self, user_id: str, budgets: List[Dict]) -> None:
+        """Replace all budget records for a user."""
+        raise NotImplementedError
+
+    def load_users(self) -> Dict[str, Dict]:
+        """Load all user records, keyed by username."""
+        raise NotImplementedError
+
+    def load_user(self, username: str) -> Optional[Dict]:
+        """Load one user record, or None; backends that can look up directly override this."""
+        return self.load_users().get(username)
+
+    def write_users(self, changes: List[Dict], snapshot: Callable[[], Dict[str, Dict]]) -> None:
+        """Persist user changes."""
+        raise NotImplementedError
+
+    def save_users(self, users: Dict[str, Dict]) -> None:
+        """Replace all user records."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``<path>.lock`` for the duration of the block.
+
+    The lock lives in a side file because atomic writes replace the data
+    file itself. Locks taken through separate calls exclude each other
+    across processes and across threads. A thread that already holds the
+    lock must not take it again. Where fcntl is unavailable, this is a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path: str, write: Callable[[TextIO], None], fsync: bool = True) -> int:
+    """Write a file through a temporary file that is renamed over it; returns bytes written.
+
+    Readers, and a crash at any point, see either the old file or the
+    complete new one, never a truncated file.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            write(f)
+            size = f.tell()
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return size
+
+
+def _signature(stat: os.stat_result) -> tuple:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size
+
+
+_LOADED = object()  # marks file contents that were just read, so any loader's view matches
+
+
+class _PendingWrite:
+    """One caller's change records waiting in a _GroupCommit queue."""
+    __slots__ = ("changes", "snapshot", "done", "error")
+
+    def __init__(self, changes: List[Dict], snapshot: Optional[Callable]):
+        self.changes = changes
+        self.snapshot = snapshot
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class _GroupCommit:
+    """Write queue for one file, shared by every storage object in the process.
+
+    Callers queue their change records. The caller at the head of the queue
+    becomes the leader: it takes the file lock, then flushes everything
+    queued by that moment in a single write. Callers that queued up while
+    the lock was held elsewhere are therefore committed together, and then
+    return (or raise the flush error).
+    """
+    def __init__(self, path: str, lock_path: str):
+        self.path = path
+        self.lock_path = lock_path
+        self._condition = threading.Condition()
+        self._queue: List[_PendingWrite] = []
+
+    def submit(self, changes: List[Dict], snapshot: Optional[Callable],
+               flush: Callable[[List[_PendingWrite]], None]) -> None:
+        """Queue changes and return once they are written, possibly by another thread."""
+        entry = _PendingWrite(changes, snapshot)
+        with self._condition:
+            self._queue.append(entry)
+            while not entry.done and self._queue[0] is not entry:
+                self._condition.wait()
+        if entry.done:
+            if entry.error is not None:
+                raise entry.error
+            return
+        batch: List[_PendingWrite] = []
+        try:
+            with file_lock(self.lock_path):
+                with self._condition:
+                    batch = list(self._queue)
+                flush(batch)
+        except BaseException as e:
+            entry.error = e
+        with self._condition:
+            del self._queue[:max(1, len(batch))]
+            for item in batch or [entry]:
+                item.done = True
+                item.error = entry.error
+            self._condition.notify_all()
+        if entry.error is not None:
+            raise entry.error
+
+
+_commit_queues: Dict[str, _GroupCommit] = {}
+_commit_queues_lock = threading.Lock()
+
+
+def _commit_queue(path: str, lock_path: str = None) -> _GroupCommit:
+    """The process-wide queue for a file, locked through ``lock_path`` (default: the file itself)."""
+    path = os.path.abspath(path)
+    with _commit_queues_lock:
+        queue = _commit_queues.get(path)
+        if queue is None:
+            queue = _commit_queues[path] = _GroupCommit(path, lock_path or path)
+        return queue
+
+
+def _repair_tail(f) -> None:
+    """End a line-oriented file opened in binary append mode with a complete line.
+
+    A last line without its newline is a complete record (the newline is
+    added) or the torn tail of an interrupted append (it is cut off), so
+    that new records never run into it.
+    """
+    end = f.seek(0, os.SEEK_END)
+    if not end:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        return
+    start = end
+    while start > 0:
+        start = max(0, start - 4096)
+        f.seek(start)
+        cut = f.read(end - start).rfind(b"\n")
+        if cut >= 0:
+            start += cut + 1
+            break
+    f.seek(start)
+    try:
+        json.loads(f.read(end - start))
+    except ValueError:
+        f.truncate(start)
+    else:
+        f.write(b"\n")
+
+
+def apply_expense_changes(expenses: List[Dict], changes: Iterable[Dict]) -> List[Dict]:
+    """Apply add/update/delete expense change records to a list of records."""
+    by_id = {item["id"]: item for item in expenses}
+    for change in changes:
+        if change["op"] == "delete":
+            by_id.pop(change["id"], None)
+        else:
+            by_id[change["expense"]["id"]] = change["expense"]
+    return list(by_id.values())
+
+
+def apply_budget_changes(budgets: List[Dict], changes: Iterable[Dict]) -> List[Dict]:
+    """Apply put budget change records to a list of records, keyed by category and period."""
+    by_key = {(item["category"], item["period"]): item for item in budgets}
+    for change in changes:
+        budget = change["budget"]
+        by_key[(budget["category"], budget["period"])] = budget
+    return list(by_key.values())
+
+
+class JSONStorage(StorageBackend):
+    """Stores data as JSON files: ``expenses_<user>.json``, ``budgets_<user>.json`` and ``users.json``.
+
+    Every write rewrites the affected file. With ``journal=True``, expense
+    changes are instead appended to ``expenses_<user>.journal``, one record
+    per line. The journal is folded into the snapshot every
+    ``compact_every`` records.
+
+    Several processes may share a directory. Files are replaced atomically
+    (see atomic_write), and each is fsynced first unless ``fsync`` is off.
+    Every write holds the file's advisory lock (see file_lock). Before
+    rewriting a file, the storage checks whether anyone else changed it
+    since this object last read or wrote it. If so, the file is re-read
+    and the caller's change records are applied on top, rather than
+    overwriting it with the caller's snapshot. Concurrent writes to one
+    file from threads of a process are group-committed: whoever gets the
+    lock writes every change queued while it waited. The save_* methods
+    replace a file's contents outright.
+
+    The parsed user file is kept and reused until the file's signature
+    (inode, size and timestamps) changes. load_user and write_users are
+    therefore O(1) reads of it while nobody else writes; each write leaves
+    behind the users it wrote as the new parsed copy.
+    """
+    def __init__(self, directory: str = ".", journal: bool = False, compact_every: int = 1000,
+                 fsync: bool = True):
+        if compact_every <= 0:
+            raise ValueError("compact_every must be positive")
+        self.directory = directory
+        self.journal = journal
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._journal_entries: Dict[str, int] = {}
+        # path -> (signature, whose view matches it) as of the last read or write here
+        self._seen: Dict[str, tuple] = {}
+        # (signature, parsed users) of the user file; the dict is never changed in place
+        self._users_cache: Optional[tuple] = None
+
+    def expense_file(self, user_id: str) -> str:
+        """Path of a user's expense snapshot."""
+        return os.path.join(self.directory, f"expenses_{user_id}.json")
+
+    def journal_file(self, user_id: str) -> str:
+        """Path of a user's expense journal."""
+        return os.path.join(self.directory, f"expenses_{user_id}.journal")
+
+    def budget_file(self, user_id: str) -> str:
+        """Path of a user's budget file."""
+        return os.path.join(self.directory, f"budgets_{user_id}.json")
+
+    def user_file(self) -> str:
+        """Path of the user directory file."""
+        return os.path.join(self.directory, "users.json")
+
+    def load_expenses(self, user_id: str) -> List[Dict]:
+        """Load the expense snapshot and replay the journal on top."""
+        expenses = {item["id"]: item for item in self._read_expenses(user_id)}
+        for expense_id, record in self._read_journal(user_id).items():
+            if record is None:
+                expenses.pop(expense_id, None)
+            else:
+                expenses[expense_id] = record
+        return list(expenses.values())
+
+    def _read_expenses(self, user_id: str) -> Iterator[Dict]:
+        """Read the expense snapshot."""
+        return iter(self._read(self.expense_file(user_id), []))
+
+    @instrumented
+    def _read_journal(self, user_id: str) -> Dict[str, Optional[Dict]]:
+        """Fold the journal into the final record per expense ID (None once deleted).
+
+        A final line that does not parse is the torn tail of an interrupted
+        append and is skipped; the next append cuts it off. An unreadable
+        line anywhere before the end raises ValueError.
+        """
+        changes: Dict[str, Optional[Dict]] = {}
+        entries = 0
+        torn = None
+        try:
+            with open(self.journal_file(user_id), 'r') as f:
+                if instrumentation.enabled():
+                    instrumentation.add_bytes("JSONStorage._read_journal", read=os.fstat(f.fileno()).st_size)
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    if torn is not None:
+                        raise ValueError(f"Corrupt journal {self.journal_file(user_id)} at line {torn}")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        torn = number
+                        continue
+                    if record["op"] == "delete":
+                        changes[record["id"]] = None
+                    else:
+                        changes[record["expense"]["id"]] = record["expense"]
+                    entries += 1
+        except FileNotFoundError:
+            pass
+        self._journal_entries[user_id] = entries
+        return changes
+
+    @instrumented
+    def write_expenses(self, user_id: str, changes: List[Dict],
+                       snapshot: Callable[[], List[Dict]]) -> None:
+        """Append changes to the journal, or rewrite the snapshot when not journaling."""
+        path = self.expense_file(user_id)
+        if self.journal:
+            flush = lambda batch: self._append_journal(user_id, batch)
+        else:
+            flush = lambda batch: self._commit(path, batch, lambda: self.load_expenses(user_id),
+                                               apply_expense_changes,
+                                               lambda data: self._replace_expenses(user_id, data))
+        _commit_queue(path).submit(changes, snapshot, flush)
+
+    def _append_journal(self, user_id: str, batch: List[_PendingWrite]) -> None:
+        """Append queued changes to the journal in one write; the lock is held."""
+        changes = [record for entry in batch for record in entry.changes]
+        text = "".join(json.dumps(record) + "\n" for record in changes)
+        with open(self.journal_file(user_id), 'a+b') as f:
+            _repair_tail(f)
+            f.write(text.encode())
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if instrumentation.enabled():
+            instrumentation.add_bytes("JSONStorage.write_expenses", written=len(text.encode()))
+        entries = self._journal_entries.get(user_id, 0) + len(changes)
+        self._journal_entries[user_id] = entries
+        if entries >= self.compact_every:
+            # Other processes may have journaled too, so compact what is on disk.
+            self._replace_expenses(user_id, self.load_expenses(user_id))
+
+    def _commit(self, path: str, batch: List[_PendingWrite], read: Callable[[], object],
+                apply: Callable[[object, List[Dict]], object], write: Callable[[object], None]) -> None:
+        """Write queued changes to a file; the lock is held.
+
+        A lone writer whose view matches the file (it loaded or last wrote
+        it, and nobody wrote since) writes its own snapshot. Otherwise the
+        file is re-read and every queued change is applied to it, in order.
+        That writer's view then no longer matches the file, so its later
+        writes merge as well.
+        """
+        snapshot = batch[0].snapshot if len(batch) == 1 else None
+        if snapshot is not None and self._is_current(path, snapshot):
+            write(snapshot())
+        else:
+            data = read()
+            for entry in batch:
+                data = apply(data, entry.changes)
+            write(data)
+            snapshot = None
+        self._saw(path, owner=snapshot)
+
+    def _is_current(self, path: str, snapshot: Callable) -> bool:
+        """Whether the file is unchanged since the last read here, or since this writer's last write."""
+        try:
+            current = _signature(os.stat(path))
+        except FileNotFoundError:
+            current = None
+        signature, owner = self._seen.get(path, (None, _LOADED))
+        return signature == current and (owner is _LOADED or owner == snapshot)
+
+    def _saw(self, path: str, stat: os.stat_result = None, owner=_LOADED) -> None:
+        """Remember a file's signature, and whose view matches it, after reading or writing it."""
+        try:
+            self._seen[path] = (_signature(stat or os.stat(path)), owner)
+        except FileNotFoundError:
+            self._seen.pop(path, None)
+
+    def save_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Write a fresh snapshot, superseding any journal entries."""
+        with file_lock(self.expense_file(user_id)):
+            self._replace_expenses(user_id, expenses)
+
+    def _replace_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Write the snapshot and drop the journal; the lock is held."""
+        self._write_expenses(user_id, expenses)
+        try:
+            os.remove(self.journal_file(user_id))
+        except FileNotFoundError:
+            pass
+        self._journal_entries[user_id] = 0
+
+    def _write_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Write the expense snapshot."""
+        self._write(self.expense_file(user_id), expenses)
+
+    def load_budgets(self, user_id: str) -> List[Dict]:
+        """Load budgets from the user's budget file."""
+        return self._read(self.budget_file(user_id), [])
+
+    def write_budgets(self, user_id: str, changes: List[Dict],
+                      snapshot: Callable[[], List[Dict]]) -> None:
+        """Rewrite the user's budget file, merging with changes made elsewhere."""
+        path = self.budget_file(user_id)
+        _commit_queue(path).submit(changes, snapshot, lambda batch: self._commit(
+            path, batch, lambda: self._read(path, []), apply_budget_changes, lambda data: self._write(path, data)))
+
+    def save_budgets(self, user_id: str, budgets: List[Dict]) -> None:
+        """Write the user's budget file."""
+        with file_lock(self.budget_file(user_id)):
+            self._write(self.budget_file(user_id), budgets)
+
+    def load_users(self) -> Dict[str, Dict]:
+        """Load users from the user directory file."""
+        return self._read(self.user_file(), {})
+
+    def load_user(self, username: str) -> Optional[Dict]:
+        """Look up one user in the parsed user file, re-reading it only if it changed."""
+        return deepcopy(self._parsed_users().get(username))
+
+    def _parsed_users(self) -> Dict[str, Dict]:
+        """The parsed user file, shared between calls; callers must not change it."""
+        path = self.user_file()
+        try:
+            current = _signature(os.stat(path))
+        except FileNotFoundError:
+            current = None
+        if self._users_cache is None or self._users_cache[0] != current:
+            users = self._read(path, {})
+            self._users_cache = (self._seen.get(path, (None,))[0], users)
+        return self._users_cache[1]
+
+    def write_users(self, changes: List[Dict], snapshot: Callable[[], Dict[str, Dict]]) -> None:
+        """Apply user changes to the current user directory file and rewrite it.
+
+        Users are loaded lazily, so the caller's snapshot may be partial and is not used.
+        """
+        path = self.user_file()
+        apply = lambda users, changes: apply_user_changes(users, deepcopy(changes))
+        _commit_queue(path).submit(changes, None, lambda batch: self._commit(
+            path, batch, lambda: dict(self._parsed_users()), apply, self._write_users))
+
+    def _write_users(self, users: Dict[str, Dict]) -> None:
+        """Write the user directory file and keep what was written as its parsed copy."""
+        self._users_cache = None
+        self._write(self.user_file(), users)
+        self._users_cache = (self._seen.get(self.user_file(), (None,))[0], users)
+
+    def save_users(self, users: Dict[str, Dict]) -> None:
+        """Write the user directory file."""
+        with file_lock(self.user_file()):
+            self._write_users(deepcopy(users))
+
+    @instrumented
+    def _read(self, path: str, default):
+        """Read a JSON file, returning the default if it does not exist."""
+        try:
+            with open(path, 'r') as f:
+                stat = os.fstat(f.fileno())
+                if instrumentation.enabled():
+                    instrumentation.add_bytes("JSONStorage._read", read=stat.st_size)
+                data = json.load(f)
+        except FileNotFoundError:
+            self._saw(path)
+            return default
+        self._saw(path, stat)
+        return data
+
+    @instrumented
+    def _write(self, path: str, data) -> None:
+        """Write a JSON file atomically; the caller holds the file's lock."""
+        size = atomic_write(path, lambda f: json.dump(data, f, indent=2), self.fsync)
+        self._saw(path)
+        if instrumentation.enabled():
+            instrumentation.add_bytes("JSONStorage._write", written=size)
+
+
+class JSONLinesStorage(JSONStorage):
+    """JSONStorage variant keeping expenses in ``expenses_<user>.jsonl``, one record per line.
+
+    iter_expenses parses the snapshot one line at a time. Only the journal,
+    which is bounded by ``compact_every``, is held in memory, so exports and
+    totals over long histories run in constant memory.
+    """
+    def expense_file(self, user_id: str) -> str:
+        """Path of a user's JSON Lines expense snapshot."""
+        return os.path.join(self.directory, f"expenses_{user_id}.jsonl")
+
+    def iter_expenses(self, user_id: str) -> Iterator[Dict]:
+        """Stream a user's expenses with journal entries applied."""
+        changes = self._read_journal(user_id)
+        for record in self._read_expenses(user_id):
+            if record["id"] in changes:
+                record = changes.pop(record["id"])
+                if record is None:
+                    continue
+            yield record
+        for record in changes.values():
+            if record is not None:
+                yield record
+
+    def _read_expenses(self, user_id: str) -> Iterator[Dict]:
+        """Parse the snapshot lazily, one line per record."""
+        path = self.expense_file(user_id)
+        try:
+            with open(path, 'r') as f:
+                self._saw(path, os.fstat(f.fileno()))
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            self._saw(path)
+            return
+
+    @instrumented
+    def _write_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Write the snapshot as JSON Lines, atomically."""
+        def write(f: TextIO) -> None:
+            for record in expenses:
+                f.write(json.dumps(record) + "\n")
+        path = self.expense_file(user_id)
+        size = atomic_write(path, write, self.fsync)
+        self._saw(path)
+        if instrumentation.enabled():
+            instrumentation.add_bytes("JSONLinesStorage._write_expenses", written=size)
+
+
+def apply_user_changes(users: Dict[str, Dict], changes: Iterable[Dict]) -> Dict[str, Dict]:
+    """Apply put/delete user change records to a username-keyed dict, in place."""
+    for change in changes:
+        if change["op"] == "delete":
+            users.pop(change["username"], None)
+        else:
+            users[change["user"]["username"]] = change["user"]
+    return users
+
+
+class ShardedJSONStorage(JSONStorage):
+    """JSONStorage variant spreading users over ``users/shard_<n>.json`` files.
+
+    A username always maps to the same shard through a hash of the name.
+    Looking up a user reads one shard, and a change rewrites only the
+    shards it touches. Reading every user still means reading every shard.
+    Shard writes share one lock, ``users.lock``, beside the shard directory.
+    """
+    def __init__(self, directory: str = ".", journal: bool = False, compact_every: int = 1000,
+                 user_shards: int = 64, fsync: bool = True):
+        super().__init__(directory, journal, compact_every, fsync)
+        if user_shards <= 0:
+            raise ValueError("user_shards must be positive")
+        self.user_shards = user_shards
+
+    def user_shard_file(self, username: str) -> str:
+        """Path of the shard holding a username."""
+        shard = int(hashlib.sha256(username.encode()).hexdigest()[:8], 16) % self.user_shards
+        return os.path.join(self.directory, "users", f"shard_{shard:04d}.json")
+
+    def load_users(self) -> Dict[str, Dict]:
+        """Load users from every shard."""
+        users = {}
+        shard_dir = os.path.join(self.directory, "users")
+        if os.path.isdir(shard_dir):
+            for name in sorted(os.listdir(shard_dir)):
+                if name.startswith("shard_") and name.endswith(".json"):
+                    users.update(self._read(os.path.join(shard_dir, name), {}))
+        return users
+
+    def load_user(self, username: str) -> Optional[Dict]:
+        """Load one user by reading only its shard."""
+        return self._read(self.user_shard_file(username), {}).get(username)
+
+    def write_users(self, changes: List[Dict], snapshot: Callable[[], Dict[str, Dict]]) -> None:
+        """Rewrite only the shards touched by the changes."""
+        by_shard: Dict[str, List[Dict]] = {}
+        for change in changes:
+            username = change["username"] if change["op"] == "delete" else change["user"]["username"]
+            by_shard.setdefault(self.user_shard_file(username), []).append(change)
+        for path, shard_changes in by_shard.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            flush = lambda batch, path=path: self._commit(path, batch, lambda: self._read(path, {}),
+                                                          apply_user_changes, lambda data: self._write(path, data))
+            _commit_queue(path, self._shard_lock()).submit(shard_changes, None, flush)
+
+    def save_users(self, users: Dict[str, Dict]) -> None:
+        """Replace all users, rewriting every shard."""
+        shards: Dict[str, Dict[str, Dict]] = {}
+        for username, user in users.items():
+            shards.setdefault(self.user_shard_file(username), {})[username] = user
+        shard_dir = os.path.join(self.directory, "users")
+        os.makedirs(shard_dir, exist_ok=True)
+        with file_lock(self._shard_lock()):
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                if name.startswith("shard_") and name.endswith(".json") and path not in shards:
+                    os.remove(path)
+            for path, shard in shards.items():
+                self._write(path, shard)
+
+    def _shard_lock(self) -> str:
+        return os.path.join(self.directory, "users")
+
+
+def convert_to_sharded_users(directory: str = ".", user_shards: int = 64) -> None:
+    """Copy ``users.json`` into user shards; the original file is left in place."""
+    ShardedJSONStorage(directory, user_shards=user_shards).save_users(JSONStorage(directory).load_users())
+
+
+def convert_to_jsonl(user_id: str, directory: str = ".") -> str:
+    """Convert a user's JSON array expense file (and journal) to JSON Lines; returns the new path.
+
+    The original ``expenses_<user>.json`` is left in place.
+    """
+    source = JSONStorage(directory)
+    target = JSONLinesStorage(directory)
+    target.save_expenses(user_id, source.load_expenses(user_id))
+    return target.expense_file(user_id)
+
+
+class SQLiteStorage(StorageBackend):
+    """Stores all users' data in one SQLite database with row-level writes.
+
+    Expenses are indexed by user with date and category, so filters and
+    aggregates can run in SQL through query_expenses, total_expenses and
+    category_totals, without loading a tracker.
+    """
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS expenses (
+            user_id TEXT NOT NULL,
+            id TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT NOT NULL,
+            date TEXT NOT NULL,
+            tags TEXT NOT NULL,
+            is_recurring INTEGER NOT NULL,
+            recurrence_period TEXT,
+            PRIMARY KEY (user_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses (user_id, date);
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_category
+            ON expenses (user_id, category COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS budgets (
+            user_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            period TEXT NOT NULL,
+            amount REAL NOT NULL,
+            alert_threshold REAL NOT NULL,
+            spending REAL NOT NULL,
+            PRIMARY KEY (user_id, category, period)
+        );
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            email TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            preferences TEXT NOT NULL
+        );
+    """
+    _EXPENSE_COLUMNS = ("id", "amount", "category", "description", "date", "tags",
+                        "is_recurring", "recurrence_period")
+    _FETCH_SIZE = 500
+    _UPSERT_EXPENSE = """
+        INSERT INTO expenses (user_id, id, amount, category, description, date, tags,
+                              is_recurring, recurrence_period)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, id) DO UPDATE SET
+            amount = excluded.amount, category = excluded.category,
+            description = excluded.description, date = excluded.date, tags = excluded.tags,
+            is_recurring = excluded.is_recurring, recurrence_period = excluded.recurrence_period
+    """
+    _UPSERT_BUDGET = """
+        INSERT INTO budgets (user_id, category, period, amount, alert_threshold, spending)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, category, period) DO UPDATE SET
+            amount = excluded.amount, alert_threshold = excluded.alert_threshold,
+            spending = excluded.spending
+    """
+    _UPSERT_USER = """
+        INSERT INTO users (username, password_hash, email, created_at, preferences)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (username) DO UPDATE SET
+            password_hash = excluded.password_hash, email = excluded.email,
+            created_at = excluded.created_at, preferences = excluded.preferences
+    """
+
+    def __init__(self, path: str = "finance_tracker.db"):
+        self.path = path
+        # The connection may be shared with a WriteBehindStorage flusher thread, so every
+        # statement and transaction on it holds the lock.
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(self._SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self.connection.close()
+
+    def load_expenses(self, user_id: str) -> List[Dict]:
+        """Load a user's expenses in insertion order."""
+        return list(self.iter_expenses(user_id))
+
+    def iter_expenses(self, user_id: str) -> Iterator[Dict]:
+        """Stream a user's expenses from a database cursor, in insertion order."""
+        return self._select_expenses("WHERE user_id = ? ORDER BY rowid", (user_id,))
+
+    def write_expenses(self, user_id: str, changes: List[Dict],
+                       snapshot: Callable[[], List[Dict]]) -> None:
+        """Apply expense changes as row upserts and deletes in one transaction."""
+        with self._lock, self.connection:
+            for change in changes:
+                if change["op"] == "delete":
+                    self.connection.execute("DELETE FROM expenses WHERE user_id = ? AND id = ?",
+                                            (user_id, change["id"]))
+                else:
+                    self.connection.execute(self._UPSERT_EXPENSE,
+                                            self._expense_row(user_id, change["expense"]))
+
+    def save_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Replace all of a user's expenses."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM expenses WHERE user_id = ?", (user_id,))
+            self.connection.executemany(self._UPSERT_EXPENSE,
+                                        (self._expense_row(user_id, item) for item in expenses))
+
+    def query_expenses(self, user_id: str, start_date: str = None, end_date: str = None,
+                       category: str = None) -> Iterator[Dict]:
+        """Yield a user's expenses filtered in SQL by inclusive date range and category."""
+        where, params = self._expense_filter(user_id, start_date, end_date, category)
+        return self._select_expenses(f"{where} ORDER BY date, rowid", params)
+
+    def total_expenses(self, user_id: str, start_date: str = None, end_date: str = None,
+                       category: str = None) -> float:
+        """Sum a user's expenses in SQL, with the same filters as query_expenses."""
+        where, params = self._expense_filter(user_id, start_date, end_date, category)
+        with self._lock:
+            row = self.connection.execute(f"SELECT TOTAL(amount) FROM expenses {where}", params).fetchone()
+        return row[0]
+
+    def category_totals(self, user_id: str, start_date: str = None,
+                        end_date: str = None) -> Dict[str, float]:
+        """Sum a user's expenses per category in SQL."""
+        where, params = self._expense_filter(user_id, start_date, end_date)
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT category, TOTAL(amount) FROM expenses {where} GROUP BY category", params).fetchall()
+        return dict(rows)
+
+    def load_budgets(self, user_id: str) -> List[Dict]:
+        """Load a user's budgets."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT category, amount, period, alert_threshold, spending FROM budgets "
+                "WHERE user_id = ? ORDER BY rowid", (user_id,)).fetchall()
+        return [{"category": category, "amount": amount, "period": period,
+                 "alert_threshold": alert_threshold, "spending": spending}
+                for category, amount, period, alert_threshold, spending in rows]
+
+    def write_budgets(self, user_id: str, changes: List[Dict],
+                      snapshot: Callable[[], List[Dict]]) -> None:
+        """Upsert changed budgets in one transaction."""
+        with self._lock, self.connection:
+            self.connection.executemany(self._UPSERT_BUDGET,
+                                        (self._budget_row(user_id, change["budget"]) for change in changes))
+
+    def save_budgets(self, user_id: str, budgets: List[Dict]) -> None:
+        """Replace all of a user's budgets."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM budgets WHERE user_id = ?", (user_id,))
+            self.connection.executemany(self._UPSERT_BUDGET,
+                                        (self._budget_row(user_id, item) for item in budgets))
+
+    def load_users(self) -> Dict[str, Dict]:
+        """Load all users, keyed by username."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT username, password_hash, email, created_at, preferences FROM users ORDER BY rowid"
+            ).fetchall()
+        return {username: {"username": username, "password_hash": password_hash, "email": email,
+                           "created_at": created_at, "preferences": json.loads(preferences)}
+                for username, password_hash, email, created_at, preferences in rows}
+
+    def load_user(self, username: str) -> Optional[Dict]:
+        """Load one user by primary key."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT username, password_hash, email, created_at, preferences FROM users "
+                "WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        username, password_hash, email, created_at, preferences = row
+        return {"username": username, "password_hash": password_hash, "email": email,
+                "created_at": created_at, "preferences": json.loads(preferences)}
+
+    def write_users(self, changes: List[Dict], snapshot: Callable[[], Dict[str, Dict]]) -> None:
+        """Apply user changes as row upserts and deletes in one transaction."""
+        with self._lock, self.connection:
+            for change in changes:
+                if change["op"] == "delete":
+                    self.connection.execute("DELETE FROM users WHERE username = ?",
+                                            (change["username"],))
+                else:
+                    self.connection.execute(self._UPSERT_USER, self._user_row(change["user"]))
+
+    def save_users(self, users: Dict[str, Dict]) -> None:
+        """Replace all users."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM users")
+            self.connection.executemany(self._UPSERT_USER, map(self._user_row, users.values()))
+
+    def _select_expenses(self, clause: str, params: tuple) -> Iterator[Dict]:
+        """Yield expense records for a WHERE/ORDER BY clause.
+
+        Rows are fetched in chunks, each under the lock, so the lock is never
+        held while the caller consumes records.
+        """
+        query = f"SELECT {', '.join(self._EXPENSE_COLUMNS)} FROM expenses {clause}"
+        with self._lock:
+            cursor = self.connection.execute(query, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self._FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                record = dict(zip(self._EXPENSE_COLUMNS, row))
+                record["tags"] = json.loads(record["tags"])
+                record["is_recurring"] = bool(record["is_recurring"])
+                yield record
+
+    @staticmethod
+    def _expense_filter(user_id: str, start_date: str = None, end_date: str = None,
+                        category: str = None) -> tuple:
+        """Build a WHERE clause and parameters for the expense query helpers."""
+        conditions, params = ["user_id = ?"], [user_id]
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date)
+        if category:
+            conditions.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        return "WHERE " + " AND ".join(conditions), tuple(params)
+
+    @staticmethod
+    def _expense_row(user_id: str, item: Dict) -> tuple:
+        return (user_id, item["id"], item["amount"], item["category"], item["description"],
+                item["date"], json.dumps(item.get("tags", [])), int(item.get("is_recurring", False)),
+                item.get("recurrence_period"))
+
+    @staticmethod
+    def _budget_row(user_id: str, item: Dict) -> tuple:
+        return (user_id, item["category"], item["period"], item["amount"],
+                item["alert_threshold"], item["spending"])
+
+    @staticmethod
+    def _user_row(item: Dict) -> tuple:
+        return (item["username"], item["password_hash"], item["email"], item["created_at"],
+                json.dumps(item["preferences"]))
@@ -0,0 +1,42 @@
+import unittest
+import os
+import shutil
+import tempfile
+from functools import partial
+from finance_tracker.batch import generate_user_reports
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.storage import JSONStorage
+from finance_tracker.users import UserManager
+
+class TestBatchReports(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage_factory = partial(JSONStorage, directory=self.directory)
+        users = UserManager(storage=self.storage_factory())
+        for name in ("alice", "bob", "carol"):
+            users.register_user(name, "password123", f"{name}@example.com")
+            ExpenseTracker(name, storage=self.storage_factory()).add_expense(
+                50.0, "Food", "Lunch", date="2025-01-01")
+        with open(os.path.join(self.directory, "expenses_carol.json"), "w") as f:
+            f.write("not json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        for name in ("alice", "bob", "carol"):
+            shutil.rmtree(f"reports_{name}", ignore_errors=True)
+
+    def test_reports_for_all_users(self):
+        seen = []
+        result = generate_user_reports(report_types=["category_summary"], workers=2,
+                                       storage_factory=self.storage_factory,
+                                       progress=lambda done, total, r: seen.append((done, total)))
+        self.assertEqual(sorted(r.user_id for r in result["completed"]), ["alice", "bob"])
+        self.assertEqual([r.user_id for r in result["failed"]], ["carol"])
+        self.assertIn("JSONDecodeError", result["failed"][0].error)
+        self.assertEqual(seen, [(1, 3), (2, 3), (3, 3)])
+        self.assertTrue(os.path.exists("reports_alice/category_summary_all_all.txt"))
+
+    def test_unknown_report_type(self):
+        with self.assertRaises(ValueError):
+            generate_user_reports(["alice"], report_types=["balance_sheet"],
+                                  storage_factory=self.storage_factory)
@@ -0,0 +1,27 @@
+import unittest
+from benchmarks.generator import SyntheticData
+from benchmarks.run import find_regressions, run_scale
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generator_is_seeded(self):
+        first = SyntheticData(seed=7).expenses(200)
+        self.assertEqual(first, SyntheticData(seed=7).expenses(200))
+        self.assertNotEqual(first, SyntheticData(seed=8).expenses(200))
+        self.assertTrue(all(item["amount"] > 0 for item in first))
+        self.assertTrue(all(item["is_recurring"] == (item["category"] == "Rent") for item in first))
+
+    def test_small_run_and_regression_check(self):
+        run = run_scale("50", repeat=1, only="get_")
+        self.assertEqual(run["count"], 50)
+        self.assertIn("get_expense_by_id", run["results"])
+        self.assertNotIn("report.trend_analysis", run["results"])
+        baseline = {"runs": [{"scale": "50", "results": {name: seconds / 2 for name, seconds
+                                                        in run["results"].items()}}]}
+        current = {"runs": [run]}
+        self.assertEqual(len(find_regressions(current, baseline, threshold=0.5)), len(run["results"]))
+        self.assertEqual(find_regressions(current, current, threshold=0.0), [])
+
+    def test_user_lookup_run(self):
+        run = run_scale("50", repeat=1, only="user_lookup")
+        self.assertEqual(sorted(run["results"]), ["add_expenses_bulk", "user_lookup"])
+        self.assertEqual(len(SyntheticData().users(3)), 3)
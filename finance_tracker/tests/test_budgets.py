@@ -1,6 +1,9 @@
 import unittest
 import os
+from unittest import mock
+from datetime import date, datetime
 from finance_tracker.budgets import BudgetManager
+from finance_tracker.expenses import ExpenseTracker, period_window_key
 
 class TestBudgetManager(unittest.TestCase):
     def setUp(self):
@@ -47,4 +50,56 @@ class TestBudgetManager(unittest.TestCase):
         self.manager.set_budget("Food", 200.0)
         self.manager.add_spending("Food", 100.0)
         self.assertTrue(self.manager.reset_budget("Food"))
-        self.assertEqual(self.manager.budgets["Food_monthly"].spending, 0.0)
\ No newline at end of file
+        self.assertEqual(self.manager.budgets["Food_monthly"].spending, 0.0)
+
+    def test_batch_saves_once(self):
+        with mock.patch.object(self.manager.storage, "write_budgets") as save:
+            with self.manager.batch():
+                self.manager.set_budget("Food", 200.0)
+                self.manager.set_budget("Transport", 100.0, "weekly")
+                self.manager.add_spending("Food", 20.0)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(self.manager.budgets["Food_monthly"].spending, 20.0)
+
+    def test_batch_rolls_back_on_error(self):
+        self.manager.set_budget("Food", 200.0)
+        with self.assertRaises(ValueError):
+            with self.manager.batch():
+                self.manager.add_spending("Food", 50.0)
+                self.manager.set_budget("Transport", 100.0, "fortnightly")
+        self.assertEqual(self.manager.budgets["Food_monthly"].spending, 0.0)
+        self.assertNotIn("Transport_fortnightly", self.manager.budgets)
+
+
+    def test_spending_derived_from_expenses(self):
+        tracker = ExpenseTracker(self.user_id)
+        manager = BudgetManager(self.user_id, expense_tracker=tracker)
+        manager.set_budget("Food", 200.0, "monthly")
+        manager.set_budget("Food", 1000.0, "yearly")
+        today = datetime.now()
+        lunch = tracker.add_expense(150.0, "Food", "Lunch", date=today.strftime("%Y-%m-%d"))
+        tracker.add_expense(40.0, "food", "Snack", date=today.strftime("%Y-%m-%d"))
+        tracker.add_expense(500.0, "Food", "Last year", date=f"{today.year - 1}-06-01")
+        status = manager.get_budget_status("Food")
+        self.assertEqual(status["spent"], 190.0)
+        self.assertTrue(status["alert_triggered"])
+        self.assertEqual(manager.get_budget_status("Food", "yearly")["spent"], 190.0)
+        tracker.update_expense(lunch, amount=250.0)
+        self.assertTrue(manager.get_budget_status("Food")["over_budget"])
+        tracker.delete_expense(lunch)
+        self.assertEqual(manager.get_all_budgets()[0]["spending"], 40.0)
+        with self.assertRaises(ValueError):
+            manager.add_spending("Food", 10.0)
+        with self.assertRaises(ValueError):
+            manager.reset_budget("Food")
+
+    def test_period_windows(self):
+        tracker = ExpenseTracker(self.user_id)
+        tracker.add_expense(10.0, "Food", "Sunday", date="2025-01-05")
+        tracker.add_expense(20.0, "Food", "Monday", date="2025-01-06")
+        tracker.add_expense(30.0, "Food", "Next month", date="2025-02-01")
+        self.assertEqual(period_window_key("weekly", date(2025, 1, 6)), "2025-W02")
+        self.assertEqual(tracker.get_period_total("Food", "weekly", date(2025, 1, 12)), 20.0)
+        self.assertEqual(tracker.get_period_total("Food", "daily", date(2025, 1, 5)), 10.0)
+        self.assertEqual(tracker.get_period_total("Food", "monthly", date(2025, 1, 31)), 30.0)
+        self.assertEqual(tracker.get_period_total("FOOD", "yearly", date(2025, 12, 31)), 60.0)
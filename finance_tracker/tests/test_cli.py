@@ -1,7 +1,13 @@
 import unittest
+import os
+import subprocess
+import sys
 from io import StringIO
 from contextlib import redirect_stdout
+from unittest import mock
 from finance_tracker.cli import FinanceTrackerCLI
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.storage import JSONStorage
 
 class TestFinanceTrackerCLI(unittest.TestCase):
     def setUp(self):
@@ -23,4 +29,75 @@ class TestFinanceTrackerCLI(unittest.TestCase):
         self.cli.do_login("testuser3 password123")
         with redirect_stdout(StringIO()) as output:
             self.cli.do_add_expense("50.0 Food Lunch essentials true monthly")
-            self.assertIn("Expense added with ID", output.getvalue())
\ No newline at end of file
+            self.assertIn("Expense added with ID", output.getvalue())
+
+
+    def test_run_script_batches_mutations(self):
+        if os.path.exists("expenses_scriptuser.json"):
+            os.remove("expenses_scriptuser.json")
+        script = ["register scriptuser password123 script@example.com",
+                  "login scriptuser password123",
+                  "# lunch and dinner",
+                  "add_expense 10.0 Food Lunch",
+                  "add_expense 20.0 Food Dinner",
+                  "set_budget Food 100",
+                  "add_expense 5.0 Transport Bus",
+                  "exit",
+                  "add_expense 99.0 Food Ignored"]
+        write_expenses = mock.patch.object(JSONStorage, "write_expenses", autospec=True,
+                                           side_effect=JSONStorage.write_expenses)
+        with redirect_stdout(StringIO()), write_expenses as writes:
+            stats = self.cli.run_script(script)
+        self.assertEqual(writes.call_count, 1)
+        self.assertEqual((stats["commands"], stats["mutations"], stats["batches"]), (7, 5, 2))
+        tracker = ExpenseTracker("scriptuser")
+        tracker.load_from_file()
+        self.assertEqual(tracker.get_total_expenses(), 35.0)
+
+    def test_run_script_import_and_bad_threshold(self):
+        if os.path.exists("expenses_importuser.json"):
+            os.remove("expenses_importuser.json")
+        with open("statement_importuser.csv", "w") as f:
+            f.write("date,description,amount\n2025-01-03,Groceries,42.50\n2025-01-04,Coffee,3.10\n")
+        self.addCleanup(os.remove, "statement_importuser.csv")
+        script = ["register importuser password123 import@example.com",
+                  "login importuser password123",
+                  "add_expense 10.0 Food Lunch",
+                  "set_budget Food 100 monthly lots",
+                  "import statement_importuser.csv",
+                  "add_expense 5.0 Transport Bus"]
+        write_expenses = mock.patch.object(JSONStorage, "write_expenses", autospec=True,
+                                           side_effect=JSONStorage.write_expenses)
+        with redirect_stdout(StringIO()) as output, write_expenses as writes:
+            self.cli.run_script(script)
+        # The bad threshold is reported without undoing the lunch; the import saves on its own.
+        self.assertIn("Error: could not convert", output.getvalue())
+        self.assertEqual(writes.call_count, 3)
+        tracker = ExpenseTracker("importuser")
+        tracker.load_from_file()
+        self.assertEqual(tracker.get_total_expenses(), 10.0 + 42.5 + 3.1 + 5.0)
+
+
+    def test_stats_command(self):
+        with redirect_stdout(StringIO()) as output:
+            self.cli.onecmd("stats on")
+            self.cli.do_register("statsuser password123 stats@example.com")
+            self.cli.onecmd("stats")
+            self.cli.onecmd("stats off")
+            self.cli.onecmd("stats reset")
+        self.assertIn("UserManager.register_user", output.getvalue())
+
+
+class TestCLIStartup(unittest.TestCase):
+    IMPORT_BUDGET_US = 250000
+
+    def test_heavy_dependencies_load_lazily(self):
+        code = ("import sys, finance_tracker.cli; "
+                "print(','.join(m for m in ('numpy', 'pandas', 'matplotlib', 'finance_tracker.reports') "
+                "if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                capture_output=True, text=True, env=dict(os.environ), check=True)
+        self.assertEqual(result.stdout.strip(), "")
+        cumulative = [int(line.split("|")[1]) for line in result.stderr.splitlines()
+                      if line.rstrip().endswith("| finance_tracker.cli")]
+        self.assertLess(cumulative[0], self.IMPORT_BUDGET_US)
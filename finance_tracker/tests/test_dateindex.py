@@ -0,0 +1,52 @@
+import unittest
+import random
+from finance_tracker.dateindex import DateIndex
+
+class TestDateIndex(unittest.TestCase):
+    def check(self, index, entries, start_date, end_date):
+        """Compare the index with a plain sort of the (ID, date, amount) entries."""
+        expected = [(expense_id, amount) for expense_id, day, amount
+                    in sorted(entries, key=lambda entry: entry[1])
+                    if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)]
+        self.assertEqual(list(index.ids(start_date, end_date)), [expense_id for expense_id, _ in expected])
+        self.assertAlmostEqual(index.total(start_date, end_date), sum(amount for _, amount in expected))
+        everything = list(index.ids())
+        lo, hi = index.span(start_date, end_date)
+        self.assertEqual(everything[lo:hi], [expense_id for expense_id, _ in expected])
+
+    def test_matches_sorted_list_through_mutations(self):
+        rng = random.Random(7)
+        days = [f"2025-{month:02d}-{day:02d}" for month in range(1, 4) for day in (1, 10, 20)]
+        entries = [(f"e{n}", rng.choice(days), float(n + 1)) for n in range(40)]
+        index = DateIndex(load=4)  # small blocks, so they split and empty often
+        index.build(entries)
+        for n in range(40, 200):
+            if entries and rng.random() < 0.4:
+                victim = entries.pop(rng.randrange(len(entries)))
+                index.remove(victim[0], victim[1])
+            else:
+                entries.append((f"e{n}", rng.choice(days), float(n % 17 + 1)))
+                index.add(*entries[-1])
+            if entries and rng.random() < 0.2:
+                position = rng.randrange(len(entries))
+                expense_id, day, _ = entries[position]
+                entries[position] = (expense_id, day, 99.0)
+                index.set_amount(expense_id, day, 99.0)
+            start_date, end_date = sorted(rng.sample(days, 2))
+            self.check(index, entries, start_date, end_date)
+        self.assertEqual(len(index), len(entries))
+        for start_date, end_date in ((None, None), ("2025-02-10", None), (None, "2025-01-10"),
+                                     ("2025-03-21", None), ("2025-02-10", "2025-01-01")):
+            self.check(index, entries, start_date, end_date)
+
+    def test_empty(self):
+        index = DateIndex()
+        self.assertEqual((list(index.ids()), index.total(), index.span("2025-01-01")), ([], 0.0, (0, 0)))
+        index.add("a", "2025-01-01", 5.0)
+        index.remove("a", "2025-01-01")
+        with self.assertRaises(KeyError):
+            index.remove("missing", "2025-01-01")
+        self.assertEqual((len(index), index.total()), (0, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
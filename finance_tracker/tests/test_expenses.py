@@ -1,14 +1,20 @@
 import unittest
 import os
+import json
+from unittest import mock
+from finance_tracker.budgets import BudgetManager
 from finance_tracker.expenses import ExpenseTracker, Expense
+from finance_tracker.users import UserManager
 
 class TestExpenseTracker(unittest.TestCase):
     def setUp(self):
         self.user_id = "test_user"
         self.tracker = ExpenseTracker(self.user_id)
         self.data_file = f"expenses_{self.user_id}.json"
-        if os.path.exists(self.data_file):
-            os.remove(self.data_file)
+        self.journal_file = f"expenses_{self.user_id}.journal"
+        for path in (self.data_file, self.journal_file):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_add_valid_expense(self):
         expense_id = self.tracker.add_expense(50.0, "Food", "Grocery shopping", tags=["essentials"])
@@ -18,12 +24,43 @@ class TestExpenseTracker(unittest.TestCase):
         self.assertEqual(expense["category"], "Food")
         self.assertEqual(expense["tags"], ["essentials"])
 
+    def test_expenses_attribute_is_read_only(self):
+        expense_id = self.tracker.add_expense(50.0, "Food", "Lunch")
+        with self.assertRaises(AttributeError):
+            self.tracker.expenses.append(Expense(10.0, "Food", "Snack"))
+        self.tracker.expenses[0].amount = 99.0
+        self.assertEqual(self.tracker.get_expense_by_id(expense_id)["amount"], 50.0)
+        self.assertEqual(self.tracker.get_total_expenses(), 50.0)
+        expenses = self.tracker.expenses
+        self.tracker.add_expense(10.0, "Food", "Snack")
+        with mock.patch.object(Expense, "to_dict") as to_dict:
+            self.assertEqual((len(expenses), len(self.tracker)), (2, 2))
+            to_dict.assert_not_called()
+        self.assertEqual([exp.description for exp in expenses[-1:]], ["Snack"])
+        self.assertEqual(expenses[-2].id, expense_id)
+        with self.assertRaises(IndexError):
+            expenses[2]
+
+    def test_deprecated_data_file(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.tracker.data_file, os.path.join(".", self.data_file))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(BudgetManager(self.user_id).data_file, os.path.join(".", "budgets_test_user.json"))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(UserManager().data_file, os.path.join(".", "users.json"))
+
     def test_add_recurring_expense(self):
         expense_id = self.tracker.add_expense(100.0, "Rent", "Monthly rent", is_recurring=True, recurrence_period="monthly")
         recurring = self.tracker.get_recurring_expenses()
         self.assertEqual(len(recurring), 1)
         self.assertEqual(recurring[0]["recurrence_period"], "monthly")
 
+    def test_recurrence_period_is_normalized(self):
+        self.tracker.add_expense(100.0, "Rent", "Monthly rent", is_recurring=True, recurrence_period=" Monthly ")
+        self.assertEqual(self.tracker.get_recurring_expenses()[0]["recurrence_period"], "monthly")
+        with self.assertRaises(ValueError):
+            self.tracker.add_expense(100.0, "Rent", "Rent", is_recurring=True, recurrence_period="Fortnightly")
+
     def test_add_invalid_expense(self):
         with self.assertRaises(ValueError):
             self.tracker.add_expense(-10.0, "Food", "Invalid")
@@ -31,6 +68,10 @@ class TestExpenseTracker(unittest.TestCase):
             self.tracker.add_expense(50.0, "", "No category")
         with self.assertRaises(ValueError):
             self.tracker.add_expense(50.0, "Food", "", is_recurring=True)
+        with self.assertRaises(ValueError):
+            self.tracker.build_expense(-10.0, "Food", "Invalid")
+        self.assertEqual(self.tracker.build_expense(10.0, "Food", "Snack").amount, 10.0)
+        self.assertEqual(len(self.tracker), 0)
 
     def test_get_expenses_by_category(self):
         self.tracker.add_expense(50.0, "Food", "Lunch")
@@ -64,4 +105,218 @@ class TestExpenseTracker(unittest.TestCase):
         self.tracker._save_to_file()
         new_tracker = ExpenseTracker(self.user_id)
         new_tracker.load_from_file()
-        self.assertEqual(len(new_tracker.expenses), 1)
\ No newline at end of file
+        self.assertEqual(len(new_tracker.expenses), 1)
+
+    def test_journal_mode_appends_instead_of_rewriting(self):
+        tracker = ExpenseTracker(self.user_id, journal=True)
+        kept_id = tracker.add_expense(50.0, "Food", "Lunch")
+        dropped_id = tracker.add_expense(30.0, "Transport", "Bus")
+        tracker.update_expense(kept_id, amount=60.0)
+        tracker.delete_expense(dropped_id)
+        self.assertFalse(os.path.exists(self.data_file))
+        with open(self.journal_file) as f:
+            self.assertEqual(len(f.readlines()), 4)
+        new_tracker = ExpenseTracker(self.user_id)
+        new_tracker.load_from_file()
+        self.assertEqual(len(new_tracker.expenses), 1)
+        self.assertEqual(new_tracker.get_expense_by_id(kept_id)["amount"], 60.0)
+
+    def test_journal_compaction(self):
+        tracker = ExpenseTracker(self.user_id, journal=True, compact_every=3)
+        for i in range(4):
+            tracker.add_expense(10.0 + i, "Food", f"Meal {i}")
+        with open(self.data_file) as f:
+            self.assertEqual(len(json.load(f)), 3)
+        with open(self.journal_file) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        new_tracker = ExpenseTracker(self.user_id)
+        new_tracker.load_from_file()
+        self.assertEqual(new_tracker.get_total_expenses(), 46.0)
+        new_tracker._save_to_file()
+        self.assertFalse(os.path.exists(self.journal_file))
+
+    def test_journal_torn_tail_is_repaired(self):
+        tracker = ExpenseTracker(self.user_id, journal=True)
+        tracker.add_expense(50.0, "Food", "Lunch")
+        with open(self.journal_file, 'a') as f:
+            f.write('{"op": "add", "expe')
+        tracker.load_from_file()
+        self.assertEqual(len(tracker.expenses), 1)
+        tracker.add_expense(30.0, "Transport", "Bus")
+        tracker.add_expense(20.0, "Food", "Snack")
+        reloaded = ExpenseTracker(self.user_id)
+        reloaded.load_from_file()
+        self.assertEqual(reloaded.get_total_expenses(), 100.0)
+
+    def test_journal_corruption_before_the_end_raises(self):
+        tracker = ExpenseTracker(self.user_id, journal=True)
+        tracker.add_expense(50.0, "Food", "Lunch")
+        with open(self.journal_file) as f:
+            lines = f.readlines()
+        with open(self.journal_file, 'w') as f:
+            f.writelines(["not json\n"] + lines)
+        with self.assertRaises(ValueError):
+            tracker.load_from_file()
+
+    def test_add_expenses_saves_once(self):
+        with mock.patch.object(self.tracker.storage, "write_expenses") as save:
+            ids = self.tracker.add_expenses([
+                {"amount": 50.0, "category": "Food", "description": "Lunch"},
+                {"amount": 30.0, "category": "Transport", "description": "Bus", "tags": ["daily"]},
+            ])
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(self.tracker.get_expense_by_id(ids[1])["tags"], ["daily"])
+
+    def test_add_expenses_rejects_whole_batch(self):
+        with self.assertRaises(ValueError):
+            self.tracker.add_expenses([
+                {"amount": 50.0, "category": "Food", "description": "Lunch"},
+                {"amount": -1.0, "category": "Food", "description": "Refund"},
+            ])
+        self.assertEqual(len(self.tracker.expenses), 0)
+
+    def test_batch_rolls_back_on_error(self):
+        expense_id = self.tracker.add_expense(50.0, "Food", "Lunch")
+        with self.assertRaises(ValueError):
+            with self.tracker.batch():
+                self.tracker.update_expense(expense_id, amount=80.0)
+                self.tracker.add_expense(20.0, "Food", "Snack")
+                self.tracker.add_expense(0, "Food", "Invalid")
+        self.assertEqual(len(self.tracker.expenses), 1)
+        self.assertEqual(self.tracker.get_expense_by_id(expense_id)["amount"], 50.0)
+
+    def test_batch_rollback_replays_touched_expenses(self):
+        ids = self.tracker.add_expenses([{"amount": float(n), "category": "Food", "description": "Snack",
+                                          "date": "2025-01-01"} for n in range(1, 51)])
+        before = sorted(map(str, map(self.tracker.get_expense_by_id, ids)))
+        with mock.patch.object(Expense, "to_dict", autospec=True, side_effect=Expense.to_dict) as to_dict:
+            with self.assertRaises(ValueError):
+                with self.tracker.batch():
+                    self.tracker.update_expense(ids[0], amount=99.0, tags=["x"])
+                    self.tracker.update_expense(ids[0], category="Fun")
+                    self.tracker.delete_expense(ids[1])
+                    self.tracker.add_expense(7.0, "Food", "Extra", date="2025-01-01")
+                    raise ValueError("abort")
+        # Three touched expenses, plus the three change records; none of the other 48.
+        self.assertLessEqual(to_dict.call_count, 7)
+        self.assertEqual(sorted(map(str, map(self.tracker.get_expense_by_id, ids))), before)
+        self.assertEqual((len(self.tracker.date_index), self.tracker.get_total_expenses()), (50, 1275.0))
+        self.assertEqual(self.tracker.get_category_totals(), {"Food": 1275.0})
+        self.assertEqual(self.tracker.get_expenses_by_tag("x"), [])
+        with self.assertRaises(ValueError):
+            with self.tracker.batch():
+                self.tracker.delete_expense(ids[2])
+                self.tracker.expenses = []
+                self.tracker.add_expense(1.0, "Food", "After reset")
+                raise ValueError("abort")
+        self.assertEqual(sorted(map(str, map(self.tracker.get_expense_by_id, ids))), before)
+        self.assertEqual(self.tracker.get_total_expenses(), 1275.0)
+
+    def test_ids_survive_reload(self):
+        expense_id = self.tracker.add_expense(50.0, "Food", "Lunch")
+        new_tracker = ExpenseTracker(self.user_id)
+        new_tracker.load_from_file()
+        self.assertEqual(new_tracker.get_expense_by_id(expense_id)["description"], "Lunch")
+        self.assertTrue(new_tracker.update_expense(expense_id, amount=20.0))
+        self.assertTrue(new_tracker.delete_expense(expense_id))
+        self.assertEqual(len(new_tracker.expenses), 0)
+
+    def test_invalid_update_leaves_expense_unchanged(self):
+        expense_id = self.tracker.add_expense(50.0, "Food", "Lunch")
+        with self.assertRaises(ValueError):
+            self.tracker.update_expense(expense_id, amount=75.0, category="")
+        self.assertEqual(self.tracker.get_expense_by_id(expense_id)["amount"], 50.0)
+
+    def test_category_and_tag_indexes_follow_updates(self):
+        expense_id = self.tracker.add_expense(50.0, "Food", "Lunch", tags=["Meal"])
+        self.tracker.add_expense(30.0, "food", "Snack", tags=["meal", "daily"])
+        self.assertEqual(len(self.tracker.get_expenses_by_category("FOOD")), 2)
+        self.tracker.update_expense(expense_id, category="Dining", tags=["work"])
+        self.assertEqual(len(self.tracker.get_expenses_by_category("food")), 1)
+        self.assertEqual(len(self.tracker.get_expenses_by_tag("meal")), 1)
+        self.assertEqual(self.tracker.get_expenses_by_tag("WORK")[0]["id"], expense_id)
+        self.assertEqual(self.tracker.distinct_categories(), ["Dining", "food"])
+        self.assertEqual(self.tracker.distinct_tags(), ["daily", "meal", "work"])
+        self.tracker.delete_expense(expense_id)
+        self.assertEqual(self.tracker.get_expenses_by_tag("work"), [])
+        self.assertEqual(self.tracker.distinct_categories(), ["food"])
+
+    def test_date_range_totals(self):
+        self.tracker.add_expense(10.0, "Food", "Breakfast", date="2025-01-03")
+        march_id = self.tracker.add_expense(20.0, "Food", "Lunch", date="2025-03-01")
+        self.tracker.add_expense(40.0, "Food", "Dinner", date="2025-02-10")
+        self.assertEqual(self.tracker.get_total_expenses(), 70.0)
+        self.assertEqual(self.tracker.get_total_expenses("2025-02-01", "2025-03-01"), 60.0)
+        self.assertEqual(self.tracker.get_total_expenses(start_date="2025-02-11"), 20.0)
+        self.assertEqual(self.tracker.get_total_expenses(end_date="2025-02-10"), 50.0)
+        self.assertEqual(self.tracker.get_total_expenses("2025-04-01", "2025-01-01"), 0.0)
+        self.tracker.update_expense(march_id, amount=25.0)
+        self.assertEqual(self.tracker.get_total_expenses(start_date="2025-03-01"), 25.0)
+        dates = [exp["date"] for exp in self.tracker.get_expenses_between("2025-01-01", "2025-02-28")]
+        self.assertEqual(dates, ["2025-01-03", "2025-02-10"])
+
+    def test_running_aggregates(self):
+        lunch = self.tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-05", tags=["Meal"])
+        self.tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-06")
+        self.tracker.add_expense(20.0, "Food", "Dinner", date="2025-02-01", tags=["meal"])
+        self.assertEqual(self.tracker.get_category_totals(), {"Food": 70.0, "Transport": 30.0})
+        self.assertEqual(self.tracker.get_category_totals("2025-01"), {"Food": 50.0, "Transport": 30.0})
+        self.assertEqual(self.tracker.get_monthly_totals("Food"), {"2025-01": 50.0, "2025-02": 20.0})
+        self.assertEqual(self.tracker.get_tag_totals(), {"meal": 70.0})
+        self.tracker.update_expense(lunch, amount=15.0, category="Dining")
+        self.assertEqual(self.tracker.get_monthly_totals(), {"2025-01": 45.0, "2025-02": 20.0})
+        self.assertEqual(sorted(self.tracker.get_category_day_totals()),
+                         [("Dining", "2025-01-05", 15.0), ("Food", "2025-02-01", 20.0),
+                          ("Transport", "2025-01-06", 30.0)])
+        self.tracker.delete_expense(lunch)
+        self.assertEqual(self.tracker.get_category_totals(), {"Transport": 30.0, "Food": 20.0})
+        self.assertEqual(self.tracker.get_tag_totals(), {"meal": 20.0})
+
+
+class TestColumnarExpenseTracker(unittest.TestCase):
+    def setUp(self):
+        self.user_id = "test_user"
+        self.tracker = ExpenseTracker(self.user_id, columnar=True)
+        self.data_file = f"expenses_{self.user_id}.json"
+        if os.path.exists(self.data_file):
+            os.remove(self.data_file)
+
+    def test_rows_match_expense_dicts(self):
+        expense_id = self.tracker.add_expense(100.0, "Rent", "Monthly rent", date="2025-01-01",
+                                              tags=["home"], is_recurring=True, recurrence_period="monthly")
+        expected = Expense(100.0, "Rent", "Monthly rent", "2025-01-01", ["home"], True, "monthly",
+                           expense_id=expense_id).to_dict()
+        self.assertEqual(self.tracker.get_expense_by_id(expense_id), expected)
+        self.assertEqual(self.tracker.get_recurring_expenses(), [expected])
+
+    def test_update_delete_and_queries(self):
+        first = self.tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01", tags=["meal"])
+        second = self.tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        third = self.tracker.add_expense(20.0, "Food", "Snack", date="2025-01-03", tags=["meal"])
+        self.assertTrue(self.tracker.update_expense(third, amount=25.0, tags=["treat"]))
+        self.assertTrue(self.tracker.delete_expense(first))
+        self.assertEqual(self.tracker.get_expense_by_id(second)["category"], "Transport")
+        self.assertEqual(self.tracker.get_expenses_by_tag("treat")[0]["amount"], 25.0)
+        self.assertEqual(self.tracker.get_expenses_by_tag("meal"), [])
+        self.assertEqual(self.tracker.get_total_expenses("2025-01-02", "2025-01-03"), 55.0)
+        self.assertEqual(len(self.tracker.expenses), 2)
+
+    def test_rejects_non_iso_dates(self):
+        with self.assertRaises(ValueError):
+            self.tracker.add_expense(10.0, "Food", "Lunch", date="01/02/2025")
+        self.assertEqual(len(self.tracker.expenses), 0)
+
+    def test_rejected_replacement_keeps_indexes(self):
+        expense_id = self.tracker.add_expense(10.0, "Food", "Lunch", date="2025-01-01", tags=["meal"])
+        with self.assertRaises(ValueError):
+            self.tracker._insert(Expense(99.0, "Fun", "Game", "01/02/2025", expense_id=expense_id))
+        self.assertEqual(self.tracker.get_total_expenses("2025-01-01", "2025-01-01"), 10.0)
+        self.assertEqual(self.tracker.get_category_totals(), {"Food": 10.0})
+        self.assertEqual([exp["id"] for exp in self.tracker.get_expenses_by_tag("meal")], [expense_id])
+
+    def test_save_and_load(self):
+        expense_id = self.tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        new_tracker = ExpenseTracker(self.user_id, columnar=True)
+        new_tracker.load_from_file()
+        self.assertEqual(new_tracker.get_expense_by_id(expense_id)["date"], "2025-01-01")
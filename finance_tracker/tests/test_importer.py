@@ -0,0 +1,68 @@
+import unittest
+from io import StringIO
+from unittest import mock
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.importer import ColumnMapping, StatementImporter, iter_ofx_transactions, parse_amount
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250103120000[-5:EST]<TRNAMT>-42.50<FITID>1<NAME>GROCER</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250104<TRNAMT>1000.00<FITID>2<NAME>PAYROLL</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250105<TRNAMT>-3.10<FITID>3<MEMO>Coffee shop</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250105<TRNAMT>-3.10<FITID>4<MEMO>Coffee shop</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250105<TRNAMT>-3.10<FITID>4<MEMO>Coffee shop</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+class TestStatementImporter(unittest.TestCase):
+    def setUp(self):
+        self.tracker = ExpenseTracker("test_user")
+        self.tracker.add_expense(12.0, "Food", "Lunch", date="2025-01-02")
+
+    def test_csv_import_with_mapping(self):
+        statement = StringIO(
+            "Booked,Payee,Value,Type\n"
+            "02/01/2025,Lunch,\"12.00\",Food\n"
+            "03/01/2025,Train ticket,\"$1,204.50\",Transport\n"
+            "03/01/2025,Train ticket,1204.5,Transport\n"
+            "04/01/2025,Refund,-5.00,\n"
+            "31/02/2025,Bad date,5.00,\n"
+            "05/01/2025,Snack,2.50,\n")
+        mapping = ColumnMapping(amount="Value", description="Payee", date="Booked", category="Type",
+                                date_format="%d/%m/%Y")
+        importer = StatementImporter(self.tracker, mapping, chunk_size=1)
+        with mock.patch.object(self.tracker, "add_expenses", wraps=self.tracker.add_expenses) as add:
+            result = importer.import_csv(statement)
+        # The lunch is already tracked; the two identical train tickets are separate purchases.
+        self.assertEqual((result.imported, result.duplicates), (3, 1))
+        self.assertEqual([row for row, _ in result.errors], [5, 6])
+        self.assertEqual(add.call_count, 3)
+        self.assertEqual(self.tracker.get_total_expenses(), 12.0 + 2 * 1204.5 + 2.5)
+        self.assertEqual(self.tracker.get_category_totals()["Uncategorized"], 2.5)
+        statement.seek(0)
+        self.assertEqual(importer.import_csv(statement).duplicates, 4)
+
+    def test_amount_formats(self):
+        self.assertEqual(parse_amount("$1,204.50"), 1204.5)
+        self.assertEqual(parse_amount("(42.50)"), -42.5)
+        self.assertEqual(parse_amount("1.204,50", decimal=","), 1204.5)
+        for text in ("1.204,50", "1,2", "", "n/a"):
+            with self.assertRaises(ValueError):
+                parse_amount(text)
+        statement = StringIO("date,description,amount\n2025-01-03,Grocer,(42.50)\n2025-01-04,Pay,100.00\n"
+                             "2025-01-05,Cafe,\"1.204,50\"\n")
+        result = StatementImporter(self.tracker, ColumnMapping(debits_negative=True)).import_csv(statement)
+        self.assertEqual((result.imported, result.skipped, [row for row, _ in result.errors]), (1, 1, [4]))
+        self.assertEqual(next(self.tracker.get_expenses_between("2025-01-03"))["amount"], 42.5)
+
+    def test_ofx_import(self):
+        self.assertEqual(len(list(iter_ofx_transactions(StringIO(OFX), block_size=16))), 5)
+        importer = StatementImporter(self.tracker)
+        result = importer.import_ofx(StringIO(OFX))
+        # Two same-day coffees with different FITIDs are both kept; a repeated FITID is not.
+        self.assertEqual((result.imported, result.skipped, result.duplicates), (3, 1, 1))
+        self.assertEqual([exp["description"] for exp in self.tracker.get_expenses_between("2025-01-03")],
+                         ["GROCER", "Coffee shop", "Coffee shop"])
+        self.assertEqual(importer.import_ofx(StringIO(OFX)).duplicates, 4)
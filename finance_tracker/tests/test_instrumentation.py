@@ -0,0 +1,35 @@
+import unittest
+import json
+from finance_tracker import instrumentation
+from finance_tracker.expenses import ExpenseTracker
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_records_nothing(self):
+        instrumentation.disable()
+        ExpenseTracker("test_user").add_expense(50.0, "Food", "Lunch")
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_counts_latency_and_bytes(self):
+        instrumentation.enable()
+        tracker = ExpenseTracker("test_user")
+        tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        tracker.add_expense(30.0, "Food", "Dinner", date="2025-01-01")
+        with self.assertRaises(ValueError):
+            tracker.add_expense(-1.0, "Food", "Refund")
+        tracker.load_from_file()
+        stats = instrumentation.snapshot()
+        added = stats["ExpenseTracker.add_expense"]
+        self.assertEqual((added["count"], added["errors"]), (3, 1))
+        self.assertEqual(sum(added["histogram_us"].values()), 3)
+        self.assertLessEqual(added["max_seconds"], added["total_seconds"])
+        self.assertGreater(stats["JSONStorage._write"]["bytes_written"], 0)
+        self.assertGreater(stats["JSONStorage._read"]["bytes_read"], 0)
+        exported = json.loads(instrumentation.export_json())
+        self.assertEqual(exported["operations"]["ExpenseTracker.add_expense"]["count"], 3)
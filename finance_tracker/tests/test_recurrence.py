@@ -0,0 +1,84 @@
+import unittest
+import shutil
+import tempfile
+from datetime import date
+from itertools import islice
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.recurrence import Schedule
+from finance_tracker.reports import FinancialReport
+from finance_tracker.storage import JSONStorage
+
+class TestSchedule(unittest.TestCase):
+    def schedule(self, start: str, period: str) -> Schedule:
+        return Schedule({"id": "x", "amount": 1.0, "category": "Rent", "description": "Rent", "date": start,
+                         "tags": [], "is_recurring": True, "recurrence_period": period})
+
+    def test_month_end_is_clamped(self):
+        schedule = self.schedule("2024-01-31", "monthly")
+        self.assertEqual(list(schedule.dates(None, date(2024, 4, 30))),
+                         [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)])
+        self.assertEqual(self.schedule("2024-02-29", "yearly").occurrence(1), date(2025, 2, 28))
+
+    def test_count_matches_expansion(self):
+        for period in ("daily", "weekly", "biweekly", "monthly", "quarterly", "yearly"):
+            schedule = self.schedule("2023-08-31", period)
+            first, last = date(2024, 2, 15), date(2026, 5, 30)
+            self.assertEqual(schedule.count(first, last), len(list(schedule.dates(first, last))), period)
+
+    def test_long_running_subscription_is_not_materialized(self):
+        schedule = self.schedule("1900-01-01", "daily")
+        self.assertEqual(schedule.count(None, date(2099, 12, 31)), 73048)
+        self.assertEqual(next(schedule.dates(date(2099, 12, 31), date(2099, 12, 31))), date(2099, 12, 31))
+
+
+class TestRecurringExpansion(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.tracker = ExpenseTracker("test_user", storage=JSONStorage(self.directory))
+        self.rent_id = self.tracker.add_expense(1000.0, "Rent", "Flat", date="2025-01-01",
+                                                is_recurring=True, recurrence_period="monthly")
+        self.tracker.add_expense(50.0, "Food", "Lunch", date="2025-02-10")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_total_expenses(self):
+        self.assertEqual(self.tracker.get_total_expenses("2025-01-01", "2025-03-31"), 1050.0)
+        self.assertEqual(self.tracker.get_total_expenses("2025-01-01", "2025-03-31", expand_recurring=True),
+                         3050.0)
+        self.assertEqual(self.tracker.get_total_expenses("2025-02-01", "2025-02-28", expand_recurring=True),
+                         1050.0)
+
+    def test_update_and_delete_invalidate_expansion(self):
+        self.assertEqual(self.tracker.recurrence.total("2025-01-01", "2025-12-31"), 11000.0)
+        self.tracker.update_expense(self.rent_id, amount=1200.0, category="Housing")
+        self.assertEqual(self.tracker.recurrence.category_totals("2025-01-01", "2025-12-31"),
+                         {"Housing": 13200.0})
+        self.tracker.delete_expense(self.rent_id)
+        self.assertEqual(self.tracker.recurrence.total("2025-01-01", "2025-12-31"), 0.0)
+
+    def test_occurrences_are_lazy_and_ordered(self):
+        occurrences = self.tracker.get_occurrences("2025-01-01", "2999-12-31")
+        first = list(islice(occurrences, 4))
+        self.assertEqual([item["date"] for item in first],
+                         ["2025-01-01", "2025-02-01", "2025-02-10", "2025-03-01"])
+        self.assertEqual(first[1]["recurrence_of"], self.rent_id)
+        self.assertNotIn("recurrence_of", first[0])
+
+    def test_invalid_period_rejected(self):
+        with self.assertRaises(ValueError):
+            self.tracker.add_expense(10.0, "Gym", "Membership", is_recurring=True,
+                                     recurrence_period="fortnightly")
+
+    def test_reports(self):
+        report = FinancialReport("test_user", self.tracker, None)
+        summary = report.generate_category_summary("2025-01-01", "2025-06-30", expand_recurring=True)
+        self.assertEqual(summary["category_totals"], {"Rent": 6000.0, "Food": 50.0})
+        self.assertEqual(report.generate_category_summary("2025-01-01", "2025-06-30")["total"], 1050.0)
+        trend = report.generate_trend_analysis(months=3, expand_recurring=True)["monthly_totals"]
+        this_month = date.today().strftime("%Y-%m")
+        self.assertEqual(trend[this_month], 1000.0)
+        shutil.rmtree(report.report_dir)
+
+if __name__ == '__main__':
+    unittest.main()
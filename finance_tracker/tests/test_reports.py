@@ -3,7 +3,9 @@ import os
 from datetime import datetime, timedelta
 from finance_tracker.expenses import ExpenseTracker
 from finance_tracker.budgets import BudgetManager
-from finance_tracker.reports import FinancialReport
+from finance_tracker.reports import FinancialReport, _ExpenseColumns
+from finance_tracker.charts import ChartRenderer
+from unittest.mock import patch
 
 class TestFinancialReport(unittest.TestCase):
     def setUp(self):
@@ -24,6 +26,12 @@ class TestFinancialReport(unittest.TestCase):
         self.assertEqual(summary["category_totals"]["Transport"], 30.0)
         self.assertEqual(summary["total"], 80.0)
 
+    def test_generate_category_summary_open_range(self):
+        self.expense_tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        self.expense_tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        summary = self.report_generator.generate_category_summary(start_date="2025-01-02")
+        self.assertEqual(summary["category_totals"], {"Transport": 30.0})
+
     def test_generate_budget_comparison(self):
         self.budget_manager.set_budget("Food", 200.0)
         self.budget_manager.add_spending("Food", 150.0)
@@ -39,4 +47,93 @@ class TestFinancialReport(unittest.TestCase):
         trend = self.report_generator.generate_trend_analysis(months=2)
         self.assertIn(first_date.strftime("%Y-%m"), trend["monthly_totals"])
         self.assertIn(second_date.strftime("%Y-%m"), trend["monthly_totals"])
-        self.assertEqual(trend["monthly_totals"][first_date.strftime("%Y-%m")], 50.0)
\ No newline at end of file
+        self.assertEqual(trend["monthly_totals"][first_date.strftime("%Y-%m")], 50.0)
+
+    def test_trend_analysis_partial_months(self):
+        today = datetime.now()
+        window_start = today - timedelta(days=60)
+        self.expense_tracker.add_expense(40.0, "Food", "Before window",
+                                         date=(window_start - timedelta(days=1)).strftime("%Y-%m-%d"))
+        self.expense_tracker.add_expense(25.0, "Food", "Window start", date=window_start.strftime("%Y-%m-%d"))
+        self.expense_tracker.add_expense(15.0, "Food", "Tomorrow",
+                                         date=(today + timedelta(days=1)).strftime("%Y-%m-%d"))
+        trend = self.report_generator.generate_trend_analysis(months=2)
+        self.assertEqual(sum(trend["monthly_totals"].values()), 25.0)
+        self.assertEqual(trend["monthly_totals"][window_start.strftime("%Y-%m")], 25.0)
+
+    def test_vectorized_path_matches_loops(self):
+        for day in range(1, 29):
+            self.expense_tracker.add_expense(10.0 + day, "Food" if day % 3 else "Transport",
+                                             f"Item {day}", date=f"2025-02-{day:02d}")
+        self.expense_tracker.add_expense(5.0, "Fun", "Movie", date=datetime.now().strftime("%Y-%m-%d"))
+        report = self.report_generator
+        ranges = [("2025-02-05", "2025-02-20"), (None, "2025-02-03"), ("2025-02-27", None), (None, None)]
+        looped = [report._range_category_totals(*bounds) for bounds in ranges]
+        report.VECTORIZE_THRESHOLD, report.VECTORIZE_AFTER = 0, 1
+        with patch("finance_tracker.reports._ExpenseColumns", wraps=_ExpenseColumns) as build:
+            # The first query after a change loops; the next builds the view, which is reused.
+            vectorized = [report._range_category_totals(*bounds) for bounds in ranges]
+            self.assertEqual(build.call_count, 1)
+        self.assertIsNotNone(report._columns)
+        self.assertEqual(vectorized, looped)
+        self.expense_tracker.add_expense(7.0, "Fun", "Game", date="2025-02-10")
+        summary = self.report_generator.generate_category_summary("2025-02-10", "2025-02-10")
+        self.assertEqual(summary["category_totals"], {"Food": 20.0, "Fun": 7.0})
+
+    def test_charts_render_in_background_and_are_cached(self):
+        self.expense_tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        self.budget_manager.set_budget("Food", 200.0)
+        renderer = ChartRenderer()
+        self.report_generator.renderer = renderer
+        try:
+            futures = [self.report_generator.submit_category_chart(),
+                       self.report_generator.submit_trend_chart(),
+                       self.report_generator.submit_budget_chart()]
+            paths = [future.result() for future in futures]
+            for path in paths:
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+            with patch.object(renderer, "_render") as render:
+                self.assertEqual(self.report_generator.plot_category_distribution(), paths[0])
+                render.assert_not_called()
+            self.expense_tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+            self.assertNotEqual(self.report_generator.plot_category_distribution(), paths[0])
+        finally:
+            renderer.shutdown()
+
+    def test_old_chart_files_are_evicted(self):
+        renderer = ChartRenderer(keep_files=2)
+        self.report_generator.renderer = renderer
+        try:
+            paths = []
+            for day in range(1, 5):
+                self.expense_tracker.add_expense(float(day), "Food", "Lunch", date=f"2025-01-0{day}")
+                paths.append(self.report_generator.plot_category_distribution())
+            trend = self.report_generator.submit_trend_chart().result()
+        finally:
+            renderer.shutdown()
+        self.assertEqual([os.path.exists(path) for path in paths], [False, False, True, True])
+        self.assertTrue(os.path.exists(trend))
+        with self.assertRaises(ValueError):
+            ChartRenderer(keep_files=0)
+
+    def test_report_cache(self):
+        self.expense_tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        report = FinancialReport(self.user_id, self.expense_tracker, self.budget_manager, cache_size=2)
+        first = report.generate_category_summary()
+        first["total"] = 0.0
+        self.assertEqual(report.generate_category_summary()["total"], 50.0)
+        self.assertEqual(report.cache_info()["hits"], 1)
+        path = report.generate_report_pdf("category_summary")
+        mtime = os.stat(path).st_mtime_ns
+        self.assertEqual(report.generate_report_pdf("category_summary"), path)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        self.assertEqual(report.cache_info()["file_reuses"], 1)
+        self.budget_manager.set_budget("Food", 200.0)
+        report.generate_budget_comparison()
+        report.generate_trend_analysis()
+        self.assertEqual(report.cache_info()["size"], 2)
+        self.expense_tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        misses = report.cache_info()["misses"]
+        self.assertEqual(report.generate_category_summary()["total"], 80.0)
+        self.assertEqual(report.cache_info()["misses"], misses + 1)
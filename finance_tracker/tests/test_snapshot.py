@@ -0,0 +1,62 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.reports import FinancialReport
+from finance_tracker.snapshot import ExpenseSnapshot, export_snapshot
+from finance_tracker.storage import JSONStorage
+
+class TestExpenseSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = JSONStorage(self.directory)
+        self.tracker = ExpenseTracker("test_user", storage=self.storage)
+        self.tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02", tags=["commute"])
+        self.tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01", tags=["meal", "work"])
+        self.tracker.add_expense(20.0, "Food", "Snack", date="2025-02-10", tags=["meal"])
+        ExpenseTracker("other_user", storage=self.storage).add_expense(99.0, "Food", "Dinner",
+                                                                       date="2025-01-05")
+        self.path = export_snapshot(os.path.join(self.directory, "snapshot"),
+                                    ["test_user", "other_user", "empty_user"], self.storage)
+        self.snapshot = ExpenseSnapshot(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        shutil.rmtree("reports_test_user", ignore_errors=True)
+
+    def test_columns_are_memory_mapped(self):
+        self.assertIsInstance(self.snapshot.amount, np.memmap)
+        self.assertEqual(self.snapshot.amount.dtype, np.dtype("<f8"))
+        self.assertEqual(self.snapshot.user_rows("test_user"), (0, 3))
+        self.assertEqual(self.snapshot.user_rows("empty_user"), (4, 4))
+        self.assertEqual(str(self.snapshot.day[0].astype("datetime64[D]")), "2025-01-01")
+
+    def test_aggregates(self):
+        self.assertEqual(self.snapshot.total("test_user", "2025-01-02", "2025-02-10"), 50.0)
+        self.assertEqual(self.snapshot.total(), 199.0)
+        self.assertEqual(self.snapshot.category_totals("test_user", end_date="2025-01-31"),
+                         {"Transport": 30.0, "Food": 50.0})
+        self.assertEqual(self.snapshot.monthly_totals("test_user", category="Food"),
+                         {"2025-01": 50.0, "2025-02": 20.0})
+        self.assertEqual(self.snapshot.tag_totals("test_user"),
+                         {"commute": 30.0, "meal": 70.0, "work": 50.0})
+        self.assertEqual(self.snapshot.category_totals("empty_user"), {})
+
+    def test_report_from_snapshot_matches_tracker(self):
+        recent = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+        self.tracker.add_expense(12.5, "Food", "Recent", date=recent)
+        snapshot = ExpenseSnapshot(export_snapshot(self.path, ["test_user"], self.storage))
+        # The snapshot opened before the re-export still reads its own files.
+        self.assertEqual((self.snapshot.total(), snapshot.total()), (199.0, 112.5))
+        self.assertEqual([name for name in os.listdir(self.directory) if name.startswith("snapshot")],
+                         ["snapshot"])
+        from_snapshot = FinancialReport.from_snapshot("test_user", snapshot)
+        from_tracker = FinancialReport("test_user", self.tracker, None)
+        for start, end in ((None, None), ("2025-01-02", None), ("2025-01-01", "2025-01-31")):
+            self.assertEqual(from_snapshot.generate_category_summary(start, end)["category_totals"],
+                             from_tracker.generate_category_summary(start, end)["category_totals"])
+        self.assertEqual(from_snapshot.generate_trend_analysis(), from_tracker.generate_trend_analysis())
+        self.assertEqual(from_snapshot.generate_budget_comparison(), [])
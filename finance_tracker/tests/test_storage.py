@@ -0,0 +1,274 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+from finance_tracker import storage as storage_module
+from finance_tracker.storage import (JSONLinesStorage, JSONStorage, SQLiteStorage, ShardedJSONStorage,
+                                     convert_to_jsonl, convert_to_sharded_users, file_lock)
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.budgets import BudgetManager
+from finance_tracker.users import UserManager
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.db_file = "test_finance.db"
+        if os.path.exists(self.db_file):
+            os.remove(self.db_file)
+        self.storage = SQLiteStorage(self.db_file)
+
+    def tearDown(self):
+        self.storage.close()
+        if os.path.exists(self.db_file):
+            os.remove(self.db_file)
+
+    def test_expenses_round_trip(self):
+        tracker = ExpenseTracker("test_user", storage=self.storage)
+        lunch = tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01", tags=["meal"])
+        bus = tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        tracker.update_expense(lunch, amount=55.0)
+        tracker.delete_expense(bus)
+        tracker.add_expense(20.0, "Rent", "Deposit", date="2025-01-03", is_recurring=True,
+                            recurrence_period="monthly")
+        reloaded = ExpenseTracker("test_user", storage=self.storage)
+        reloaded.load_from_file()
+        self.assertEqual([exp["description"] for exp in reloaded.get_expenses_between()],
+                         ["Lunch", "Deposit"])
+        self.assertEqual(reloaded.get_expense_by_id(lunch), tracker.get_expense_by_id(lunch))
+        self.assertTrue(reloaded.get_recurring_expenses()[0]["is_recurring"])
+
+    def test_rows_are_scoped_per_user(self):
+        tracker = ExpenseTracker("test_user", storage=self.storage)
+        tracker.add_expenses([{"amount": 10.0, "category": "Food", "description": f"Meal {i}",
+                               "date": f"2025-01-{i + 1:02d}"} for i in range(5)])
+        self.assertEqual(self.storage.total_expenses("test_user"), 50.0)
+        self.assertEqual(self.storage.total_expenses("other_user"), 0.0)
+        self.assertEqual(self.storage.load_expenses("other_user"), [])
+
+    def test_sql_filters_and_aggregates(self):
+        tracker = ExpenseTracker("test_user", storage=self.storage)
+        tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        tracker.add_expense(20.0, "food", "Snack", date="2025-01-03")
+        self.assertEqual(self.storage.total_expenses("test_user", start_date="2025-01-02"), 50.0)
+        self.assertEqual(self.storage.total_expenses("test_user", category="FOOD"), 70.0)
+        self.assertEqual(self.storage.category_totals("test_user", end_date="2025-01-02"),
+                         {"Food": 50.0, "Transport": 30.0})
+        dates = [exp["date"] for exp in self.storage.query_expenses("test_user", category="food")]
+        self.assertEqual(dates, ["2025-01-01", "2025-01-03"])
+
+    def test_threads_do_not_commit_each_others_transactions(self):
+        paused, resume = threading.Event(), threading.Event()
+        expense_row = SQLiteStorage._expense_row
+
+        def slow_row(user_id, item):
+            if item["id"] == "bad":
+                paused.set()
+                resume.wait(5)
+                raise ValueError("bad row")
+            return expense_row(user_id, item)
+
+        def change(expense_id):
+            return {"op": "add", "expense": {"id": expense_id, "amount": 1.0, "category": "Food",
+                                             "description": "x", "date": "2025-01-01", "tags": [],
+                                             "is_recurring": False, "recurrence_period": None}}
+
+        def failing_write():
+            with self.assertRaises(ValueError):
+                self.storage.write_expenses("test_user", [change("good"), change("bad")], None)
+        with patch.object(SQLiteStorage, "_expense_row", staticmethod(slow_row)):
+            writer = threading.Thread(target=failing_write)
+            writer.start()
+            self.assertTrue(paused.wait(5))
+            other = threading.Thread(target=self.storage.save_budgets, args=("other", []))
+            other.start()
+            other.join(0.2)
+            self.assertTrue(other.is_alive())  # waits for the open transaction
+            resume.set()
+            writer.join()
+            other.join()
+        # The failed transaction rolled back as a whole; nobody committed it halfway.
+        self.assertEqual(self.storage.load_expenses("test_user"), [])
+
+    def test_budgets_and_users(self):
+        manager = BudgetManager("test_user", storage=self.storage)
+        manager.set_budget("Food", 200.0)
+        manager.add_spending("Food", 50.0)
+        self.assertEqual(BudgetManager("test_user", storage=self.storage)
+                         .get_budget_status("Food")["spent"], 50.0)
+        users = UserManager(storage=self.storage)
+        users.register_user("sqluser", "password123", "sql@example.com")
+        users.update_user("sqluser", preferences={"currency": "EUR"})
+        reloaded = UserManager(storage=self.storage)
+        self.assertTrue(reloaded.authenticate_user("sqluser", "password123"))
+        self.assertEqual(reloaded.get_user("sqluser")["preferences"]["currency"], "EUR")
+        reloaded.delete_user("sqluser")
+        self.assertIsNone(UserManager(storage=self.storage).get_user("sqluser"))
+
+
+class TestJSONLinesStorage(unittest.TestCase):
+    def setUp(self):
+        self.user_id = "test_user"
+        self.files = [f"expenses_{self.user_id}.{ext}" for ext in ("json", "jsonl", "journal")]
+        self.files += [f"{path}.lock" for path in self.files]
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def tearDown(self):
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_streaming_with_journal(self):
+        storage = JSONLinesStorage(journal=True, compact_every=4)
+        tracker = ExpenseTracker(self.user_id, storage=storage)
+        lunch = tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        bus = tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        tracker.add_expense(20.0, "Food", "Snack", date="2025-01-03")
+        tracker.update_expense(lunch, amount=55.0)
+        tracker.delete_expense(bus)
+        tracker.add_expense(10.0, "Food", "Coffee", date="2025-01-04")
+        with open(f"expenses_{self.user_id}.jsonl") as f:
+            self.assertEqual(len(f.readlines()), 3)
+        with open(f"expenses_{self.user_id}.journal") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        records = list(tracker.iter_expenses())
+        self.assertEqual([record["description"] for record in records], ["Lunch", "Snack", "Coffee"])
+        self.assertEqual(records[0]["amount"], 55.0)
+        food = tracker.iter_expenses(filter=lambda record: record["category"] == "Food")
+        self.assertEqual(sum(record["amount"] for record in food), 85.0)
+
+    def test_convert_from_json_array(self):
+        tracker = ExpenseTracker(self.user_id, journal=True)
+        tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        tracker.compact()
+        tracker.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        path = convert_to_jsonl(self.user_id)
+        with open(path) as f:
+            self.assertEqual([json.loads(line)["description"] for line in f], ["Lunch", "Bus"])
+        self.assertFalse(os.path.exists(f"expenses_{self.user_id}.journal"))
+        converted = ExpenseTracker(self.user_id, storage=JSONLinesStorage())
+        converted.load_from_file()
+        self.assertEqual(converted.get_total_expenses(), 80.0)
+
+
+class TestShardedJSONStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = ShardedJSONStorage(self.directory, user_shards=8)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_changes_touch_one_shard(self):
+        users = UserManager(storage=self.storage)
+        with users.batch():
+            for i in range(40):
+                users.register_user(f"user{i}", "password123", f"user{i}@example.com")
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, "users"))), 8)
+        target = self.storage.user_shard_file("user7")
+        mtimes = {path: os.stat(path).st_mtime_ns for path in
+                  (os.path.join(self.directory, "users", name)
+                   for name in os.listdir(os.path.join(self.directory, "users")))}
+        users.update_user("user7", email="seven@example.com")
+        for path, mtime in mtimes.items():
+            if path != target:
+                self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        reloaded = UserManager(storage=self.storage)
+        self.assertEqual(reloaded.get_user("user7")["email"], "seven@example.com")
+        self.assertTrue(reloaded.delete_user("user3"))
+        self.assertEqual(len(UserManager(storage=self.storage).users), 39)
+
+    def test_convert_from_single_file(self):
+        users = UserManager(storage=JSONStorage(self.directory))
+        users.register_user("alice", "password123", "alice@example.com")
+        users.register_user("bob", "password123", "bob@example.com")
+        convert_to_sharded_users(self.directory, user_shards=8)
+        sharded = UserManager(storage=self.storage)
+        self.assertTrue(sharded.authenticate_user("bob", "password123"))
+        self.assertEqual(sorted(sharded.users), ["alice", "bob"])
+
+
+def _add_expenses(directory: str, worker: int, count: int) -> None:
+    tracker = ExpenseTracker("test_user", storage=JSONStorage(directory, fsync=False))
+    for i in range(count):
+        tracker.add_expense(1.0, "Food", f"Worker {worker} item {i}", date="2025-01-01")
+
+
+class TestConcurrentJSONWrites(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_failed_write_keeps_previous_file(self):
+        storage = JSONStorage(self.directory)
+        tracker = ExpenseTracker("test_user", storage=storage)
+        tracker.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        with self.assertRaises(TypeError):
+            storage.save_expenses("test_user", [{"id": "bad", "amount": object()}])
+        self.assertEqual(len(storage.load_expenses("test_user")), 1)
+        self.assertFalse([name for name in os.listdir(self.directory) if name.endswith(".tmp")])
+
+    def test_stale_writers_merge_instead_of_overwriting(self):
+        first = ExpenseTracker("test_user", storage=JSONStorage(self.directory))
+        second = ExpenseTracker("test_user", storage=JSONStorage(self.directory))
+        lunch = first.add_expense(50.0, "Food", "Lunch", date="2025-01-01")
+        second.add_expense(30.0, "Transport", "Bus", date="2025-01-02")
+        first.delete_expense(lunch)
+        first.add_expense(20.0, "Fun", "Movie", date="2025-01-03")
+        stored = JSONStorage(self.directory).load_expenses("test_user")
+        self.assertEqual(sorted(item["description"] for item in stored), ["Bus", "Movie"])
+        budgets = BudgetManager("test_user", storage=JSONStorage(self.directory))
+        other_budgets = BudgetManager("test_user", storage=JSONStorage(self.directory))
+        budgets.set_budget("Food", 200.0)
+        other_budgets.set_budget("Transport", 100.0)
+        self.assertEqual(len(JSONStorage(self.directory).load_budgets("test_user")), 2)
+
+    def test_user_file_is_parsed_once_until_it_changes(self):
+        storage = JSONStorage(self.directory)
+        users = UserManager(storage)
+        with patch.object(storage_module.json, "load", wraps=json.load) as load:
+            for n in range(20):
+                users.register_user(f"user{n}", "password123", f"user{n}@example.com")
+            self.assertTrue(UserManager(storage).authenticate_user("user7", "password123"))
+            self.assertIsNone(storage.load_user("nobody"))
+            self.assertLessEqual(load.call_count, 1)
+            storage.load_user("user1")["email"] = "changed@example.com"
+            users.update_user("user1", preferences={"currency": "EUR"})
+            self.assertEqual(storage.load_user("user1")["email"], "user1@example.com")
+            UserManager(JSONStorage(self.directory)).delete_user("user2")
+            self.assertIsNone(storage.load_user("user2"))
+            self.assertEqual(storage.load_user("user1")["preferences"]["currency"], "EUR")
+        self.assertEqual(len(JSONStorage(self.directory).load_users()), 19)
+
+    def test_processes_do_not_lose_updates(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            for future in [pool.submit(_add_expenses, self.directory, worker, 25) for worker in range(4)]:
+                future.result()
+        self.assertEqual(len(JSONStorage(self.directory).load_expenses("test_user")), 100)
+
+    def test_waiting_writers_are_group_committed(self):
+        storage = JSONStorage(self.directory, fsync=False)
+        trackers = [ExpenseTracker("test_user", storage=storage) for _ in range(5)]
+        path = storage.expense_file("test_user")
+        queue = storage_module._commit_queue(path)
+        with patch.object(JSONStorage, "_write", autospec=True, side_effect=JSONStorage._write) as write:
+            with file_lock(path):
+                threads = [threading.Thread(target=tracker.add_expense, args=(1.0, "Food", f"Item {i}"))
+                           for i, tracker in enumerate(trackers)]
+                for thread in threads:
+                    thread.start()
+                while len(queue._queue) < 5:
+                    time.sleep(0.001)
+            for thread in threads:
+                thread.join()
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(storage.load_expenses("test_user")), 5)
+
@@ -0,0 +1,88 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import date
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.reports import FinancialReport
+from finance_tracker.snapshot import ExpenseSnapshot, export_snapshot
+from finance_tracker.storage import JSONStorage
+from finance_tracker.timeseries import TimeSeriesEngine, bucket_index, bucket_label, bucket_start
+
+class TestBuckets(unittest.TestCase):
+    def test_calendar_boundaries(self):
+        # 2024-12-30 is the Monday starting ISO week 1 of 2025.
+        week = bucket_index(date(2025, 1, 1), "weekly")
+        self.assertEqual(bucket_start(week, "weekly"), date(2024, 12, 30))
+        self.assertEqual(bucket_label(week, "weekly"), "2025-W01")
+        self.assertEqual(bucket_index(date(2024, 12, 29), "weekly"), week - 1)
+        quarter = bucket_index(date(2025, 6, 30), "quarterly")
+        self.assertEqual((bucket_label(quarter, "quarterly"), bucket_start(quarter + 1, "quarterly")),
+                         ("2025-Q2", date(2025, 7, 1)))
+        with self.assertRaises(ValueError):
+            bucket_index(date(2025, 1, 1), "hourly")
+
+
+class TestTimeSeries(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = JSONStorage(self.directory)
+        self.tracker = ExpenseTracker("test_user", storage=self.storage)
+        self.tracker.add_expense(10.0, "Food", "Lunch", date="2025-01-31")
+        self.tracker.add_expense(20.0, "Food", "Dinner", date="2025-01-31")
+        self.tracker.add_expense(5.0, "Transport", "Bus", date="2025-03-02")
+        self.tracker.add_expense(40.0, "Food", "Groceries", date="2025-04-15")
+        self.engine = TimeSeriesEngine(self.tracker)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_every_month_is_present_once(self):
+        series = self.engine.series("2025-01-31", "2025-04-30")
+        self.assertEqual(series.labels, ["2025-01", "2025-02", "2025-03", "2025-04"])
+        self.assertEqual(series.totals, [30.0, 0.0, 5.0, 40.0])
+        self.assertEqual(series.categories,
+                         {"Food": [30.0, 0.0, 0.0, 40.0], "Transport": [0.0, 0.0, 5.0, 0.0]})
+        self.assertEqual(series.bounds(0), (date(2025, 1, 31), date(2025, 1, 31)))
+        self.assertEqual(self.engine.series("2025-01-01", "2025-12-31", "quarterly").totals,
+                         [35.0, 40.0, 0.0, 0.0])
+
+    def test_rolling_average_and_deltas(self):
+        series = self.engine.series("2025-01-01", "2025-04-30")
+        self.assertEqual(series.rolling_average(2), [None, 15.0, 2.5, 22.5])
+        self.assertEqual(series.deltas(), [None, -30.0, 5.0, 35.0])
+        self.assertEqual(series.percent_changes(), [None, -1.0, None, 7.0])
+        self.assertEqual(series.deltas("Transport"), [None, 0.0, 5.0, -5.0])
+
+    def test_updates_are_reflected(self):
+        self.assertEqual(self.engine.series("2025-01-01", "2025-01-31", "daily").totals[-1], 30.0)
+        lunch_id = self.tracker.get_expenses_by_category("Food")[0]["id"]
+        self.tracker.update_expense(lunch_id, amount=15.0, category="Snacks")
+        series = self.engine.series("2025-01-01", "2025-01-31", "daily")
+        self.assertEqual(series.totals[-1], 35.0)
+        self.assertEqual(series.categories["Snacks"][-1], 15.0)
+
+    def test_recurring_expansion_by_week(self):
+        self.tracker.add_expense(3.0, "Coffee", "Beans", date="2025-02-03", is_recurring=True,
+                                 recurrence_period="weekly")
+        series = self.engine.series("2025-02-01", "2025-02-28", "weekly", expand_recurring=True)
+        self.assertEqual(series.labels, ["2025-W05", "2025-W06", "2025-W07", "2025-W08", "2025-W09"])
+        self.assertEqual(series.categories["Coffee"], [0.0, 3.0, 3.0, 3.0, 3.0])
+
+    def test_report_time_series_matches_snapshot(self):
+        report = FinancialReport("test_user", self.tracker, None)
+        from_tracker = report.generate_time_series("2025-01-01", "2025-06-30", "monthly", window=2)
+        self.assertEqual([bucket["period"] for bucket in from_tracker["buckets"]][:2], ["2025-01", "2025-02"])
+        self.assertEqual(from_tracker["buckets"][3]["categories"], {"Food": 40.0})
+        self.assertEqual(from_tracker["buckets"][3]["rolling_average"], 22.5)
+        snapshot = ExpenseSnapshot(export_snapshot(os.path.join(self.directory, "snapshot"),
+                                                   ["test_user"], self.storage))
+        from_snapshot = FinancialReport.from_snapshot("test_user", snapshot)
+        self.assertEqual(from_snapshot.generate_time_series("2025-01-01", "2025-06-30", "monthly", window=2),
+                         from_tracker)
+        with self.assertRaises(ValueError):
+            report.generate_time_series(granularity="fortnightly")
+        shutil.rmtree(report.report_dir)
+
+if __name__ == '__main__':
+    unittest.main()
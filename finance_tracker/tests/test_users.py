@@ -1,6 +1,7 @@
 import unittest
 import os
-from finance_tracker.users import UserManager
+from unittest import mock
+from finance_tracker.users import User, UserManager
 
 class TestUserManager(unittest.TestCase):
     def setUp(self):
@@ -41,4 +42,31 @@ class TestUserManager(unittest.TestCase):
         if "testuser" not in self.manager.users:
             self.manager.register_user("testuser", "password123", "test@example.com")
         self.assertTrue(self.manager.delete_user("testuser"))
-        self.assertIsNone(self.manager.get_user("testuser"))
\ No newline at end of file
+        self.assertIsNone(self.manager.get_user("testuser"))
+
+    def test_batch_saves_once(self):
+        with mock.patch.object(self.manager.storage, "write_users") as save:
+            with self.manager.batch():
+                self.manager.register_user("batchuser1", "password123", "one@example.com")
+                self.manager.register_user("batchuser2", "password123", "two@example.com")
+        self.assertEqual(save.call_count, 1)
+        self.assertIn("batchuser2", self.manager.users)
+
+    def test_batch_rollback_reloads_users(self):
+        self.manager.register_user("keepuser", "password123", "keep@example.com")
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.update_user("keepuser", email="changed@example.com")
+                self.manager.register_user("ghostuser", "password123", "ghost@example.com")
+                raise RuntimeError("abort")
+        self.assertEqual(self.manager.get_user("keepuser")["email"], "keep@example.com")
+        self.assertIsNone(self.manager.get_user("ghostuser"))
+
+    def test_users_load_lazily_without_hashing(self):
+        self.manager.register_user("lazyuser", "password123", "lazy@example.com")
+        with mock.patch.object(User, "_hash_password") as hash_password:
+            manager = UserManager()
+            self.assertEqual(manager.users._users, {})
+            self.assertTrue(manager.authenticate_user("lazyuser", "password123"))
+            self.assertEqual(list(manager.users._users), ["lazyuser"])
+            hash_password.assert_not_called()
@@ -0,0 +1,165 @@
+import unittest
+import os
+import gc
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+from finance_tracker.budgets import BudgetManager
+from finance_tracker.expenses import ExpenseTracker
+from finance_tracker.storage import JSONStorage, SQLiteStorage
+from finance_tracker.users import UserManager
+from finance_tracker import writebehind
+from finance_tracker.writebehind import WriteBehindStorage
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestWriteBehindStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.backend = JSONStorage(self.directory)
+        self.on_disk = JSONStorage(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_on_close_coalesces_until_flush(self):
+        storage = WriteBehindStorage(self.backend, durability="on_close")
+        tracker = ExpenseTracker("test_user", storage=storage)
+        with patch.object(self.backend, "write_expenses", wraps=self.backend.write_expenses) as write:
+            expense_id = tracker.add_expense(10.0, "Food", "Lunch", date="2025-01-01")
+            tracker.add_expense(20.0, "Transport", "Bus", date="2025-01-02")
+            tracker.update_expense(expense_id, amount=12.0)
+            self.assertEqual((storage.pending, self.on_disk.load_expenses("test_user")), (3, []))
+            storage.close()
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(sorted(item["amount"] for item in self.on_disk.load_expenses("test_user")),
+                         [12.0, 20.0])
+        with self.assertRaises(ValueError):
+            tracker.add_expense(5.0, "Food", "Snack")
+
+    def test_batched_flushes_on_count_and_interval(self):
+        storage = WriteBehindStorage(self.backend, durability="batched", flush_interval=60, flush_every=3)
+        tracker = ExpenseTracker("test_user", storage=storage)
+        for amount in (1.0, 2.0):
+            tracker.add_expense(amount, "Food", "Snack", date="2025-01-01")
+        self.assertEqual(storage.pending, 2)
+        tracker.add_expense(3.0, "Food", "Snack", date="2025-01-01")
+        self.assertTrue(wait_until(lambda: len(self.on_disk.load_expenses("test_user")) == 3))
+        storage.close()
+        storage = WriteBehindStorage(self.backend, durability="batched", flush_interval=0.05)
+        BudgetManager("test_user", storage=storage).set_budget("Food", 100.0)
+        self.assertTrue(wait_until(lambda: self.on_disk.load_budgets("test_user") != []))
+        storage.close()
+
+    def test_reads_see_queued_writes(self):
+        storage = WriteBehindStorage(self.backend, durability="on_close")
+        UserManager(storage).register_user("alice", "password123", "alice@example.com")
+        self.assertTrue(UserManager(storage).authenticate_user("alice", "password123"))
+        self.assertEqual((storage.pending, self.on_disk.load_users()), (1, {}))
+        storage.close()
+
+    def test_reads_do_not_write_before_flush(self):
+        storage = WriteBehindStorage(self.backend, durability="on_close")
+        writes = [patch.object(self.backend, name, wraps=getattr(self.backend, name))
+                  for name in ("write_users", "write_expenses", "write_budgets")]
+        with writes[0] as write_users, writes[1] as write_expenses, writes[2] as write_budgets:
+            users = UserManager(storage)
+            for n in range(20):
+                users.register_user(f"user{n}", "password123", f"user{n}@example.com")
+            users.delete_user("user3")
+            tracker = ExpenseTracker("user0", storage=storage)
+            lunch = tracker.add_expense(10.0, "Food", "Lunch", date="2025-01-01")
+            for amount in (1.0, 2.0, 3.0):
+                tracker.add_expense(amount, "Food", "Snack", date="2025-01-02")
+            tracker.update_expense(lunch, amount=12.0)
+            BudgetManager("user0", storage=storage).set_budget("Food", 100.0)
+            self.assertIsNotNone(UserManager(storage).get_user("user7"))
+            self.assertIsNone(UserManager(storage).get_user("user3"))
+            self.assertEqual(len(UserManager(storage).users), 19)
+            reloaded = ExpenseTracker("user0", storage=storage)
+            reloaded.load_from_file()
+            self.assertEqual(reloaded.get_total_expenses(), 18.0)
+            self.assertEqual(len(list(storage.iter_expenses("user0"))), 4)
+            self.assertEqual(storage.load_budgets("user0")[0]["amount"], 100.0)
+            calls = (write_users.call_count, write_expenses.call_count, write_budgets.call_count)
+            self.assertEqual(calls, (0, 0, 0))
+            storage.flush()
+            calls = (write_users.call_count, write_expenses.call_count, write_budgets.call_count)
+            self.assertEqual(calls, (1, 1, 1))
+        self.assertEqual(len(self.on_disk.load_users()), 19)
+        self.assertEqual(sum(item["amount"] for item in self.on_disk.load_expenses("user0")), 18.0)
+        storage.close()
+
+    def test_save_replaces_queued_changes(self):
+        storage = WriteBehindStorage(self.backend, durability="on_close")
+        tracker = ExpenseTracker("test_user", storage=storage)
+        tracker.add_expense(10.0, "Food", "Lunch", date="2025-01-01")
+        storage.save_expenses("test_user", [])
+        self.assertEqual((storage.pending, storage.load_expenses("test_user")), (0, []))
+        storage.close()
+
+    def test_failed_flush_keeps_changes(self):
+        storage = WriteBehindStorage(self.backend, durability="on_close")
+        tracker = ExpenseTracker("test_user", storage=storage)
+        tracker.add_expense(10.0, "Food", "Lunch", date="2025-01-01")
+        with patch.object(self.backend, "write_expenses", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                storage.flush()
+        tracker.add_expense(20.0, "Food", "Dinner", date="2025-01-02")
+        self.assertEqual(storage.pending, 2)
+        storage.flush()
+        self.assertEqual([item["description"] for item in self.on_disk.load_expenses("test_user")],
+                         ["Lunch", "Dinner"])
+        storage.close()
+
+    def test_immediate_writes_through(self):
+        storage = WriteBehindStorage(self.backend, durability="immediate")
+        ExpenseTracker("test_user", storage=storage).add_expense(10.0, "Food", "Lunch")
+        self.assertEqual((storage.pending, len(self.on_disk.load_expenses("test_user"))), (0, 1))
+        storage.close()
+        with self.assertRaises(ValueError):
+            WriteBehindStorage(self.backend, durability="eventually")
+
+    def test_queued_changes_are_flushed_at_exit(self):
+        script = ("from finance_tracker.expenses import ExpenseTracker\n"
+                  "from finance_tracker.storage import JSONStorage\n"
+                  "from finance_tracker.writebehind import WriteBehindStorage\n"
+                  f"storage = WriteBehindStorage(JSONStorage({self.directory!r}), durability='on_close')\n"
+                  "ExpenseTracker('test_user', storage=storage).add_expense(10.0, 'Food', 'Lunch')\n")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        subprocess.run([sys.executable, "-c", script], check=True,
+                       env={**os.environ, "PYTHONPATH": root})
+        self.assertEqual(len(self.on_disk.load_expenses("test_user")), 1)
+
+    def test_unreferenced_store_keeps_queued_changes(self):
+        def add_and_forget():
+            storage = WriteBehindStorage(JSONStorage(self.directory), durability="on_close")
+            ExpenseTracker("test_user", storage=storage).add_expense(10.0, "Food", "Lunch")
+        add_and_forget()
+        gc.collect()
+        writebehind._flush_all()
+        self.assertEqual(len(self.on_disk.load_expenses("test_user")), 1)
+
+    def test_sqlite_backend_from_flusher_thread(self):
+        path = os.path.join(self.directory, "finance.db")
+        with WriteBehindStorage(SQLiteStorage(path), durability="batched", flush_interval=0.01) as storage:
+            tracker = ExpenseTracker("test_user", storage=storage)
+            tracker.add_expense(10.0, "Food", "Lunch")
+            self.assertTrue(wait_until(lambda: storage.pending == 0))
+            self.assertIsNone(storage.last_error)
+        reopened = SQLiteStorage(path)
+        self.assertEqual(len(reopened.load_expenses("test_user")), 1)
+        reopened.close()
+
+if __name__ == '__main__':
+    unittest.main()
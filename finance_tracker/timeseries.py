@@ -0,0 +1,245 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+GRANULARITIES = ("daily", "weekly", "monthly", "quarterly", "yearly")
+
+
+def bucket_index(day: date, granularity: str) -> int:
+    """Number of the calendar bucket containing a day; consecutive buckets differ by one.
+
+    Weeks run Monday to Sunday, as in ISO 8601.
+    """
+    if granularity == "daily":
+        return day.toordinal()
+    if granularity == "weekly":
+        return (day.toordinal() - 1) // 7
+    if granularity == "monthly":
+        return day.year * 12 + day.month - 1
+    if granularity == "quarterly":
+        return day.year * 4 + (day.month - 1) // 3
+    if granularity == "yearly":
+        return day.year
+    raise ValueError(f"Invalid granularity: {granularity}")
+
+
+def bucket_start(index: int, granularity: str) -> date:
+    """First day of a bucket numbered by bucket_index."""
+    if granularity == "daily":
+        return date.fromordinal(index)
+    if granularity == "weekly":
+        return date.fromordinal(index * 7 + 1)
+    if granularity == "monthly":
+        return date(index // 12, index % 12 + 1, 1)
+    if granularity == "quarterly":
+        return date(index // 4, index % 4 * 3 + 1, 1)
+    if granularity == "yearly":
+        return date(index, 1, 1)
+    raise ValueError(f"Invalid granularity: {granularity}")
+
+
+def bucket_label(index: int, granularity: str) -> str:
+    """Label of a bucket: YYYY-MM-DD, YYYY-Www (ISO week), YYYY-MM, YYYY-Qn or YYYY."""
+    start = bucket_start(index, granularity)
+    if granularity == "daily":
+        return start.isoformat()
+    if granularity == "weekly":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "monthly":
+        return f"{start.year:04d}-{start.month:02d}"
+    if granularity == "quarterly":
+        return f"{start.year:04d}-Q{index % 4 + 1}"
+    return f"{start.year:04d}"
+
+
+class TimeSeries:
+    """Spending per calendar bucket between two inclusive dates.
+
+    ``totals`` holds one amount per bucket, in order. ``categories`` maps
+    each category with spending in the range to its own per-bucket amounts.
+    The first and last buckets are clipped to the range, so they may cover
+    only part of a period. Every bucket in between is present, including
+    buckets with no spending.
+    """
+    def __init__(self, granularity: str, first: date, last: date, totals: List[float],
+                 categories: Dict[str, List[float]]):
+        self.granularity = granularity
+        self.first = first
+        self.last = last
+        self.first_index = bucket_index(first, granularity)
+        self.totals = totals
+        self.categories = categories
+
+    @property
+    def labels(self) -> List[str]:
+        """Bucket labels, in order."""
+        return [bucket_label(self.first_index + offset, self.granularity)
+                for offset in range(len(self.totals))]
+
+    def bounds(self, position: int) -> Tuple[date, date]:
+        """Inclusive first and last day of a bucket, clipped to the series range."""
+        index = self.first_index + position
+        end = bucket_start(index + 1, self.granularity) - timedelta(days=1)
+        return max(bucket_start(index, self.granularity), self.first), min(end, self.last)
+
+    def _values(self, category: str = None) -> List[float]:
+        if category is None:
+            return self.totals
+        return self.categories.get(category, [0.0] * len(self.totals))
+
+    def rolling_average(self, window: int, category: str = None) -> List[Optional[float]]:
+        """Mean of each bucket and the ``window - 1`` before it; None until a full window is available."""
+        if window < 1:
+            raise ValueError("Window must be at least 1")
+        values = self._values(category)
+        averages: List[Optional[float]] = []
+        running = 0.0
+        for position, value in enumerate(values):
+            running += value
+            if position >= window:
+                running -= values[position - window]
+            averages.append(running / window if position >= window - 1 else None)
+        return averages
+
+    def deltas(self, category: str = None) -> List[Optional[float]]:
+        """Change from the previous bucket; None for the first."""
+        values = self._values(category)
+        return [None] + [current - previous for previous, current in zip(values, values[1:])]
+
+    def percent_changes(self, category: str = None) -> List[Optional[float]]:
+        """Relative change from the previous bucket; None for the first and after an empty bucket."""
+        values = self._values(category)
+        return [None] + [(current - previous) / previous if previous else None
+                         for previous, current in zip(values, values[1:])]
+
+    def to_dict(self, window: int = 3) -> Dict:
+        """Convert the series, with rolling averages and deltas, to a dictionary."""
+        averages, deltas, changes = self.rolling_average(window), self.deltas(), self.percent_changes()
+        buckets = []
+        for position, label in enumerate(self.labels):
+            start, end = self.bounds(position)
+            buckets.append({
+                "period": label,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "total": self.totals[position],
+                "categories": {category: values[position]
+                               for category, values in self.categories.items() if values[position]},
+                "rolling_average": averages[position],
+                "delta": deltas[position],
+                "percent_change": changes[position]
+            })
+        return {
+            "granularity": self.granularity,
+            "start": self.first.isoformat(),
+            "end": self.last.isoformat(),
+            "window": window,
+            "buckets": buckets
+        }
+
+
+class TimeSeriesEngine:
+    """Builds TimeSeries from an ExpenseTracker's running per-category daily totals.
+
+    The tracker keeps those totals up to date on every change. Once per
+    tracker version they are flattened into a date-sorted list. The first
+    query at each granularity sums the list into per-bucket, per-category
+    totals in a single pass. After that, a query reads whole buckets from
+    those sums and only rescans the days of the partial buckets at either
+    end of its range. Days that are not ISO dates are left out.
+    """
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self._version: Optional[int] = None
+        self._days: List[int] = []
+        self._rows: List[Tuple[int, str, float]] = []
+        self._buckets: Dict[str, Dict[int, Dict[str, float]]] = {}
+
+    def _refresh(self) -> None:
+        if self._version == self.tracker.version:
+            return
+        rows = []
+        for category, day, amount in self.tracker.get_category_day_totals():
+            try:
+                rows.append((date.fromisoformat(day).toordinal(), category, amount))
+            except ValueError:
+                continue
+        rows.sort(key=itemgetter(0))
+        self._rows = rows
+        self._days = [row[0] for row in rows]
+        self._buckets = {}
+        self._version = self.tracker.version
+
+    def _bucket_sums(self, granularity: str) -> Dict[int, Dict[str, float]]:
+        """Per-category totals of every bucket with spending, built in one pass over the days."""
+        sums = self._buckets.get(granularity)
+        if sums is None:
+            sums = self._buckets[granularity] = {}
+            index, bucket_end = None, 0
+            for ordinal, category, amount in self._rows:
+                if ordinal >= bucket_end:
+                    index = bucket_index(date.fromordinal(ordinal), granularity)
+                    bucket_end = bucket_start(index + 1, granularity).toordinal()
+                    bucket = sums.setdefault(index, {})
+                bucket[category] = bucket.get(category, 0.0) + amount
+        return sums
+
+    def _range_sums(self, first: date, last: date) -> Dict[str, float]:
+        """Per-category totals over an inclusive range, from the daily rows."""
+        sums: Dict[str, float] = {}
+        lo = bisect_left(self._days, first.toordinal())
+        hi = bisect_right(self._days, last.toordinal())
+        for _, category, amount in self._rows[lo:hi]:
+            sums[category] = sums.get(category, 0.0) + amount
+        return sums
+
+    def series(self, start_date: str = None, end_date: str = None, granularity: str = "monthly",
+               expand_recurring: bool = False) -> TimeSeries:
+        """Bucket spending between two inclusive ISO dates.
+
+        An omitted start means the first expense (or the end, when there are
+        none), and an omitted end means today or the last expense, whichever
+        is later. With ``expand_recurring`` the repeat occurrences of
+        recurring expenses are included.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        self._refresh()
+        last = date.fromisoformat(end_date) if end_date else max(
+            date.today(), date.fromordinal(self._days[-1]) if self._days else date.min)
+        first = date.fromisoformat(start_date) if start_date else (
+            min(date.fromordinal(self._days[0]), last) if self._days else last)
+        if first > last:
+            raise ValueError("Start date cannot be after end date")
+        origin = bucket_index(first, granularity)
+        size = bucket_index(last, granularity) - origin + 1
+        series = TimeSeries(granularity, first, last, [0.0] * size, {})
+        whole = self._bucket_sums(granularity)
+        # Only the first and last buckets can be cut short by the range.
+        partial = {position: series.bounds(position) for position in {0, size - 1}}
+        partial = {position: bounds for position, bounds in partial.items()
+                   if bounds != (bucket_start(origin + position, granularity),
+                                 bucket_start(origin + position + 1, granularity) - timedelta(days=1))}
+        for index, sums in whole.items():
+            if origin <= index < origin + size and index - origin not in partial:
+                self._add(series, index - origin, sums)
+        for position, (bucket_first, bucket_last) in partial.items():
+            self._add(series, position, self._range_sums(bucket_first, bucket_last))
+        if expand_recurring:
+            repeats = self.tracker.recurrence.bucket_totals(first.isoformat(), last.isoformat(), granularity)
+            for category, buckets in repeats.items():
+                for index, amount in buckets.items():
+                    self._add(series, index - origin, {category: amount})
+        return series
+
+    @staticmethod
+    def _add(series: TimeSeries, position: int, sums: Dict[str, float]) -> None:
+        """Add per-category amounts to one bucket of a series."""
+        for category, amount in sums.items():
+            series.totals[position] += amount
+            values = series.categories.get(category)
+            if values is None:
+                values = series.categories[category] = [0.0] * len(series.totals)
+            values[position] += amount
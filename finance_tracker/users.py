@@ -1,15 +1,19 @@
 import hashlib
-import json
-import os
-from typing import Dict, Optional
+import warnings
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 import re
+from finance_tracker.instrumentation import instrumented
+from finance_tracker.storage import JSONStorage, ShardedJSONStorage, StorageBackend
 
 class User:
     """Represents a user profile."""
-    def __init__(self, username: str, password: str, email: str, created_at: str = None):
+    def __init__(self, username: str, password: str, email: str, created_at: str = None,
+                 password_hash: str = None):
         self.username = username.strip()
-        self.password_hash = self._hash_password(password)
+        self.password_hash = password_hash if password_hash is not None else self._hash_password(password)
         self.email = email.strip()
         self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.preferences = {"currency": "USD", "language": "en"}
@@ -31,23 +35,116 @@ class User:
     @classmethod
     def from_dict(cls, data: Dict) -> 'User':
         """Create user from dictionary."""
-        user = cls(data["username"], "", data["email"], data["created_at"])
-        user.password_hash = data["password_hash"]
+        user = cls(data["username"], None, data["email"], data["created_at"],
+                   password_hash=data["password_hash"])
         user.preferences = data["preferences"]
         return user
 
+class UserDirectory(MutableMapping):
+    """Username-keyed mapping of User objects, loaded from storage on demand.
+
+    A lookup loads just that user through StorageBackend.load_user and
+    keeps the result, misses included. Iterating or taking the length
+    loads every user once. Assignments and deletions change only the
+    in-memory view; UserManager persists them.
+    """
+    def __init__(self, storage: StorageBackend):
+        self._storage = storage
+        self._users: Dict[str, Optional[User]] = {}
+        self._complete = False
+
+    def __getitem__(self, username: str) -> User:
+        if username not in self._users and not self._complete:
+            data = self._storage.load_user(username)
+            self._users[username] = User.from_dict(data) if data is not None else None
+        user = self._users.get(username)
+        if user is None:
+            raise KeyError(username)
+        return user
+
+    def __setitem__(self, username: str, user: User) -> None:
+        self._users[username] = user
+
+    def __delitem__(self, username: str) -> None:
+        self[username]
+        self._users[username] = None
+
+    def __iter__(self) -> Iterator[str]:
+        self._load_all()
+        return iter([username for username, user in self._users.items() if user is not None])
+
+    def __len__(self) -> int:
+        self._load_all()
+        return sum(1 for user in self._users.values() if user is not None)
+
+    def _load_all(self) -> None:
+        """Load every stored user not already held in memory."""
+        if not self._complete:
+            for username, data in self._storage.load_users().items():
+                if username not in self._users:
+                    self._users[username] = User.from_dict(data)
+            self._complete = True
+
+    def forget(self, usernames: Iterable[str]) -> None:
+        """Drop in-memory entries so they are reloaded from storage."""
+        for username in usernames:
+            self._users.pop(username, None)
+        self._complete = False
+
+
 class UserManager:
-    """Manages user authentication and profiles."""
-    def __init__(self):
-        self.users: Dict[str, User] = {}
-        self.data_file = "users.json"
-        self._load_users()
+    """Manages user authentication and profiles, persisted through a StorageBackend.
+
+    Users are loaded lazily through a UserDirectory. Startup reads nothing,
+    and authenticate_user and get_user load only the user they need. The
+    default JSONStorage parses users.json once and answers from that copy
+    until the file changes. ShardedJSONStorage reads one small shard
+    instead, which keeps the first lookup cheap too.
+    """
+    def __init__(self, storage: StorageBackend = None):
+        self.storage = storage or JSONStorage()
+        self.users = UserDirectory(self.storage)
+        self._pending: Optional[List[Dict]] = None
+
+    @property
+    def data_file(self) -> Optional[str]:
+        """Deprecated: path of the JSON user file, or None for sharded and non-JSON backends."""
+        warnings.warn("UserManager.data_file is deprecated; use storage.user_file()",
+                      DeprecationWarning, stacklevel=2)
+        if isinstance(self.storage, JSONStorage) and not isinstance(self.storage, ShardedJSONStorage):
+            return self.storage.user_file()
+        return None
+
+    @contextmanager
+    def batch(self) -> Iterator['UserManager']:
+        """Group user changes so they are saved once on exit.
+
+        If the block raises, users are rolled back to their state on entry
+        and nothing is written. Nested batches join the outermost one.
+        """
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = []
+        try:
+            yield self
+        except BaseException:
+            # Nothing was written during the batch, so storage still holds
+            # the state on entry; reload the touched users from it.
+            changes, self._pending = self._pending, None
+            self.users.forget(change["username"] if change["op"] == "delete" else change["user"]["username"]
+                              for change in changes)
+            raise
+        changes, self._pending = self._pending, None
+        if changes:
+            self.storage.write_users(changes, self._snapshot)
 
     def validate_email(self, email: str) -> bool:
         """Validate email format."""
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return bool(re.match(pattern, email))
 
+    @instrumented
     def register_user(self, username: str, password: str, email: str) -> bool:
         """Register a new user."""
         if not username or not password or not email:
@@ -59,16 +156,18 @@ class UserManager:
         if len(password) < 8:
             raise ValueError("Password must be at least 8 characters")
         self.users[username] = User(username, password, email)
-        self._save_users()
+        self._persist({"op": "put", "user": self.users[username].to_dict()})
         return True
 
+    @instrumented
     def authenticate_user(self, username: str, password: str) -> bool:
         """Authenticate a user."""
-        if username in self.users:
-            user = self.users[username]
+        user = self.users.get(username)
+        if user is not None:
             return user.password_hash == hashlib.sha256(password.encode()).hexdigest()
         return False
 
+    @instrumented
     def update_user(self, username: str, email: str = None, password: str = None,
                    preferences: Dict = None) -> bool:
         """Update user profile."""
@@ -85,32 +184,39 @@ class UserManager:
             user.password_hash = user._hash_password(password)
         if preferences is not None:
             user.preferences.update(preferences)
-        self._save_users()
+        self._persist({"op": "put", "user": user.to_dict()})
         return True
 
+    @instrumented
     def delete_user(self, username: str) -> bool:
         """Delete a user."""
         if username in self.users:
             del self.users[username]
-            self._save_users()
+            self._persist({"op": "delete", "username": username})
             return True
         return False
 
+    @instrumented
     def get_user(self, username: str) -> Optional[Dict]:
         """Retrieve user profile."""
         user = self.users.get(username)
         return user.to_dict() if user else None
 
+    def _persist(self, change: Dict) -> None:
+        """Save a user change now, or once the open batch exits."""
+        if self._pending is not None:
+            self._pending.append(change)
+        else:
+            self.storage.write_users([change], self._snapshot)
+
+    def _snapshot(self) -> Dict[str, Dict]:
+        """Serialize every user, keyed by username."""
+        return {username: user.to_dict() for username, user in self.users.items()}
+
     def _save_users(self) -> None:
-        """Save users to a JSON file."""
-        with open(self.data_file, 'w') as f:
-            json.dump({username: user.to_dict() for username, user in self.users.items()}, f, indent=2)
+        """Save all users through the storage backend."""
+        self.storage.save_users(self._snapshot())
 
     def _load_users(self) -> None:
-        """Load users from a JSON file."""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.users = {username: User.from_dict(user_data) for username, user_data in data.items()}
-        except FileNotFoundError:
-            self.users = {}
\ No newline at end of file
+        """Discard loaded users so they are read from the storage backend again."""
+        self.users = UserDirectory(self.storage)
@@ -0,0 +1,262 @@
+import atexit
+import threading
+import time
+from copy import deepcopy
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from finance_tracker.storage import (StorageBackend, apply_budget_changes, apply_expense_changes,
+                                     apply_user_changes)
+
+DURABILITY_MODES = ("immediate", "batched", "on_close")
+
+# Open write-behind stores, flushed when the interpreter exits. The references are strong,
+# so a store with queued changes stays alive until close() even if its owner drops it.
+_open: Set['WriteBehindStorage'] = set()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for storage in list(_open):
+        try:
+            storage.close()
+        except Exception:
+            pass
+
+
+class WriteBehindStorage(StorageBackend):
+    """Wraps a storage backend so writes are buffered and saved later.
+
+    ``durability`` picks when changes reach the wrapped backend:
+
+    - ``immediate``: every write is passed straight through, as if unwrapped.
+    - ``batched``: writes are queued and a background thread saves them
+      once ``flush_every`` changes are waiting or the oldest has waited
+      ``flush_interval`` seconds.
+    - ``on_close``: writes are queued until flush() or close().
+
+    Queued changes are coalesced per file, so many mutations cost one
+    backend write. Reads never flush: they load from the wrapped backend
+    and apply the queued changes for what they read on top, so they see
+    earlier writes while nothing reaches the backend before it is due.
+    save_* replaces what is stored, so it drops that file's queued changes.
+    A store stays open, and is flushed when the interpreter exits normally,
+    until close() is called, even if nothing else refers to it. Anything
+    still queued is lost if the process is killed.
+
+    The flusher never calls back into the manager that made a change.
+    Backends get the queued change records with no snapshot and merge them
+    into what is stored. If a background flush fails, its changes are kept
+    and retried after ``flush_interval``, and the error is kept in
+    ``last_error``. An explicit flush() raises it.
+    """
+    def __init__(self, backend: StorageBackend, durability: str = "batched",
+                 flush_interval: float = 1.0, flush_every: int = 1000):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Invalid durability: {durability}")
+        if flush_interval <= 0:
+            raise ValueError("Flush interval must be positive")
+        if flush_every < 1:
+            raise ValueError("Flush threshold must be at least 1")
+        self.backend = backend
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.last_error: Optional[BaseException] = None
+        # (kind, user_id) -> queued change records, oldest first.
+        self._pending: Dict[Tuple[str, Optional[str]], List[Dict]] = {}
+        self._count = 0
+        self._oldest = 0.0
+        self._closed = False
+        self._changed = threading.Condition()
+        self._flush_lock = threading.RLock()
+        self._flusher: Optional[threading.Thread] = None
+        if durability == "batched":
+            self._flusher = threading.Thread(target=self._run, name="WriteBehindStorage-flusher",
+                                             daemon=True)
+            self._flusher.start()
+        _open.add(self)
+
+    @property
+    def pending(self) -> int:
+        """Number of change records waiting to be saved."""
+        with self._changed:
+            return self._count
+
+    def _queue(self, key: Tuple[str, Optional[str]], changes: List[Dict]) -> None:
+        with self._changed:
+            if self._closed:
+                raise ValueError("Storage is closed")
+            # The flusher is woken to start the interval, and again once enough changes are waiting.
+            wake = not self._count or self._count < self.flush_every <= self._count + len(changes)
+            if not self._count:
+                self._oldest = time.monotonic()
+            self._pending.setdefault(key, []).extend(changes)
+            self._count += len(changes)
+            if wake:
+                self._changed.notify()
+
+    def _due(self) -> bool:
+        return bool(self._count) and (self._count >= self.flush_every
+                                      or time.monotonic() - self._oldest >= self.flush_interval)
+
+    def _run(self) -> None:
+        """Flusher thread: save queued changes whenever a threshold is reached."""
+        while True:
+            with self._changed:
+                while not self._closed and not self._due():
+                    wait = self._oldest + self.flush_interval - time.monotonic() if self._count else None
+                    self._changed.wait(wait)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                self.last_error = e
+                with self._changed:
+                    self._changed.wait_for(lambda: self._closed, self.flush_interval)
+
+    def flush(self) -> None:
+        """Save every queued change to the wrapped backend now."""
+        with self._flush_lock:
+            with self._changed:
+                pending, self._pending, self._count = self._pending, {}, 0
+            try:
+                while pending:
+                    key = next(iter(pending))
+                    self._write(key, pending[key])
+                    del pending[key]
+            except BaseException:
+                with self._changed:
+                    # Unsaved changes go back ahead of anything queued since.
+                    for key, changes in self._pending.items():
+                        pending.setdefault(key, []).extend(changes)
+                    self._pending = pending
+                    self._count = sum(len(changes) for changes in pending.values())
+                    self._oldest = time.monotonic()
+                raise
+            self.last_error = None
+
+    def _queued(self, key: Tuple[str, Optional[str]]) -> List[Dict]:
+        """Copies of the change records queued for a key, oldest first."""
+        with self._changed:
+            return deepcopy(self._pending.get(key, []))
+
+    def _overlaid(self, key: Tuple[str, Optional[str]], load: Callable, apply: Callable):
+        """Load from the wrapped backend and apply the changes queued for key on top.
+
+        The flush lock is held, so the flusher cannot take changes out of the
+        queue before they are in the backend while this reads.
+        """
+        with self._flush_lock:
+            changes = self._queued(key)
+            data = load()
+        return apply(data, changes) if changes else data
+
+    def _replace(self, key: Tuple[str, Optional[str]], call: Callable, *args) -> None:
+        """Drop the changes queued for key, then call a wrapped save_* that replaces them."""
+        with self._flush_lock:
+            with self._changed:
+                dropped = self._pending.pop(key, [])
+                self._count -= len(dropped)
+            try:
+                call(*args)
+            except BaseException:
+                with self._changed:
+                    self._pending[key] = dropped + self._pending.get(key, [])
+                    self._count += len(dropped)
+                raise
+
+    def _write(self, key: Tuple[str, Optional[str]], changes: List[Dict]) -> None:
+        kind, user_id = key
+        if kind == "expenses":
+            self.backend.write_expenses(user_id, changes, None)
+        elif kind == "budgets":
+            self.backend.write_budgets(user_id, changes, None)
+        else:
+            self.backend.write_users(changes, None)
+
+    def close(self) -> None:
+        """Flush queued changes, stop the flusher thread and close the wrapped backend."""
+        with self._changed:
+            self._closed = True
+            self._changed.notify()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
+        if self in _open:
+            _open.discard(self)
+            self.backend.close()
+
+    def __enter__(self) -> 'WriteBehindStorage':
+        """Use the store in a with block that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load_expenses(self, user_id: str) -> List[Dict]:
+        """Load a user's expenses with queued changes applied."""
+        return self._overlaid(("expenses", user_id), lambda: self.backend.load_expenses(user_id),
+                              apply_expense_changes)
+
+    def iter_expenses(self, user_id: str) -> Iterator[Dict]:
+        """Stream a user's expenses; with changes queued for them, they are loaded and applied first."""
+        with self._changed:
+            queued = ("expenses", user_id) in self._pending
+        if queued:
+            return iter(self.load_expenses(user_id))
+        return self.backend.iter_expenses(user_id)
+
+    def write_expenses(self, user_id: str, changes: List[Dict],
+                       snapshot: Callable[[], List[Dict]]) -> None:
+        """Queue expense changes, or write them through in immediate mode."""
+        if self.durability == "immediate":
+            self.backend.write_expenses(user_id, changes, snapshot)
+        else:
+            self._queue(("expenses", user_id), changes)
+
+    def save_expenses(self, user_id: str, expenses: List[Dict]) -> None:
+        """Replace a user's expenses, discarding their queued changes."""
+        self._replace(("expenses", user_id), self.backend.save_expenses, user_id, expenses)
+
+    def load_budgets(self, user_id: str) -> List[Dict]:
+        """Load a user's budgets with queued changes applied."""
+        return self._overlaid(("budgets", user_id), lambda: self.backend.load_budgets(user_id),
+                              apply_budget_changes)
+
+    def write_budgets(self, user_id: str, changes: List[Dict],
+                      snapshot: Callable[[], List[Dict]]) -> None:
+        """Queue budget changes, or write them through in immediate mode."""
+        if self.durability == "immediate":
+            self.backend.write_budgets(user_id, changes, snapshot)
+        else:
+            self._queue(("budgets", user_id), changes)
+
+    def save_budgets(self, user_id: str, budgets: List[Dict]) -> None:
+        """Replace a user's budgets, discarding their queued changes."""
+        self._replace(("budgets", user_id), self.backend.save_budgets, user_id, budgets)
+
+    def load_users(self) -> Dict[str, Dict]:
+        """Load all users with queued changes applied."""
+        return self._overlaid(("users", None), self.backend.load_users, apply_user_changes)
+
+    def load_user(self, username: str) -> Optional[Dict]:
+        """Load one user: its latest queued change if there is one, else from the wrapped backend."""
+        with self._flush_lock:
+            with self._changed:
+                for change in reversed(self._pending.get(("users", None), [])):
+                    if change["op"] == "delete" and change["username"] == username:
+                        return None
+                    if change["op"] != "delete" and change["user"]["username"] == username:
+                        return deepcopy(change["user"])
+            return self.backend.load_user(username)
+
+    def write_users(self, changes: List[Dict], snapshot: Callable[[], Dict[str, Dict]]) -> None:
+        """Queue user changes, or write them through in immediate mode."""
+        if self.durability == "immediate":
+            self.backend.write_users(changes, snapshot)
+        else:
+            self._queue(("users", None), changes)
+
+    def save_users(self, users: Dict[str, Dict]) -> None:
+        """Replace all users, discarding queued user changes."""
+        self._replace(("users", None), self.backend.save_users, users)